@@ -0,0 +1,164 @@
+"""
+Benchmarks of the numeric core, kept out of the installed package.
+
+Pricing workers and batch jobs import the numeric core but never plot, so the
+core modules must not pull in matplotlib or scienceplots at import time. The
+guard is also run by ``tests/test_import_time.py``.
+
+The interpolators fit their coefficients at construction, so the cost of a
+single call should stay (nearly) flat as the number of knots grows. The curve
+bootstrapper is timed on a batch of curves rebuilt from fresh quotes.
+
+Example usage:
+    python benchmarks/core.py
+"""
+
+import os
+import subprocess
+import sys
+import timeit
+from typing import Dict, Tuple
+import numpy as np
+from py_volanalytics.market.curve_bootstrapper import CurveBootstrapper
+from py_volanalytics.math.interpolator import InterpolationType, interpolator_map
+from py_volanalytics.types.enums import Currency, RateInstrumentType
+
+CORE_MODULES = (
+    "py_volanalytics.math.interpolator",
+    "py_volanalytics.market.discounting_curve",
+    "py_volanalytics.valuation_framework.market_data",
+)
+HEAVY_MODULES = ("matplotlib", "scienceplots")
+
+
+def benchmark_import(
+    module: str, heavy_modules: Tuple[str, ...] = HEAVY_MODULES
+) -> float:
+    """Measure the import time of a module in a fresh interpreter.
+
+    Args:
+        module (str): The dotted module name.
+        heavy_modules (Tuple[str, ...]): Modules that must not be imported as a
+            side effect.
+
+    Returns:
+        float: The import time in milliseconds.
+
+    Raises:
+        RuntimeError: if importing ``module`` imports any of ``heavy_modules``.
+    """
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {heavy_modules!r} if m in sys.modules]\n"
+        "print(1e3 * elapsed, ','.join(heavy))\n"
+    )
+    # the interpreter sees the modules this one sees, e.g. an uninstalled src/
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    ).stdout.split()
+
+    if len(output) > 1:
+        raise RuntimeError(f"Importing {module} imports {output[1]}")
+    return float(output[0])
+
+
+def benchmark_call(
+    interpolator_class: type,
+    knot_counts: Tuple[int, ...] = (10, 100, 1000),
+    num_calls: int = 10_000,
+) -> Dict[int, float]:
+    """Measure the average cost of a single scalar interpolator call.
+
+    Args:
+        interpolator_class (type): The ``Interpolator`` subclass to benchmark.
+        knot_counts (Tuple[int, ...]): The numbers of knots to benchmark.
+        num_calls (int): The number of scalar calls timed per knot count.
+
+    Returns:
+        Dict[int, float]: The mean time per call in microseconds, keyed by the
+        number of knots.
+    """
+    timings = {}
+    for n in knot_counts:
+        xs = np.linspace(0.0, 10.0, n)
+        interpolator = interpolator_class(
+            x_values=xs, y_values=np.exp(-0.05 * xs), extrapolate=True
+        )
+        queries = np.random.default_rng(0).uniform(0.0, 10.0, num_calls).tolist()
+        elapsed = timeit.timeit(lambda: [interpolator(q) for q in queries], number=1)
+        timings[n] = 1e6 * elapsed / num_calls
+    return timings
+
+
+def benchmark_bootstrap(
+    num_curves: int = 50,
+    num_swaps: int = 30,
+    interpolation_type: InterpolationType = InterpolationType.LOG_LINEAR_INTERPOLATION,
+    num_runs: int = 20,
+) -> float:
+    """Measure the time to rebuild a batch of curves from fresh quotes.
+
+    Every curve has 4 deposits, 6 FRAs and ``num_swaps`` annual swaps, i.e. 40
+    instruments by default.
+
+    Args:
+        num_curves (int): The number of currencies bootstrapped per batch.
+        num_swaps (int): The number of annual swaps per curve.
+        interpolation_type (InterpolationType): The discount factor interpolation.
+        num_runs (int): The number of timed batches.
+
+    Returns:
+        float: The mean time to bootstrap all curves, in milliseconds.
+    """
+    deposits = [1.0 / 12.0, 2.0 / 12.0, 0.25, 0.5]
+    fra_ends = list(np.arange(0.75, 2.01, 0.25))
+    swap_ends = list(np.arange(3.0, 3.0 + num_swaps))
+    bootstrapper = CurveBootstrapper.create(
+        instrument_types=[RateInstrumentType.DEPOSIT] * len(deposits)
+        + [RateInstrumentType.FRA] * len(fra_ends)
+        + [RateInstrumentType.SWAP] * len(swap_ends),
+        start_times=[0.0] * len(deposits)
+        + [end - 0.25 for end in fra_ends]
+        + [0.0] * len(swap_ends),
+        end_times=deposits + fra_ends + swap_ends,
+        interpolation_type=interpolation_type,
+    )
+
+    rng = np.random.default_rng(0)
+    ends = bootstrapper.pillars[1:]
+    quotes = (
+        0.03
+        + rng.uniform(-0.02, 0.02, (num_curves, 1))
+        + 0.01 * (1.0 - np.exp(-ends / 5.0))
+        + rng.normal(0.0, 0.0005, (num_curves, len(ends)))
+    )
+    currencies = list(Currency)[:num_curves]
+
+    elapsed = timeit.timeit(
+        lambda: bootstrapper.build_curves(dict(zip(currencies, quotes))),
+        number=num_runs,
+    )
+    return 1e3 * elapsed / num_runs
+
+
+if __name__ == "__main__":
+    for core_module in CORE_MODULES:
+        print(f"{core_module}: {benchmark_import(core_module):.1f}ms")
+    for interpolation_type, interpolator_class in interpolator_map.items():
+        timings = benchmark_call(interpolator_class)
+        print(
+            f"{interpolation_type}: "
+            + ", ".join(f"n={n}: {t:.2f}us/call" for n, t in timings.items())
+        )
+    for interpolation_type in InterpolationType:
+        print(
+            f"{interpolation_type}: 50 curves x 40 instruments in "
+            f"{benchmark_bootstrap(interpolation_type=interpolation_type):.2f}ms"
+        )
@@ -0,0 +1,308 @@
+"""Curve Bootstrapper.
+
+The ``CurveBootstrapper`` builds ``DiscountingCurve`` objects from the quotes of
+deposits, FRAs and par swaps. The instrument definitions are fixed at
+construction, so everything that does not depend on the quotes (the cashflow
+schedules, the interpolation weights) is computed once. Each instrument is
+priced as a linear combination of discount factors at the cashflow times
+
+    R_i = P(s_i) - P(e_i) - q_i * sum_k tau_ik P(t_ik),
+
+so the pricing of all instruments is two matrix products and all pillars are
+solved with a global Newton iteration on the log discount factors. The curves
+of many currencies are solved in a single batched iteration.
+
+Example usage:
+    bootstrapper = CurveBootstrapper.create(
+        instrument_types=[RateInstrumentType.DEPOSIT, RateInstrumentType.SWAP],
+        start_times=[0.0, 0.0],
+        end_times=[0.5, 2.0],
+    )
+    curve = bootstrapper.build(
+        np.array([0.030, 0.032]), trade_ccy=Currency.USD, collateral_ccy=Currency.USD
+    )
+
+"""
+
+from typing import Dict, List
+import numpy as np
+import attrs
+from attrs import define, field
+from py_volanalytics.market.discounting_curve import (
+    DiscountingCurve,
+    DiscountingCurveId,
+)
+from py_volanalytics.math.interpolator import InterpolationType, InterpolationWeights
+from py_volanalytics.types.enums import Currency, MarketObjects, RateInstrumentType
+
+
+@define(kw_only=True)
+class RateInstrument:
+    """Definition of a linear rate instrument quoted as a simple (par) rate"""
+
+    _instrument_type: RateInstrumentType = field(
+        validator=attrs.validators.instance_of(RateInstrumentType),
+        alias="instrument_type",
+    )
+    _start_time: float = field(
+        default=0.0, validator=attrs.validators.ge(0.0), alias="start_time"
+    )
+    _end_time: float = field(alias="end_time")
+    _fixed_frequency: int = field(
+        default=1, validator=attrs.validators.gt(0), alias="fixed_frequency"
+    )
+
+    @_end_time.validator
+    def validate_end_time(self, attributes, value):
+        """Validate that the instrument ends after it starts."""
+        if value <= self._start_time:
+            raise ValueError("end_time must be greater than start_time")
+
+    @property
+    def instrument_type(self):
+        return self._instrument_type
+
+    @property
+    def start_time(self):
+        return self._start_time
+
+    @property
+    def end_time(self):
+        return self._end_time
+
+    @property
+    def fixed_frequency(self):
+        return self._fixed_frequency
+
+    def accrual_schedule(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the fixed payment times and their accrual fractions.
+
+        Deposits and FRAs pay once at the end time. Swaps pay
+        ``fixed_frequency`` times per year, rolling back from the end time with
+        a short front stub.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the payment times and accruals.
+        """
+        if self._instrument_type != RateInstrumentType.SWAP:
+            times = np.array([self._end_time])
+        else:
+            periods = np.arange(
+                np.ceil((self._end_time - self._start_time) * self._fixed_frequency)
+            )
+            times = self._end_time - periods[::-1] / self._fixed_frequency
+            times = times[times > self._start_time]
+        return times, np.diff(times, prepend=self._start_time)
+
+
+@define(kw_only=True)
+class CurveBootstrapper:
+    """Class to bootstrap discounting curves from rate instrument quotes."""
+
+    _instruments: List[RateInstrument] = field(
+        validator=attrs.validators.instance_of(list), alias="instruments"
+    )
+    _interpolation_type: InterpolationType = field(
+        default=InterpolationType.LOG_LINEAR_INTERPOLATION,
+        validator=attrs.validators.instance_of(InterpolationType),
+        alias="interapolation_type",
+    )
+    _tolerance: float = field(
+        default=1e-12, validator=attrs.validators.gt(0.0), alias="tolerance"
+    )
+    _max_iterations: int = field(
+        default=20, validator=attrs.validators.gt(0), alias="max_iterations"
+    )
+    _pillars: np.ndarray = field(init=False)
+    _weights: InterpolationWeights = field(init=False)
+    _weights_dense: np.ndarray = field(init=False)
+    _float_legs: np.ndarray = field(init=False)
+    _annuities: np.ndarray = field(init=False)
+
+    @_instruments.validator
+    def validate_instruments(self, attributes, values):
+        """Validate that there is one instrument per pillar, sorted by end time."""
+        if len(values) == 0:
+            raise ValueError("List of instruments is empty.")
+        end_times = np.array([instrument.end_time for instrument in values])
+        if np.any(np.diff(end_times) <= 0.0):
+            raise ValueError("Instrument end times must be strictly increasing.")
+
+    def __attrs_post_init__(self):
+        # one pillar per instrument end time, plus P(0) = 1
+        self._pillars = np.concatenate(
+            [[0.0], [instrument.end_time for instrument in self._instruments]]
+        )
+
+        schedules = [instrument.accrual_schedule() for instrument in self._instruments]
+        starts = np.array([instrument.start_time for instrument in self._instruments])
+        cashflow_times, inverse = np.unique(
+            np.concatenate([starts, self._pillars[1:]] + [t for t, _ in schedules]),
+            return_inverse=True,
+        )
+
+        # float leg P(s) - P(e) and fixed leg annuity sum_k tau_k P(t_k) as
+        # rows of matrices acting on the discount factors at the cashflow times
+        n_instruments = len(self._instruments)
+        rows = np.arange(n_instruments)
+        self._float_legs = np.zeros((n_instruments, len(cashflow_times)))
+        np.add.at(self._float_legs, (rows, inverse[:n_instruments]), 1.0)
+        np.add.at(
+            self._float_legs, (rows, inverse[n_instruments : 2 * n_instruments]), -1.0
+        )
+
+        payment_rows = np.repeat(rows, [len(t) for t, _ in schedules])
+        self._annuities = np.zeros_like(self._float_legs)
+        np.add.at(
+            self._annuities,
+            (payment_rows, inverse[2 * n_instruments :]),
+            np.concatenate([accruals for _, accruals in schedules]),
+        )
+
+        self._weights = InterpolationWeights.create(
+            interpolation_type=self._interpolation_type,
+            x_values=self._pillars,
+            query_points=cashflow_times,
+            extrapolate=True,
+        )
+        self._weights_dense = self._weights.to_dense()
+
+    @property
+    def instruments(self) -> List[RateInstrument]:
+        return self._instruments
+
+    @property
+    def pillars(self) -> np.ndarray:
+        """Get the pillar times, time 0 followed by the instrument end times."""
+        return self._pillars
+
+    def solve(self, quotes: np.ndarray | List[float]) -> np.ndarray:
+        """Solve the pillar discount factors repricing the quotes.
+
+        Args:
+            quotes (np.ndarray | List[float]): The instrument quotes, of shape
+                (n_instruments,) for one curve or (n_curves, n_instruments).
+
+        Returns:
+            np.ndarray: The discount factors at the pillars, of shape
+            (n_pillars,) or (n_curves, n_pillars).
+
+        Raises:
+            RuntimeError: if the Newton iteration does not converge.
+        """
+        quotes = np.asarray(quotes, dtype=np.float64)
+        if quotes.shape[-1] != len(self._instruments):
+            raise ValueError(
+                f"Expected {len(self._instruments)} quotes per curve, "
+                f"got {quotes.shape[-1]}."
+            )
+        q = np.atleast_2d(quotes)
+
+        # residuals R = M @ P(cashflow times), with M = A - diag(q) B per curve
+        pricing = self._float_legs - q[:, :, np.newaxis] * self._annuities
+
+        # start from flat-forward curves at the quoted rates
+        log_dfs = np.zeros((len(q), len(self._pillars)))
+        log_dfs[:, 1:] = -q * self._pillars[1:]
+        for _ in range(self._max_iterations):
+            dfs = np.exp(log_dfs)
+            values = self._weights(dfs)
+            residuals = np.einsum("cit,ct->ci", pricing, values)
+            if np.max(np.abs(residuals)) < self._tolerance:
+                break
+
+            # dP(t)/dlog(y_k) = dP(t)/dy_k * y_k
+            if self._interpolation_type == InterpolationType.LOG_LINEAR_INTERPOLATION:
+                sensitivities = values[:, :, np.newaxis] * self._weights_dense
+            else:
+                sensitivities = self._weights_dense * dfs[:, np.newaxis, :]
+            jacobian = pricing @ sensitivities[:, :, 1:]
+            log_dfs[:, 1:] -= np.linalg.solve(jacobian, residuals[:, :, np.newaxis])[
+                :, :, 0
+            ]
+        else:
+            raise RuntimeError(
+                f"Bootstrapping did not converge in {self._max_iterations} iterations."
+            )
+
+        return dfs if quotes.ndim > 1 else dfs[0]
+
+    def build(
+        self,
+        quotes: np.ndarray | List[float],
+        trade_ccy: Currency,
+        collateral_ccy: Currency,
+    ) -> DiscountingCurve:
+        """Bootstraps a discounting curve.
+
+        Args:
+            quotes (np.ndarray | List[float]): The instrument quotes.
+            trade_ccy (Currency): The trade currency.
+            collateral_ccy (Currency): The collateral currency.
+        """
+        return self._curve(self.solve(quotes), trade_ccy, collateral_ccy)
+
+    def build_curves(
+        self, quotes: Dict[Currency, np.ndarray | List[float]]
+    ) -> Dict[Currency, DiscountingCurve]:
+        """Bootstraps the curves of many currencies in a single Newton solve.
+
+        All currencies share the instrument definitions of this bootstrapper and
+        each curve is collateralized in its own currency.
+
+        Args:
+            quotes (Dict[Currency, np.ndarray | List[float]]): The instrument
+                quotes of every currency.
+        """
+        dfs = self.solve(np.stack([np.asarray(q) for q in quotes.values()]))
+        return {
+            ccy: self._curve(curve_dfs, ccy, ccy)
+            for ccy, curve_dfs in zip(quotes.keys(), dfs)
+        }
+
+    def _curve(
+        self, dfs: np.ndarray, trade_ccy: Currency, collateral_ccy: Currency
+    ) -> DiscountingCurve:
+        return DiscountingCurve(
+            id=DiscountingCurveId(
+                friendly_name=MarketObjects.DISCOUNTING_CURVE,
+                currency=trade_ccy,
+                collateral=collateral_ccy,
+            ),
+            times=self._pillars,
+            discount_factors=dfs,
+            interapolation_type=self._interpolation_type,
+        )
+
+    @staticmethod
+    def create(
+        instrument_types: List[RateInstrumentType],
+        start_times: np.ndarray | List[float],
+        end_times: np.ndarray | List[float],
+        fixed_frequency: int = 1,
+        interpolation_type: InterpolationType = InterpolationType.LOG_LINEAR_INTERPOLATION,
+    ) -> "CurveBootstrapper":
+        """Creates a bootstrapper from arrays of instrument definitions.
+
+        Args:
+            instrument_types (List[RateInstrumentType]): The instrument types.
+            start_times (np.ndarray | List[float]): The instrument start times.
+            end_times (np.ndarray | List[float]): The instrument end times, one
+                pillar each, strictly increasing.
+            fixed_frequency (int): The fixed leg payment frequency of the swaps.
+            interpolation_type (InterpolationType): The curve interpolation.
+        """
+        return CurveBootstrapper(
+            instruments=[
+                RateInstrument(
+                    instrument_type=instrument_type,
+                    start_time=float(start_time),
+                    end_time=float(end_time),
+                    fixed_frequency=fixed_frequency,
+                )
+                for instrument_type, start_time, end_time in zip(
+                    instrument_types, start_times, end_times
+                )
+            ],
+            interapolation_type=interpolation_type,
+        )
@@ -0,0 +1,110 @@
+"""Curve Cache.
+
+A bounded LRU cache of curve evaluations, keyed on the query times. Within one
+valuation run the same ``df(t, T)`` pairs are requested by many instruments,
+e.g. on standard tenor grids or option expiries, so most calls become a dict
+lookup instead of an interpolation.
+
+With a ``resolution`` the query times are snapped to a grid of that spacing
+(e.g. 1/365 for daily), so nearby queries share an entry. The curve is then
+evaluated at the grid point, which makes the cached values independent of the
+order of the queries.
+
+The cache does not check the curve data on lookups, so a hit is a dict
+lookup. The curve calls ``invalidate`` when its data changes, see
+``DiscountingCurve.refit``.
+
+Example usage:
+    curve = DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+    cache = curve.enable_cache(max_size=1024)
+    curve.df(0.0, 1.0)
+    curve.df(0.0, 1.0)
+    cache.hits, cache.misses
+        >>(1, 1)
+"""
+
+from collections import OrderedDict
+from typing import Hashable, Optional
+import attrs
+from attrs import define, field
+
+
+@define(kw_only=True)
+class CurveCache:
+    """Bounded LRU cache of curve evaluations with hit/miss counters."""
+
+    _max_size: int = field(
+        default=4096, validator=attrs.validators.gt(0), alias="max_size"
+    )
+    _resolution: Optional[float] = field(default=None, alias="resolution")
+    _entries: OrderedDict = field(factory=OrderedDict, init=False)
+    _hits: int = field(default=0, init=False)
+    _misses: int = field(default=0, init=False)
+
+    @_resolution.validator
+    def validate_resolution(self, attributes, value):
+        """Validate that the quantization grid spacing is positive."""
+        if value is not None and value <= 0.0:
+            raise ValueError("resolution must be positive")
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def resolution(self) -> Optional[float]:
+        return self._resolution
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Get the fraction of lookups served from the cache."""
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def quantize(self, t: float) -> float:
+        """Snap a query time to the cache grid, if any."""
+        if self._resolution is None:
+            return float(t)
+        return round(t / self._resolution) * self._resolution
+
+    def invalidate(self):
+        """Drop all cached entries, keeping the counters."""
+        self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[float]:
+        """Look up a cached value, counting the hit or miss.
+
+        Returns:
+            Optional[float]: the cached value, or None on a miss.
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: Hashable, value: float):
+        """Insert a value, evicting the least recently used entry when full."""
+        self._entries[key] = value
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries and reset the counters."""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
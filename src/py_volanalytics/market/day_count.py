@@ -0,0 +1,91 @@
+"""Day count conventions.
+
+Vectorized conversion of arrays of dates to year fractions. Dates are handled as
+``datetime64[D]`` arrays, so converting thousands of daily pillars is a handful
+of NumPy operations rather than a Python loop over ``datetime`` objects.
+
+Example usage:
+    year_fractions(
+        np.datetime64("2024-01-01"),
+        np.array(["2024-07-01", "2025-01-01"], dtype="datetime64[D]"),
+        DayCountConvention.ACT_ACT_ISDA,
+    )
+        >>[0.49726776 1.        ]
+"""
+
+import datetime as dt
+from typing import List
+import numpy as np
+
+from py_volanalytics.types.enums import DayCountConvention
+
+
+def to_datetime64(
+    dates: np.ndarray | List[dt.date] | dt.date | np.datetime64,
+) -> np.ndarray:
+    """Convert dates to a ``datetime64[D]`` array, assuming daily granularity."""
+    return np.asarray(dates, dtype="datetime64[D]")
+
+
+def year_fractions(
+    start: dt.date | np.datetime64 | np.ndarray,
+    end: np.ndarray | List[dt.date] | dt.date | np.datetime64,
+    convention: DayCountConvention = DayCountConvention.ACT_365_FIXED,
+) -> np.ndarray:
+    """Year fractions between dates under a day count convention
+
+    Args:
+        start (dt.date | np.datetime64 | np.ndarray): The start date(s),
+            e.g. the anchor date of a curve.
+        end (np.ndarray | List[dt.date] | dt.date | np.datetime64): The end
+            date(s), broadcast against ``start``.
+        convention (DayCountConvention): The day count convention.
+
+    Returns:
+        np.ndarray: The year fractions, negative where ``end`` precedes ``start``.
+    """
+    start, end = np.broadcast_arrays(to_datetime64(start), to_datetime64(end))
+    days = (end - start).astype(np.float64)
+
+    match convention:
+        case DayCountConvention.ACT_365_FIXED:
+            return days / 365.0
+        case DayCountConvention.ACT_360:
+            return days / 360.0
+        case DayCountConvention.ACT_ACT_ISDA:
+            # days falling in leap years count 1/366, the others 1/365
+            start_year = start.astype("datetime64[Y]")
+            end_year = end.astype("datetime64[Y]")
+            return (
+                (end_year - start_year).astype(np.float64)
+                - 1.0
+                + (start_year + 1 - start).astype(np.float64)
+                / _days_in_year(start_year)
+                + (end - end_year).astype(np.float64) / _days_in_year(end_year)
+            )
+        case DayCountConvention.THIRTY_E_360:
+            start_year, start_month, start_day = _split(start)
+            end_year, end_month, end_day = _split(end)
+            return (
+                360.0 * (end_year - start_year)
+                + 30.0 * (end_month - start_month)
+                + (np.minimum(end_day, 30) - np.minimum(start_day, 30))
+            ) / 360.0
+        case _:
+            raise ValueError(f"Unsupported day count convention: {convention}")
+
+
+def _days_in_year(years: np.ndarray) -> np.ndarray:
+    """Number of days of ``datetime64[Y]`` years."""
+    return ((years + 1).astype("datetime64[D]") - years.astype("datetime64[D]")).astype(
+        np.float64
+    )
+
+
+def _split(dates: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split ``datetime64[D]`` dates into year, month (1-12) and day (1-31)."""
+    months = dates.astype("datetime64[M]")
+    year = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months).astype(np.int64) + 1
+    return year, month, day
@@ -6,13 +6,15 @@ This allows us to value all instruments consistently within a single valuation f
 """
 
 import datetime as dt
+from collections import OrderedDict
 import numpy as np
-import matplotlib.pyplot as plt
 
 import attrs
-from attrs import define, field
+from attrs import define, field, frozen
 from typing import Union, Optional
-from py_volanalytics.types.enums import Currency
+from py_volanalytics.types.enums import Currency, DayCountConvention
+from py_volanalytics.market.curve_cache import CurveCache
+from py_volanalytics.market.day_count import to_datetime64, year_fractions
 from py_volanalytics.valuation_framework.market_data import (
     MarketObjectId,
     MarketObject,
@@ -20,14 +22,13 @@ from py_volanalytics.valuation_framework.market_data import (
 )
 from py_volanalytics.math.interpolator import (
     InterpolationType,
+    InterpolationWeights,
     interpolator_map,
     Interpolator,
 )
 
-plt.style.use("science")
 
-
-@define(kw_only=True)
+@frozen(kw_only=True, cache_hash=True)
 class DiscountingCurveId(MarketObjectId):
     """Class to represent a Discounting Curve identifier"""
 
@@ -51,37 +52,83 @@ class DiscountingCurveId(MarketObjectId):
         return self._collateral
 
 
+def _refit_on_change(instance: "DiscountingCurve", attribute, value):
+    """on_setattr hook dropping the fitted state of a curve whose data changes"""
+    instance.refit()
+    return value
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    """Converter storing a read-only array, so that editing the curve data in
+    place fails instead of leaving the fitted state stale"""
+    if not isinstance(values, np.ndarray) or not values.flags.writeable:
+        # read-only arrays, e.g. views of a snapshot, are kept without a copy
+        return values
+    values = values.copy()
+    values.flags.writeable = False
+    return values
+
+
 @define(kw_only=True)
 class DiscountingCurve(MarketObject):
     """Class to represent a discounting curve object."""
 
-    _times: np.ndarray[Union[dt.date, float]] = field(alias="times")
-    _discount_factors: np.ndarray[float] = field(alias="discount_factors")
+    _times: np.ndarray[Union[np.datetime64, float]] = field(
+        alias="times",
+        converter=_read_only,
+        on_setattr=attrs.setters.pipe(
+            attrs.setters.convert, attrs.setters.validate, _refit_on_change
+        ),
+    )
+    _discount_factors: np.ndarray[float] = field(
+        alias="discount_factors",
+        converter=_read_only,
+        on_setattr=attrs.setters.pipe(
+            attrs.setters.convert, attrs.setters.validate, _refit_on_change
+        ),
+    )
     _interpolation_type: InterpolationType = field(
         default=InterpolationType.LOG_LINEAR_INTERPOLATION,
         validator=attrs.validators.instance_of(InterpolationType),
         alias="interapolation_type",
     )
-    _interpolator: Optional[Interpolator] = field(default=None)
+    _anchor_date: Optional[dt.date] = field(default=None, alias="anchor_date")
+    _day_count: DayCountConvention = field(
+        default=DayCountConvention.ACT_365_FIXED,
+        validator=attrs.validators.instance_of(DayCountConvention),
+        alias="day_count",
+    )
+    _dates: Optional[np.ndarray] = field(default=None, init=False)
+    _interpolator: Optional[Interpolator] = field(default=None, init=False)
+    _cache: Optional[CurveCache] = field(default=None, init=False)
+    _weights: OrderedDict = field(factory=OrderedDict, init=False)
 
     @_times.validator
     def validate_times(self, attributes, values):
         """Validate array of times."""
+        if not isinstance(values, np.ndarray):
+            raise TypeError("times must be a numpy ndarray")
+
         if len(values) <= 1:
             raise ValueError("array of time values must be of length >= 2")
 
-        if not isinstance(self._times, np.ndarray):
-            raise TypeError("times must be a numpy ndarray")
-
-        if self._times.dtype not in [np.float64, np.float32]:
-            raise TypeError("times must be float or date dtype")
+        if values.dtype not in [np.float64, np.float32] and not np.issubdtype(
+            values.dtype, np.datetime64
+        ):
+            raise TypeError("times must be float or datetime64 dtype")
 
-        zero_point = dt.timedelta(0) if isinstance(values[0], dt.date) else 0
-        for i in range(len(values) - 1):
-            if values[i + 1] - values[i] < zero_point:
-                raise ValueError("array of time values is not sorted")
+        if np.any(values[1:] < values[:-1]):
+            raise ValueError("array of time values is not sorted")
 
     def __attrs_post_init__(self):
+        if np.issubdtype(self._times.dtype, np.datetime64):
+            # keep the dates, the curve itself lives on year fractions
+            self._dates = to_datetime64(self._times)
+            anchor_date = (
+                self._anchor_date if self._anchor_date is not None else self._dates[0]
+            )
+            self._times = year_fractions(anchor_date, self._dates, self._day_count)
+
         if len(self._discount_factors) != len(self._times):
             raise ValueError(
                 "length of _discount_factors array must equal length of _times array"
@@ -93,6 +140,9 @@ class DiscountingCurve(MarketObject):
         if self._discount_factors.dtype not in [np.float64, np.float32]:
             raise TypeError("_discount factors must be of type float")
 
+        self._build_interpolator()
+
+    def _build_interpolator(self):
         # Get the interpolator class based on the interpolation type
         interpolator_class: Interpolator = interpolator_map.get(
             self._interpolation_type
@@ -106,35 +156,252 @@ class DiscountingCurve(MarketObject):
             x_values=self._times, y_values=self._discount_factors, extrapolate=True
         )
 
-    def df(self, t: float, T: float) -> float:
-        """Returns the discount factor P(t,T)"""
-        disc_fact_t = self._interpolator(t)  # df(0,t) = e^{-rt}
-        disc_fact_T = self._interpolator(T)  # df(0,T) = e^{-rT}
+    def refit(self):
+        """Drop the fitted interpolator and the cached discount factors
+
+        The interpolator is refitted on the next evaluation. This runs whenever
+        the times or discount factors are replaced. They are stored read-only,
+        so they cannot be modified in place.
+        """
+        self._interpolator = None
+        self._weights.clear()
+        if self._cache is not None:
+            self._cache.invalidate()
+
+    def with_discount_factors(
+        self,
+        discount_factors: np.ndarray,
+        curve_id: Optional[DiscountingCurveId] = None,
+    ) -> "DiscountingCurve":
+        """Creates a curve on the same times and settings, with other discount factors
+
+        The times, already converted to year fractions, are shared with this
+        curve. The new curve has no cache.
+
+        Args:
+            discount_factors (np.ndarray): The discount factors at the times.
+            curve_id (Optional[DiscountingCurveId]): The id of the new curve,
+                this curve's id by default.
+        """
+        changes = {"discount_factors": discount_factors}
+        if curve_id is not None:
+            changes["id"] = curve_id
+        curve = attrs.evolve(self, **changes)
+        curve._dates = self._dates
+        return curve
+
+    @property
+    def interpolator(self) -> Interpolator:
+        """The interpolator of the discount factors, fitted on first use"""
+        if self._interpolator is None:
+            self._build_interpolator()
+        return self._interpolator
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times
+
+    @property
+    def dates(self) -> Optional[np.ndarray]:
+        """The pillar dates, if the curve was built from dates"""
+        return self._dates
+
+    @property
+    def discount_factors(self) -> np.ndarray:
+        return self._discount_factors
+
+    @property
+    def interpolation_type(self) -> InterpolationType:
+        return self._interpolation_type
+
+    @property
+    def cache(self) -> Optional[CurveCache]:
+        return self._cache
+
+    def enable_cache(
+        self, max_size: int = 4096, resolution: Optional[float] = None
+    ) -> CurveCache:
+        """Memoize scalar ``df(t, T)`` calls in a bounded LRU cache
+
+        The cache is cleared whenever the curve is refitted, see ``refit``.
+
+        Args:
+            max_size (int): The maximum number of cached (t, T) pairs.
+            resolution (Optional[float]): If given, t and T are snapped to a
+                grid of this spacing, e.g. 1/365, before evaluation.
+
+        Returns:
+            CurveCache: The cache, exposing the hit/miss counters.
+        """
+        self._cache = CurveCache(max_size=max_size, resolution=resolution)
+        return self._cache
+
+    def disable_cache(self):
+        """Stop memoizing ``df(t, T)`` calls and drop the cached entries"""
+        self._cache = None
+
+    def df(self, t: float | np.ndarray, T: float | np.ndarray) -> float | np.ndarray:
+        """Returns the discount factor P(t,T)
+
+        ``t`` and ``T`` may be arrays and are broadcast against each other; all
+        the discount factors are then interpolated in a single vectorized pass.
+        Calls with float t and T are memoized if the cache is enabled.
+        """
+        if (
+            self._cache is not None
+            and isinstance(t, (float, int))
+            and isinstance(T, (float, int))
+        ):
+            return self._cached_df(t, T)
+
+        if np.ndim(t) == 0 and np.ndim(T) == 0:
+            disc_fact_t = self.interpolator(t)  # df(0,t) = e^{-rt}
+            disc_fact_T = self.interpolator(T)  # df(0,T) = e^{-rT}
+            return disc_fact_T / disc_fact_t  # df(t,T) = e^{-r(T-t)}
+
+        disc_fact_t, disc_fact_T = self._discount_factors_at(t, T)
+        return disc_fact_T / disc_fact_t
+
+    def zero_rate(self, T: float | np.ndarray) -> float | np.ndarray:
+        """Returns the annually compounded spot rate r(T), P(0,T) = (1 + r)^{-T}
+
+        At T = 0 the instantaneous rate is returned.
+        """
+        return self.forward_rate(0.0, T)
+
+    def forward_rate(
+        self, t: float | np.ndarray, T: float | np.ndarray
+    ) -> float | np.ndarray:
+        """Returns the annually compounded forward rate F(t,T)
+
+        P(t,T) = (1 + F)^{-(T-t)}.
+
+        ``t`` and ``T`` may be arrays and are broadcast against each other. Where
+        T = t the instantaneous forward rate, from the analytic derivative of
+        the interpolated discount factors, is returned.
+        """
+        shape = np.broadcast_shapes(np.shape(t), np.shape(T))
+        t, T = (np.atleast_1d(x) for x in np.broadcast_arrays(t, T))
+        disc_fact_t, disc_fact_T = self._discount_factors_at(t, T)
+
+        tau = T - t
+        degenerate = tau == 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = (disc_fact_t / disc_fact_T) ** (1.0 / tau) - 1.0
+
+        if np.any(degenerate):
+            # f(T) = -d/dT ln P(0,T), annually compounded
+            instantaneous = (
+                -self.interpolator.derivative(T[degenerate]) / disc_fact_T[degenerate]
+            )
+            rate[degenerate] = np.expm1(instantaneous)
+
+        return float(rate[0]) if shape == () else rate.reshape(shape)
+
+    def df_jacobian(self, T: np.ndarray) -> InterpolationWeights:
+        """Returns the sparse Jacobian dP(0,T_i)/dP(0,t_k) with respect to the nodes
+
+        P(0,T) is a known function of the node discount factors through the
+        interpolator, so the Jacobian is exact and has the sparsity pattern of
+        the interpolation weights, e.g. two non-zeros per row for log-linear
+        interpolation.
+
+        Args:
+            T (np.ndarray): The query times T_i, flattened.
+
+        Returns:
+            InterpolationWeights: the Jacobian as a linear map, of shape
+            (len(T), len(times)). Call it on node bumps to get the first order
+            change of P(0,T_i); use ``apply_transpose`` to pull gradients back
+            to the nodes.
+        """
+        return self.weights(T).jacobian(self._discount_factors)
+
+    def weights(self, T: np.ndarray) -> InterpolationWeights:
+        """Returns the interpolation weights of the nodes at the query times T
+
+        The weights depend only on the nodes and the query times, and are
+        cached for the last few query grids, so pricing the same cash flow
+        times again skips building them.
+
+        Args:
+            T (np.ndarray): The query times, flattened.
+        """
+        return InterpolationWeights.cached(
+            self._weights,
+            interpolation_type=self._interpolation_type,
+            x_values=self._times,
+            query_points=np.ravel(T),
+            extrapolate=True,
+        )
+
+    def node_sensitivities(self, T: np.ndarray, gradients: np.ndarray) -> np.ndarray:
+        """Returns bucketed sensitivities to the node discount factors
 
-        disc_fact = disc_fact_T / disc_fact_t  # df(t,T) = e^{-r(T-t)}
+        Given dV/dP(0,T_i) from a single pricing pass, e.g. the discounted cash
+        flows of a portfolio, the bucketed sensitivities are
+        dV/dP(0,t_k) = sum_i dV/dP(0,T_i) dP(0,T_i)/dP(0,t_k). This replaces
+        bumping each node and revaluing.
 
+        Args:
+            T (np.ndarray): The query times T_i, flattened.
+            gradients (np.ndarray): dV/dP(0,T_i) of shape (len(T),), or
+                (n_portfolios, len(T)).
+
+        Returns:
+            np.ndarray: dV/dP(0,t_k) of shape (len(times),) or
+            (n_portfolios, len(times)).
+        """
+        return self.df_jacobian(T).apply_transpose(gradients)
+
+    def _cached_df(self, t: float, T: float) -> float:
+        """Returns P(t,T) from the cache, interpolating it on a miss"""
+        key = (self._cache.quantize(t), self._cache.quantize(T))
+        disc_fact = self._cache.get(key)
+        if disc_fact is None:
+            interpolator = self.interpolator
+            disc_fact = interpolator(key[1]) / interpolator(key[0])
+            self._cache.put(key, disc_fact)
         return disc_fact
 
+    def _discount_factors_at(
+        self, t: float | np.ndarray, T: float | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns P(0,t) and P(0,T), broadcast, from one interpolator pass"""
+        t, T = np.broadcast_arrays(
+            np.asarray(t, dtype=np.float64), np.asarray(T, dtype=np.float64)
+        )
+        disc_facts = self.interpolator(np.stack([t, T]))
+        return disc_facts[0], disc_facts[1]
+
     @staticmethod
     def rate_curve(
         trade_ccy: Currency,
         collateral_ccy: Currency,
-        times: np.ndarray[Union[dt.date, float]],
+        times: np.ndarray[Union[np.datetime64, dt.date, float]],
         rates: np.ndarray[float],
-        anchor_date: Optional[dt.date],
+        anchor_date: Optional[dt.date] = None,
+        day_count: DayCountConvention = DayCountConvention.ACT_365_FIXED,
     ):
         """Creates a discounting curve given an array of times
-        and annually compounded spot interest rates, assuming Act/365 basis
+        and annually compounded spot interest rates, by default on an Act/365 basis
 
         Args:
             trade_ccy (Currency): The trade currency.
             collateral_ccy (Currency): The collateral currency.
-            times (np.ndarray[Union[dt.date, float]]): An array of dates/times.
+            times (np.ndarray[Union[np.datetime64, dt.date, float]]): An array
+                of year fractions, or of dates (datetime64 or dt.date).
             rates (np.ndarray[float]): An array of spot interest rates
-            anchor_date (Optional[dt.date]): The anchor date (time 0)
+            anchor_date (Optional[dt.date]): The anchor date (time 0), required
+                if times are dates.
+            day_count (DayCountConvention): The day count convention used to
+                convert dates to year fractions.
         """
-        if isinstance(times, np.ndarray[dt.date]):
-            times = (times - anchor_date).days() / 365.0
+        times = np.asarray(times)
+        if np.issubdtype(times.dtype, np.datetime64) or times.dtype == object:
+            if anchor_date is None:
+                raise ValueError("anchor_date is required when times are dates")
+            times = year_fractions(anchor_date, times, day_count)
 
         dfs = 1 / ((1.0 + rates) ** times)
         times = np.concat([[0.0], times])
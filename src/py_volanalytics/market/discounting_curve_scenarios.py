@@ -0,0 +1,201 @@
+"""Discounting Curve Scenarios.
+
+The ``DiscountingCurveScenarios`` object stores a matrix of discount factors, one
+row per scenario, on a time grid shared by all scenarios. This allows us to
+evaluate hundreds of shocked curves in a single vectorized call, instead of
+building and validating one ``DiscountingCurve`` per scenario.
+
+The shock helpers return continuously compounded zero rate shifts of shape
+(n_scenarios, n_times), to be applied with ``DiscountingCurveScenarios.from_curve``.
+
+Example usage:
+    curve = DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+    scenarios = DiscountingCurveScenarios.from_curve(
+        curve, parallel_shifts(curve.times, np.linspace(-0.01, 0.01, 201))
+    )
+    scenarios.df(0.0, np.array([1.0, 2.0, 5.0]))  # shape (201, 3)
+
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+import attrs
+from attrs import define, field
+from py_volanalytics.market.discounting_curve import (
+    DiscountingCurve,
+    DiscountingCurveId,
+)
+from py_volanalytics.math.interpolator import (
+    InterpolationType,
+    InterpolationWeights,
+)
+
+
+@define(kw_only=True)
+class DiscountingCurveScenarios:
+    """Class to represent many scenarios of a discounting curve on a shared time grid."""
+
+    _times: np.ndarray = field(alias="times")
+    _discount_factors: np.ndarray = field(alias="discount_factors")
+    _interpolation_type: InterpolationType = field(
+        default=InterpolationType.LOG_LINEAR_INTERPOLATION,
+        validator=attrs.validators.instance_of(InterpolationType),
+        alias="interapolation_type",
+    )
+    _curve: Optional[DiscountingCurve] = field(default=None, alias="curve")
+    _weights: OrderedDict = field(factory=OrderedDict, init=False)
+
+    @_times.validator
+    def validate_times(self, attributes, values):
+        """Validate array of times."""
+        if not isinstance(values, np.ndarray) or values.ndim != 1:
+            raise TypeError("times must be a 1-D numpy ndarray")
+
+        if len(values) <= 1:
+            raise ValueError("array of time values must be of length >= 2")
+
+        if np.any(values[1:] < values[:-1]):
+            raise ValueError("array of time values is not sorted")
+
+    @_discount_factors.validator
+    def validate_discount_factors(self, attributes, values):
+        """Validate the matrix of discount factors."""
+        if not isinstance(values, np.ndarray) or values.ndim != 2:
+            raise TypeError("discount_factors must be a 2-D numpy ndarray")
+
+        if values.shape[1] != len(self._times):
+            raise ValueError(
+                "discount_factors must have shape (number of scenarios, length of times)"
+            )
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times
+
+    @property
+    def discount_factors(self) -> np.ndarray:
+        return self._discount_factors
+
+    @property
+    def num_scenarios(self) -> int:
+        return self._discount_factors.shape[0]
+
+    def df(self, t: float | np.ndarray, T: float | np.ndarray) -> np.ndarray:
+        """Returns the discount factors P(t,T) of every scenario
+
+        ``t`` and ``T`` may be arrays and are broadcast against each other. All
+        scenarios are interpolated with one set of interpolation weights, in a
+        single matrix product.
+
+        Returns:
+            np.ndarray: the discount factors, of shape (n_scenarios,) + the
+            broadcast shape of ``t`` and ``T``.
+        """
+        t, T = np.broadcast_arrays(
+            np.asarray(t, dtype=np.float64), np.asarray(T, dtype=np.float64)
+        )
+        disc_facts = self.weights(np.stack([t, T]))(self._discount_factors)
+        disc_facts = disc_facts.reshape((self.num_scenarios, 2) + t.shape)
+        return disc_facts[:, 1] / disc_facts[:, 0]
+
+    def weights(self, times: np.ndarray) -> InterpolationWeights:
+        """Returns the interpolation weights of the time grid at the given times
+
+        The weights do not depend on the scenarios, so they can be reused to
+        evaluate the same times again, e.g. ``weights(scenarios.discount_factors)``
+        gives P(0,t) for every scenario. The weights of the last few time grids
+        are cached, so repeated ``df`` calls on the same times skip building
+        them.
+        """
+        return InterpolationWeights.cached(
+            self._weights,
+            interpolation_type=self._interpolation_type,
+            x_values=self._times,
+            query_points=np.ravel(times),
+            extrapolate=True,
+        )
+
+    @property
+    def curve(self) -> Optional[DiscountingCurve]:
+        """The shocked curve, if the scenarios were created from a curve"""
+        return self._curve
+
+    def scenario(
+        self, index: int, curve_id: Optional[DiscountingCurveId] = None
+    ) -> DiscountingCurve:
+        """Returns a single scenario as a DiscountingCurve
+
+        The scenario keeps the settings of the shocked curve, and its id unless
+        ``curve_id`` is given.
+
+        Raises:
+            ValueError: if the scenarios were not created from a curve.
+        """
+        if self._curve is None:
+            raise ValueError("Scenario curves need the shocked curve, see from_curve")
+        return self._curve.with_discount_factors(
+            self._discount_factors[index], curve_id=curve_id
+        )
+
+    @staticmethod
+    def from_curve(
+        curve: DiscountingCurve, zero_rate_shifts: np.ndarray
+    ) -> "DiscountingCurveScenarios":
+        """Creates scenarios by shocking the zero rates of a discounting curve
+
+        P_s(0,t_k) = P(0,t_k) e^{-shift_{s,k} t_k}
+
+        Args:
+            curve (DiscountingCurve): The base curve.
+            zero_rate_shifts (np.ndarray): Continuously compounded zero rate
+                shifts of shape (n_scenarios, n_times), see ``parallel_shifts``,
+                ``twist_shifts`` and ``bucket_shifts``.
+        """
+        times = curve.times
+        discount_factors = curve.discount_factors * np.exp(
+            -np.asarray(zero_rate_shifts, dtype=np.float64) * times
+        )
+        return DiscountingCurveScenarios(
+            times=times,
+            discount_factors=discount_factors,
+            interapolation_type=curve.interpolation_type,
+            curve=curve,
+        )
+
+
+def parallel_shifts(times: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """Parallel zero rate shifts, one scenario per shift
+
+    Args:
+        times (np.ndarray): The time grid of the curve.
+        shifts (np.ndarray): The shift of every scenario.
+    """
+    shifts = np.asarray(shifts, dtype=np.float64)
+    return np.broadcast_to(shifts[:, np.newaxis], (len(shifts), len(times))).copy()
+
+
+def twist_shifts(
+    times: np.ndarray, short_shifts: np.ndarray, long_shifts: np.ndarray
+) -> np.ndarray:
+    """Twists of the zero rates, linear in time between the first and last time
+
+    Args:
+        times (np.ndarray): The time grid of the curve.
+        short_shifts (np.ndarray): The shift at the first time, per scenario.
+        long_shifts (np.ndarray): The shift at the last time, per scenario.
+    """
+    short_shifts = np.asarray(short_shifts, dtype=np.float64)[:, np.newaxis]
+    long_shifts = np.asarray(long_shifts, dtype=np.float64)[:, np.newaxis]
+    weights = (times - times[0]) / (times[-1] - times[0])
+    return short_shifts + (long_shifts - short_shifts) * weights
+
+
+def bucket_shifts(times: np.ndarray, size: float = 1e-4) -> np.ndarray:
+    """Bucketed zero rate shifts, scenario k bumps only the k-th time
+
+    Args:
+        times (np.ndarray): The time grid of the curve.
+        size (float): The size of the bump, 1bp by default.
+    """
+    return size * np.eye(len(times))
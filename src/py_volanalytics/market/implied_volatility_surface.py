@@ -2,5 +2,16 @@
 
 from typing import Optional
 import attrs
-from attrs import define, field
+from attrs import define, field, frozen
+from py_volanalytics.valuation_framework.market_data import MarketObjectId
 
+
+@frozen(kw_only=True, cache_hash=True)
+class ImpliedVolatilitySurfaceId(MarketObjectId):
+    """Class to represent an implied volatility surface identifier"""
+
+    _symbol: str = field(validator=attrs.validators.instance_of(str), alias="symbol")
+
+    @property
+    def symbol(self):
+        return self._symbol
@@ -2,7 +2,7 @@
 
 from typing import Optional, List, Any
 import attrs
-from attrs import define, field
+from attrs import define, field, frozen
 from py_volanalytics.valuation_framework.market_data import (
     MarketObjectId,
     MarketObject,
@@ -15,7 +15,7 @@ from py_volanalytics.types.enums import (
 )
 
 
-@define(kw_only=True)
+@frozen(kw_only=True, cache_hash=True)
 class OptionQuotesId(MarketObjectId):
     """Class to represent a European Vanilla Option quote identifier"""
 
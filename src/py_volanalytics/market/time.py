@@ -3,13 +3,13 @@
 import datetime
 from typing import Optional, List
 import attrs
-from attrs import define, field
+from attrs import define, field, frozen
 
 from py_volanalytics.valuation_framework.market_data import MarketObjectId, MarketObject
 from py_volanalytics.types.enums import TimeInfo, MarketObjects
 
 
-@define(kw_only=True)
+@frozen(kw_only=True, cache_hash=True)
 class TimeObjectId(MarketObjectId):
     """Class to represent a Time object identifier"""
 
@@ -3,9 +3,11 @@ A collection of Interpolators.
 
 Interpolator objects are initiated with:
 
-    x_values : sorted list of numerical values
+    x_values : sorted list of numerical values or dates
     y_values : list of numerical values
     extrapolate : boolean if object should return value if the call is outside the range
+    anchor : optional date at which the year fraction axis of date x_values is zero,
+        defaults to the first date
 
 Example usage:
     x_values = [1, 2, 4, ]
@@ -17,11 +19,24 @@ Example usage:
     )
     print([interpolator(x) for x in range(8)])
         >>[2.0, 2.0, 8.0, 6.25, 4.5, 4.5, 4.5, 4.5]
+    print(interpolator(np.arange(8)))
+        >>[2.   2.   8.   6.25 4.5  4.5  4.5  4.5 ]
 
 Base abstract class:
     Interpolator
 Concrete implementations:
     LinearInterpolator
+    LogLinearInterpolator
+    CubicSplineInterpolator
+    HermiteCubicSplineInterpolator
+2-D implementations:
+    VolatilitySurfaceInterpolator
+
+All interpolators fit their coefficients once at construction, so a call only
+locates the interval and evaluates the stored polynomial. The same coefficients
+give analytic first and second derivatives through ``Interpolator.derivative``.
+The per-call cost against the number of knots is measured in
+``benchmarks/core.py``.
 
 References:
 [Building curves using Area Preserving Quadratic Splines](https://www.researchgate.net/publication/325132236_Building_Curves_Using_Area_Preserving_Quadratic_Splines), Hagan, 2018
@@ -29,20 +44,28 @@ References:
 
 """
 
+import copy
 import numpy as np
 import datetime as dt
+from bisect import bisect_right
+from collections import OrderedDict
 from abc import ABC, abstractmethod
-from enum import Enum, IntEnum, StrEnum
-from typing import List, cast, Optional
+from enum import IntEnum, StrEnum
+from typing import Any, Dict, List, Optional
+import attrs
 from attrs import define, field
-import matplotlib.pyplot as plt
-import scienceplots
-import math
-
-plt.style.use("science")
 
+from py_volanalytics.math import kernels
 from py_volanalytics.types.var_types import NumericType
 
+DAYS_IN_YEAR = 365.0
+_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+
+
+def _is_date_like(x: Any) -> bool:
+    """Check if an x value is a date, to be mapped to a year fraction axis."""
+    return isinstance(x, (dt.date, np.datetime64))
+
 
 class InterpolationType(StrEnum):
     LINEAR_INTERPOLATION = "Linear Interpolation"
@@ -83,6 +106,10 @@ class Interpolator(ABC):
         alias="extrapolate",
         default=False,
     )
+    _anchor: Optional[dt.date] = field(alias="anchor", default=None)
+    _anchor_day: Optional[int] = field(init=False, default=None)
+    _knots: np.ndarray = field(init=False)
+    _knot_list: List[float] = field(init=False)
 
     @_xs.validator
     def check_x_values(self, attribute, values):  # pylint: disable=W0613
@@ -91,10 +118,10 @@ class Interpolator(ABC):
             raise ValueError("list of x values is empty.")
         if len(values) == 1:
             return
-        zero_point = dt.timedelta(0) if isinstance(values[0], dt.date) else 0
-        for i in range(len(values) - 1):
-            if values[i + 1] - values[i] < zero_point:
-                raise ValueError("List of x values is not sorted")
+        dtype = "datetime64[D]" if _is_date_like(values[0]) else np.float64
+        x_values = np.asarray(values, dtype=dtype)
+        if np.any(x_values[1:] < x_values[:-1]):
+            raise ValueError("List of x values is not sorted")
 
     @_ys.validator
     def check_y_values(self, attribute, values):  # pylint: disable=W0613
@@ -112,35 +139,222 @@ class Interpolator(ABC):
         """Get y values."""
         return [float(x) for x in self._ys]
 
+    @property
+    def anchor(self) -> Optional[dt.date]:
+        """Get the date at which the year fraction axis of date knots is zero."""
+        if self._anchor_day is None:
+            return None
+        return dt.date.fromordinal(self._anchor_day + _EPOCH_ORDINAL)
+
     @property
     def is_extrapolator(self) -> bool:
         """Check if object extrapolates."""
         return self._extrapolate
 
+    def __attrs_post_init__(self):
+        if _is_date_like(self._xs[0]):
+            # date knots live on a year fraction axis, fixed once here
+            anchor = self._anchor if self._anchor is not None else self._xs[0]
+            self._anchor_day = int(np.datetime64(anchor, "D").astype(np.int64))
+        self._knots = self._to_knot_axis(self._xs)
+        # python floats bisect much faster than numpy scalars
+        self._knot_list = self._knots.tolist()
+        self._fit()
+
     @abstractmethod
-    def __call__(self, x: float | dt.date) -> float:
-        """Call to get interpolated y value."""
+    def _fit(self):
+        """Fit the interpolation coefficients from the knots."""
+
+    @abstractmethod
+    def _evaluate_interval(
+        self, index: int | np.ndarray, dx: float | np.ndarray
+    ) -> float | np.ndarray:
+        """Evaluate the fitted polynomial of interval ``index`` at offset ``dx``.
+
+        Works elementwise on arrays of indices and offsets.
+        """
+
+    @abstractmethod
+    def _evaluate_kernel(self, t: np.ndarray) -> np.ndarray:
+        """Evaluate at a 1-D array of knot axis values, extrapolating constantly."""
+
+    @abstractmethod
+    def _evaluate_scalar_kernel(self, t: float, hint: int) -> tuple[float, int]:
+        """Evaluate at a knot axis value by a compiled kernel, trying the interval
+        ``hint`` first. Returns the value and the interval, negative outside."""
+
+    @abstractmethod
+    def _derivative_interval(
+        self, index: int | np.ndarray, dx: float | np.ndarray, order: int
+    ) -> float | np.ndarray:
+        """Evaluate the ``order``-th derivative of the polynomial of interval
+        ``index`` at offset ``dx``."""
+
+    def __call__(self, x: float | dt.date | np.ndarray) -> float | np.ndarray:
+        """Call to get interpolated y value.
+
+        Array-like inputs are dispatched to ``evaluate``. With the NUMBA kernel
+        backend, scalars are evaluated by a compiled kernel.
+        """
+        # np.ndim costs more than a scalar evaluation, plain scalars skip it
+        if not isinstance(x, (float, int, dt.date)) and np.ndim(x) > 0:
+            return self.evaluate(x)
+
+        t = self._to_knot_value(x)
+        if kernels.get_backend() == kernels.KernelBackend.NUMBA:
+            return self._evaluate_compiled(t, 0)[0]
+        return self._evaluate_at(self._find_index(t), t)
+
+    def derivative(
+        self, x: float | dt.date | np.ndarray, order: int = 1
+    ) -> float | np.ndarray:
+        """Analytic first or second derivative dy/dx, d^2y/dx^2 of the interpolant.
+
+        The derivative is taken from the fitted coefficients, so there is no
+        bump-and-revalue noise. Date x values are differentiated per year
+        fraction. At a knot the derivative of the interval to the right is
+        returned. As in ``evaluate``, the interpolated range is [x_0, x_n): the
+        last knot starts the constant extrapolation region, where the
+        derivative is zero, and is rejected by non-extrapolators.
+
+        Args:
+            x (float | dt.date | np.ndarray): query point(s).
+            order (int): 1 for dy/dx, 2 for d^2y/dx^2.
+
+        Returns:
+            float | np.ndarray: a float for scalar input, an array otherwise.
+        """
+        if order not in (1, 2):
+            raise ValueError(f"Derivative order must be 1 or 2, got {order}.")
+
+        t = self._to_knot_axis(x)
+        knots = self._knots
+
+        outside = (t < knots[0]) | (t >= knots[-1])
+        if not self.is_extrapolator and np.any(outside):
+            raise ValueError(
+                "Given range outside of interpolated range to non-extrapolator."
+            )
+
+        index = np.clip(np.searchsorted(knots, t, side="right") - 1, 0, len(self) - 2)
+        result = np.where(
+            outside, 0.0, self._derivative_interval(index, t - knots[index], order)
+        )
+        return float(result) if np.ndim(x) == 0 else result
+
+    def cursor(self) -> "InterpolatorCursor":
+        """Get a stateful evaluator for queries arriving in sorted order.
+
+        The cursor remembers the last interval it visited, so a monotone sweep
+        over the x axis (e.g. time-stepping a PDE or a Monte Carlo path) costs
+        amortized O(1) per lookup instead of a binary search.
+        """
+        return InterpolatorCursor(interpolator=self)
+
+    def _evaluate_at(self, index: int, t: float) -> float:
+        """Evaluate at the knot axis value ``t`` lying in interval ``index``."""
+        # negative index mean outside range
+        if index < 0 and not self.is_extrapolator:
+            raise ValueError(
+                "Given range outside of interpolated range to non-extrapolator."
+            )
+        match index:
+            case ExtrapolateIndex.FRONT:
+                result = self._ys[0]
+            case ExtrapolateIndex.BACK:
+                result = self._ys[-1]
+            case _:
+                result = self._evaluate_interval(index, t - self._knot_list[index])
+        # enforce float -> float signature of interpolator
+        return float(result)
+
+    def _evaluate_compiled(self, t: float, hint: int) -> tuple[float, int]:
+        """Evaluate at the knot axis value ``t`` by the scalar kernel."""
+        value, index = self._evaluate_scalar_kernel(t, hint)
+        if index < 0 and not self.is_extrapolator:
+            raise ValueError(
+                "Given range outside of interpolated range to non-extrapolator."
+            )
+        return float(value), int(index)
+
+    def evaluate(
+        self, x_values: np.ndarray | List[float] | List[dt.date]
+    ) -> np.ndarray:
+        """Vectorized evaluation of the interpolator.
+
+        The array is evaluated in a single pass by the kernels of
+        ``py_volanalytics.math.kernels``: with NumPy, the intervals are located
+        with ``np.searchsorted`` and the constant extrapolation is applied with
+        masks; with numba, by a compiled loop. Gives the same results as the
+        scalar call.
+
+        Args:
+            x_values (np.ndarray | List[float] | List[dt.date]): query points.
+
+        Returns:
+            np.ndarray: interpolated values, with the shape of ``x_values``.
+        """
+        t = self._to_knot_axis(x_values)
+        knots = self._knots
+
+        if not self.is_extrapolator and (
+            np.any(t < knots[0]) or np.any(t >= knots[-1])
+        ):
+            raise ValueError(
+                "Given range outside of interpolated range to non-extrapolator."
+            )
+
+        return self._evaluate_kernel(np.ravel(t)).reshape(t.shape)
 
     def __len__(self):
         """Get length of interpolator."""
         # unambiguous since we validated equal len
         return len(self._xs)
 
-    def _find_index(self, x: float) -> int:
-        """Helper function to get the adjacent index."""
-        if x < self._xs[0]:
+    def _find_index(self, t: float, hint: Optional[int] = None) -> int:
+        """Helper function to get the adjacent index.
+
+        Binary search over the knot axis, O(log n). If ``hint`` is given, the
+        hinted interval and its right neighbour are tried first, which makes
+        sorted sweeps O(1).
+        """
+        knots = self._knot_list
+        if t < knots[0]:
             return ExtrapolateIndex.FRONT
-        for i in range(len(self) - 1):
-            if self._xs[i] <= x < self._xs[i + 1]:
-                return i
-        return ExtrapolateIndex.BACK
-
-    def _convert_to_float(self, delta: float | dt.timedelta) -> float:
-        """Convert the potential time delta to year fraction float."""
-        if isinstance(delta, dt.timedelta):
-            # convert to year fraction, assume daily granularity
-            delta = delta.days / 365
-        return cast(float, delta)
+        if t >= knots[-1]:
+            return ExtrapolateIndex.BACK
+        if hint is not None and 0 <= hint < len(knots) - 1:
+            if knots[hint] <= t < knots[hint + 1]:
+                return hint
+            if hint + 2 < len(knots) and knots[hint + 1] <= t < knots[hint + 2]:
+                return hint + 1
+        return bisect_right(knots, t) - 1
+
+    def _to_knot_value(self, x: float | dt.date | np.datetime64) -> float:
+        """Map a single x value to the float axis of the knots."""
+        if self._anchor_day is None:
+            return float(x)
+        if isinstance(x, dt.date):
+            return (x.toordinal() - _EPOCH_ORDINAL - self._anchor_day) / DAYS_IN_YEAR
+        return float(self._to_knot_axis(x))
+
+    def _to_knot_axis(
+        self, x_values: np.ndarray | List[float] | List[dt.date]
+    ) -> np.ndarray:
+        """Map x values to the float axis of the knots.
+
+        Date values (``dt.date``, ``dt.datetime`` or ``np.datetime64``) are
+        converted in bulk to year fractions from the anchor date, assuming daily
+        granularity and an Act/365 basis.
+        """
+        if self._anchor_day is None:
+            return np.asarray(x_values, dtype=np.float64)
+        days = np.asarray(x_values, dtype="datetime64[D]").astype(np.int64)
+        return (days - self._anchor_day) / DAYS_IN_YEAR
+
+    def _knot_spacings(self) -> np.ndarray:
+        """Helper function to get the interval widths as year fraction floats."""
+        return np.diff(self._knots)
 
     def plot(
         self,
@@ -149,243 +363,403 @@ class Interpolator(ABC):
         y_label: Optional[str] = None,
     ):
         """Helper function to plot an interpolated curve"""
+        # imported here to keep matplotlib out of the numeric core
+        from py_volanalytics.plotting.curve_plots import plot_curve
+
         x_values = np.linspace(
             start=self._xs[0], stop=self._xs[-1], num=len(self) * 100
         )
-        y_values = [self(x) for x in x_values]
-        xlabel = x_label if x_label is not None else r"$x$"
-        ylabel = y_label if y_label is not None else r"$y$"
-        title = title if title is not None else r"Interpolated curve $y(x)$"
-        plt.figure(figsize=(8, 6))
-        plt.title(title)
-        plt.xlabel(xlabel=xlabel)
-        plt.ylabel(ylabel=ylabel)
+        plot_curve(
+            x_values,
+            self.evaluate(x_values),
+            title=title,
+            x_label=x_label,
+            y_label=y_label,
+        )
 
-        plt.plot(x_values, y_values)
-        plt.show()
 
+@define(kw_only=True)
+class InterpolatorCursor:
+    """Stateful evaluator for queries arriving in (mostly) sorted order.
 
-class LinearInterpolator(Interpolator):
-    """Interpolator using linear interpolation, constant extrapolation."""
+    Example usage:
+        cursor = interpolator.cursor()
+        ys = [cursor(t) for t in time_steps]
+    """
+
+    _interpolator: Interpolator = field(alias="interpolator")
+    _index: int = field(default=0, init=False)
+
+    @property
+    def index(self) -> int:
+        """Get the interval visited last."""
+        return self._index
 
     def __call__(self, x: float | dt.date) -> float:
         """Call to get interpolated y value."""
-        index = self._find_index(x)
+        interpolator = self._interpolator
+        t = interpolator._to_knot_value(x)
+        if kernels.get_backend() == kernels.KernelBackend.NUMBA:
+            value, index = interpolator._evaluate_compiled(t, self._index)
+        else:
+            index = interpolator._find_index(t, hint=self._index)
+            value = interpolator._evaluate_at(index, t)
+        if index >= 0:
+            self._index = index
+        return value
+
+    def reset(self):
+        """Restart the sweep from the first interval."""
+        self._index = 0
 
-        # negative index mean outside range
-        if index < 0 and not self.is_extrapolator:
-            raise ValueError(
-                "Given range outside of interpolated range to non-extrapolator."
-            )
-        match index:
-            case ExtrapolateIndex.FRONT:
-                result = self._ys[0]
-            case ExtrapolateIndex.BACK:
-                result = self._ys[-1]
-            case _:
-                x_delta = self._convert_to_float(self._xs[index + 1] - self._xs[index])
-                y_delta = self._ys[index + 1] - self._ys[index]
-                slope = y_delta / x_delta
-                result = (
-                    self._ys[index]
-                    + self._convert_to_float(x - self._xs[index]) * slope
-                )
-        # enforce float -> float signature of interpolator
-        return float(result)
 
+@define(kw_only=True)
+class LinearInterpolator(Interpolator):
+    """Interpolator using linear interpolation, constant extrapolation."""
+
+    _intercepts: np.ndarray = field(init=False)
+    _slopes: np.ndarray = field(init=False)
+
+    def _fit(self):
+        """Fit the slope of every interval once."""
+        h = self._knot_spacings()
+        self._intercepts = np.asarray(self._ys, dtype=np.float64)
+        self._slopes = np.diff(self._intercepts) / h
+
+    def _evaluate_interval(self, index, dx):
+        return self._intercepts[index] + dx * self._slopes[index]
+
+    def _evaluate_kernel(self, t):
+        return kernels.evaluate_linear(
+            self._knots,
+            self._intercepts,
+            self._slopes,
+            float(self._ys[0]),
+            float(self._ys[-1]),
+            t,
+        )
+
+    def _evaluate_scalar_kernel(self, t, hint):
+        return kernels.evaluate_linear_scalar(
+            self._knots,
+            self._intercepts,
+            self._slopes,
+            float(self._ys[0]),
+            float(self._ys[-1]),
+            t,
+            hint,
+        )
+
+    def _derivative_interval(self, index, dx, order):
+        if order == 1:
+            return self._slopes[index] + 0.0 * dx
+        return np.zeros_like(dx, dtype=np.float64)
 
+
+@define(kw_only=True)
 class LogLinearInterpolator(Interpolator):
     """Interpolator using log-linear interpolation, constant extrapolation."""
 
-    def __call__(self, x: float | dt.date) -> float:
-        """Call to get the interpolated y value"""
+    _log_ys: np.ndarray = field(init=False)
+    _log_slopes: np.ndarray = field(init=False)
+
+    def _fit(self):
+        """Fit the log y values and the slope of every interval once."""
+        h = self._knot_spacings()
+        self._log_ys = np.log(np.asarray(self._ys, dtype=np.float64))
+        self._log_slopes = np.diff(self._log_ys) / h
+
+    def _evaluate_interval(self, index, dx):
+        return np.exp(self._log_ys[index] + dx * self._log_slopes[index])
+
+    def _evaluate_kernel(self, t):
+        return kernels.evaluate_log_linear(
+            self._knots,
+            self._log_ys,
+            self._log_slopes,
+            float(self._ys[0]),
+            float(self._ys[-1]),
+            t,
+        )
 
-        index = self._find_index(x)
+    def _evaluate_scalar_kernel(self, t, hint):
+        return kernels.evaluate_log_linear_scalar(
+            self._knots,
+            self._log_ys,
+            self._log_slopes,
+            float(self._ys[0]),
+            float(self._ys[-1]),
+            t,
+            hint,
+        )
 
-        match index:
-            case ExtrapolateIndex.FRONT:
-                result = self._ys[0]
-            case ExtrapolateIndex.BACK:
-                result = self._ys[-1]
-            case _:
-                x_delta = self._xs[index + 1] - self._xs[index]
-                log_result_df = (x - self._xs[index]) / x_delta * math.log(
-                    self._ys[index + 1]
-                ) + (self._xs[index + 1] - x) / x_delta * math.log(self._ys[index])
-                result = math.exp(log_result_df)
-        # enforce float -> float signature of interpolator
-        return float(result)
+    def _derivative_interval(self, index, dx, order):
+        # y = exp(l + s dx) => y' = s y, y'' = s^2 y
+        return self._log_slopes[index] ** order * self._evaluate_interval(index, dx)
 
 
-class CubicSplineInterpolator(Interpolator):
-    """The cubic-spline method with so-called natural boundary conditions."""
+@define(kw_only=True)
+class CubicInterpolator(Interpolator):
+    """Base class for piecewise cubic interpolators.
 
-    def __call__(
-        self,
-        x: float | dt.date,
-        boundary_condition: BoundaryCondition = BoundaryCondition.NATURAL_CUBIC_SPLINE,
-    ) -> float:
-        """Call to get interpolated y value."""
-        index = self._find_index(x)
+    On the interval :math:`[x_j, x_{j+1})` the interpolant is
 
-        # negative index mean outside range
-        if index < 0 and not self.is_extrapolator:
-            raise ValueError(
-                "Given range outside of interpolated range to non-extrapolator."
-            )
-        match index:
-            case ExtrapolateIndex.FRONT:
-                result = self._ys[0]
-            case ExtrapolateIndex.BACK:
-                result = self._ys[-1]
-            case _:
-                n = len(self) - 1  # n is the index of the last data-point.
-                h = np.array([self._xs[j + 1] - self._xs[j] for j in range(n)])
-                a = np.array(self._ys[: n + 1])
-
-                # We are interested to solve the system Ux = v.
-                v = np.concat(
-                    [
-                        [0],
-                        [
-                            (
-                                3 / h[j] * (a[j + 1] - a[j])
-                                - 3 / h[j - 1] * (a[j] - a[j - 1])
-                            )
-                            for j in range(1, n)
-                        ],
-                        [0],
-                    ],
-                    axis=0,
-                )
-
-                # U is a tridiagonal matrix
-                U = np.zeros(shape=(n + 1, n + 1))
-                U[0][0] = 1.0
-                U[n][n] = 1.0
-                for i in range(1, n):
-                    U[i][i - 1] = h[i - 1]  # elements below the diagonal
-                    U[i][i] = 2 * (h[i - 1] + h[i])  # principal diagonal element
-                    U[i][i + 1] = h[i]  # elements above the diagonal
-
-                c = np.linalg.solve(U, v)
-
-                b = np.array(
-                    [
-                        (
-                            1.0 / h[j] * (a[j + 1] - a[j])
-                            - h[j] / 3.0 * (2 * c[j] + c[j + 1])
-                        )
-                        for j in range(n)
-                    ]
-                )
-
-                d = np.array([(c[j + 1] - c[j]) / (3 * h[j]) for j in range(n)])
-
-                result = (
-                    a[index]
-                    + b[index] * (x - self._xs[index])
-                    + c[index] * (x - self._xs[index]) ** 2
-                    + d[index] * (x - self._xs[index]) ** 3
-                )
+    .. math::
 
-        return float(result)
+        y(x) = a_j + b_j (x - x_j) + c_j (x - x_j)^2 + d_j (x - x_j)^3
 
+    The coefficients are fitted once by ``_fit_coefficients`` at construction,
+    so evaluation is a lookup of the interval followed by a Horner step.
+    """
 
-class HermiteCubicSplineInterpolator(Interpolator):
-    """The hermite cubic-spline method with so-called natural boundary conditions."""
+    _a: np.ndarray = field(init=False)
+    _b: np.ndarray = field(init=False)
+    _c: np.ndarray = field(init=False)
+    _d: np.ndarray = field(init=False)
+    _sensitivities: Optional[tuple[np.ndarray, ...]] = field(init=False, default=None)
 
-    def __call__(
+    def _fit(self):
+        self._a, self._b, self._c, self._d = self._fit_coefficients(
+            self._knot_spacings(), np.asarray(self._ys, dtype=np.float64)
+        )
+
+    @abstractmethod
+    def _fit_coefficients(
+        self, h: np.ndarray, y: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return the (a, b, c, d) coefficients of every interval.
+
+        ``y`` has shape (n_knots,) or (n_knots, k); in the latter case every
+        column is fitted and the coefficients have shape (n_intervals, k).
+        """
+
+    def _evaluate_interval(self, index, dx):
+        return self._a[index] + dx * (
+            self._b[index] + dx * (self._c[index] + dx * self._d[index])
+        )
+
+    def _evaluate_kernel(self, t):
+        return kernels.evaluate_cubic(
+            self._knots,
+            self._a,
+            self._b,
+            self._c,
+            self._d,
+            float(self._ys[0]),
+            float(self._ys[-1]),
+            t,
+        )
+
+    def _evaluate_scalar_kernel(self, t, hint):
+        return kernels.evaluate_cubic_scalar(
+            self._knots,
+            self._a,
+            self._b,
+            self._c,
+            self._d,
+            float(self._ys[0]),
+            float(self._ys[-1]),
+            t,
+            hint,
+        )
+
+    def _derivative_interval(self, index, dx, order):
+        if order == 1:
+            return self._b[index] + dx * (
+                2.0 * self._c[index] + 3.0 * dx * self._d[index]
+            )
+        return 2.0 * self._c[index] + 6.0 * dx * self._d[index]
+
+    def bump(self, bumps: Dict[int, float]) -> "CubicInterpolator":
+        """Get a copy of the interpolator with a few y values shifted.
+
+        The coefficients are linear in the y values, so the change in the
+        coefficients is the shifts times the columns of the (cached) coefficient
+        sensitivities. A bump therefore costs O(n) vector additions and skips
+        validation and refitting; the knots and the sensitivities are shared
+        with this interpolator.
+
+        Args:
+            bumps (Dict[int, float]): additive shift of the y value, keyed by
+                the index of the knot.
+        """
+        indices = np.fromiter(bumps.keys(), dtype=np.intp, count=len(bumps))
+        shifts = np.fromiter(bumps.values(), dtype=np.float64, count=len(bumps))
+        da, db, dc, dd = (
+            sensitivity[:, indices] @ shifts
+            for sensitivity in self.coefficient_sensitivities()
+        )
+
+        bumped = copy.copy(self)
+        bumped._ys = np.asarray(self._ys, dtype=np.float64).copy()
+        np.add.at(bumped._ys, indices, shifts)
+        bumped._a = self._a + da
+        bumped._b = self._b + db
+        bumped._c = self._c + dc
+        bumped._d = self._d + dd
+        return bumped
+
+    def coefficient_sensitivities(
         self,
-        x: float | dt.date,
-    ) -> float:
-        """Call to get interpolated y value."""
-        index = self.__find_index(x)
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Get the sensitivities of the coefficients to every y value.
+
+        The coefficients are linear in the y values, so the Jacobians are the
+        coefficients fitted to the identity matrix. They depend only on the
+        knots and are computed once, on first use.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: the Jacobians
+            da/dy, db/dy, dc/dy and dd/dy, each of shape (n_intervals, n_knots).
+        """
+        if self._sensitivities is None:
+            self._sensitivities = self._fit_coefficients(
+                self._knot_spacings(), np.eye(len(self))
+            )
+        return self._sensitivities
 
-        # negative index mean outside range
-        if index < 0 and not self.is_extrapolator:
-            raise ValueError(
-                "Given range outside of interpolated range to non-extrapolator."
+
+@define(kw_only=True)
+class _TridiagonalFactorization:
+    """LU factorization of a tridiagonal matrix (Thomas algorithm).
+
+    The factorization depends only on the matrix, so it is computed once in
+    O(n) and reused to solve for any number of right hand sides in O(n) each.
+    """
+
+    _lower: np.ndarray = field(alias="lower")
+    _upper_prime: np.ndarray = field(alias="upper_prime")
+    _denominators: np.ndarray = field(alias="denominators")
+
+    @staticmethod
+    def create(
+        lower: np.ndarray, diag: np.ndarray, upper: np.ndarray
+    ) -> "_TridiagonalFactorization":
+        """Factorize a tridiagonal matrix.
+
+        Args:
+            lower (np.ndarray): sub-diagonal, ``lower[i]`` multiplies ``x[i - 1]``.
+            diag (np.ndarray): principal diagonal.
+            upper (np.ndarray): super-diagonal, ``upper[i]`` multiplies ``x[i + 1]``.
+        """
+        upper_prime, denominators = kernels.factorize_tridiagonal(lower, diag, upper)
+        return _TridiagonalFactorization(
+            lower=lower, upper_prime=upper_prime, denominators=denominators
+        )
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """Solve for a right hand side of shape (n,) or (n, k)."""
+        return kernels.solve_tridiagonal(
+            self._lower,
+            self._upper_prime,
+            self._denominators,
+            np.ascontiguousarray(rhs, dtype=np.float64),
+        )
+
+
+@define(kw_only=True)
+class CubicSplineInterpolator(CubicInterpolator):
+    """The cubic-spline method with so-called natural boundary conditions."""
+
+    _boundary_condition: BoundaryCondition = field(
+        default=BoundaryCondition.NATURAL_CUBIC_SPLINE,
+        alias="boundary_condition",
+    )
+
+    _factorization: Optional[_TridiagonalFactorization] = field(
+        init=False, default=None
+    )
+
+    def _fit(self):
+        h = self._knot_spacings()
+        if len(h) > 1:
+            # the system matrix depends only on the knots, factorize it once
+            self._factorization = _TridiagonalFactorization.create(
+                lower=h[:-1], diag=2.0 * (h[:-1] + h[1:]), upper=h[1:]
             )
-        match index:
-            case ExtrapolateIndex.FRONT:
-                result = self._ys[0]
-            case ExtrapolateIndex.BACK:
-                result = self._ys[-1]
-            case _:
-                n = len(self) - 1  # n is the index of the last data-point.
-                h = np.array([self._xs[j + 1] - self._xs[j] for j in range(n)])
-                a = np.array(self._ys[: n + 1])
-                m = np.array([(self._ys[i + 1] - self._ys[i]) / h[i] for i in range(n)])
-
-                b = np.concat(
-                    [
-                        1
-                        / (self._xs[2] - self._xs[0])
-                        * (
-                            (
-                                (self._xs[2] + self._xs[1] - 2 * self._xs[0])
-                                * (self._ys[1] - self._ys[0])
-                                / h[0]
-                            )
-                            - (h[0] * (self._ys[1] - self._ys[0]) / h[1])
-                        )
-                    ],
-                    [
-                        (1 / (self._xs[i + 1] - self._xs[i - 1]))
-                        * (
-                            h[i] * (self._ys[i] - self._ys[i]) / h[i - 1]
-                            - h[i - 1] * (self._ys[i + 1] - self._ys[i]) / h[i]
-                        )
-                        for i in range(1, n)
-                    ],
-                    [
-                        -1
-                        / (self._xs[n] - self._xs[n - 2])
-                        * (
-                            (h[n - 1] * (self._ys[n - 1] - self._ys[n - 2]) / h[n - 2])
-                            - (
-                                (2 * self._xs[n] - self._xs[n - 1] - self._xs[n - 2])
-                                * (self._ys[n] - self._ys[n - 1])
-                            )
-                        )
-                    ],
-                )
-
-                c = np.array(
-                    [
-                        (
-                            3 * (self._ys[i + 1] - self._ys[i]) / (h[i] ** 2)
-                            - (b[i + 1] + 2 * b[i]) / h[i]
-                        )
-                        for i in range(n)
-                    ]
-                )
-
-                d = np.array(
-                    [
-                        (b[i + 1] + b[i]) / (h[i] ** 2)
-                        - 2 * (self._ys[i + 1] - self._ys[i]) / (h[i] ** 3)
-                        for i in range(n)
-                    ]
-                )
-
-                result = (
-                    a[index]
-                    + b[index] * (x - self._xs[index])
-                    + c[index] * (x - self._xs[index]) ** 2
-                    + d[index] * (x - self._xs[index]) ** 3
-                )
+        super()._fit()
 
-        return float(result)
+    def _fit_coefficients(self, h: np.ndarray, y: np.ndarray):
+        """Fit the natural cubic spline.
+
+        The second derivatives vanish at both ends, c_0 = c_n = 0, which leaves
+        a tridiagonal system for the interior c_1, ..., c_{n-1}.
+        """
+        n = len(h)  # n is the index of the last data-point.
+        h = h.reshape(h.shape + (1,) * (y.ndim - 1))
+        a = y[:-1]
+        c = np.zeros(y.shape)
+
+        if n > 1:
+            slopes = np.diff(y, axis=0) / h
+            v = 3.0 * np.diff(slopes, axis=0)
+            c[1:n] = self._factorization.solve(v)
+
+        b = np.diff(y, axis=0) / h - h / 3.0 * (2.0 * c[:-1] + c[1:])
+        d = np.diff(c, axis=0) / (3.0 * h)
 
+        return a, b, c[:-1], d
 
-if __name__ == "__main__":
-    x = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0]
-    y = np.sin(x)
-    cs = CubicSplineInterpolator(x_values=x, y_values=y, extrapolate=True)
 
-    y_approx = [cs(x) for x in np.linspace(0.0, 10.0, 20, endpoint=True)]
+@define(kw_only=True)
+class HermiteCubicSplineInterpolator(CubicInterpolator):
+    """The hermite cubic-spline method with Bessel end-point slopes."""
+
+    # interval j depends on the y values of knots j - 1, ..., j + 2
+    SUPPORT = 4
+
+    def _fit_coefficients(self, h: np.ndarray, y: np.ndarray):
+        """Fit the Hermite spline with Bessel slopes (Hagan-West, 2006)."""
+        n = len(h)  # n is the index of the last data-point.
+        if n == 0:
+            raise ValueError("Hermite spline needs at least two x values.")
+        h = h.reshape(h.shape + (1,) * (y.ndim - 1))
+        m = np.diff(y, axis=0) / h
+
+        if n == 1:
+            # two knots, the Bessel slopes reduce to the straight line
+            b = np.array([m[0], m[0]])
+        else:
+            b = np.empty(y.shape)
+            b[0] = ((2.0 * h[0] + h[1]) * m[0] - h[0] * m[1]) / (h[0] + h[1])
+            b[1:n] = (h[1:] * m[:-1] + h[:-1] * m[1:]) / (h[:-1] + h[1:])
+            b[n] = ((2.0 * h[n - 1] + h[n - 2]) * m[n - 1] - h[n - 1] * m[n - 2]) / (
+                h[n - 1] + h[n - 2]
+            )
+
+        a = y[:-1]
+        c = (3.0 * m - b[1:] - 2.0 * b[:-1]) / h
+        d = (b[1:] + b[:-1] - 2.0 * m) / h**2
+
+        return a, b[:-1], c, d
+
+    def _local_weights(
+        self, index: np.ndarray, dx: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the weights of the knots supporting the intervals ``index``.
+
+        Any ``SUPPORT`` consecutive knots have distinct indices modulo
+        ``SUPPORT``, so fitting the indicators of the residue classes gives the
+        sensitivities of every interval to each of its knots in O(n).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the knot columns and their weights,
+            both of shape (n_queries, SUPPORT).
+        """
+        n = len(self)
+        support = min(self.SUPPORT, n)
+        residues = np.arange(n)[:, np.newaxis] % support == np.arange(support)
+        a, b, c, d = self._fit_coefficients(
+            self._knot_spacings(), residues.astype(np.float64)
+        )
+        dx = dx[:, np.newaxis]
+        weights = a[index] + dx * (b[index] + dx * (c[index] + dx * d[index]))
+
+        # the knot of residue r in the window of SUPPORT knots around the
+        # interval, shifted inside the knots at both ends
+        first = np.clip(index - 1, 0, n - support)[:, np.newaxis]
+        columns = first + (np.arange(support) - first) % support
+        return columns, weights
 
 
 interpolator_map = {
@@ -394,3 +768,469 @@ interpolator_map = {
     InterpolationType.HERMITE_CUBIC_SPLINE_INTERPOLATION: HermiteCubicSplineInterpolator,
     InterpolationType.LOG_LINEAR_INTERPOLATION: LogLinearInterpolator,
 }
+
+
+@define(kw_only=True)
+class InterpolationWeights:
+    """Sparse interpolation weights W for a fixed x-grid and fixed query points.
+
+    Every interpolator in this module is linear in the y values (log-linear
+    interpolation is linear in log y), so the interpolated values at the query
+    points are ``W @ ys``. W depends only on the x values and the query points,
+    so it is computed once and reused for any number of y vectors, e.g.
+    scenario-bumped discount curves or smiles sharing a strike grid.
+
+    The matrix is stored row-padded (ELLPACK): every query row keeps the
+    columns and weights of its few non-zero entries, e.g. two for linear and
+    four for Hermite interpolation. Dense matrices, such as those of the global
+    natural cubic spline, are applied with a BLAS matmul instead.
+
+    Example usage:
+        weights = InterpolationWeights.create(
+            interpolation_type=InterpolationType.LINEAR_INTERPOLATION,
+            x_values=[1.0, 2.0, 4.0],
+            query_points=np.arange(8),
+            extrapolate=True,
+        )
+        weights(np.array([[2.0, 8.0, 4.5], [1.0, 1.0, 1.0]]))
+    """
+
+    _shape: tuple[int, int] = field(alias="shape")
+    _columns: np.ndarray = field(alias="columns")
+    _weights: np.ndarray = field(alias="weights")
+    _log_space: bool = field(default=False, alias="log_space")
+    _dense: Optional[np.ndarray] = field(default=None, alias="dense")
+
+    # above this fill ratio the dense matmul beats the padded gather
+    DENSE_THRESHOLD = 0.5
+    # queries evaluated at once when filling a dense W
+    BLOCK_SIZE = 1024
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Get the (n_queries, n_knots) shape of W."""
+        return self._shape
+
+    @property
+    def nnz(self) -> int:
+        """Get the number of non-zero weights."""
+        return int(np.count_nonzero(self._weights))
+
+    def __call__(self, y_values: np.ndarray | List[float]) -> np.ndarray:
+        """Interpolate one or many curves at the query points.
+
+        Args:
+            y_values (np.ndarray | List[float]): knot values of shape (n_knots,)
+                or (n_curves, n_knots).
+
+        Returns:
+            np.ndarray: values of shape (n_queries,) or (n_curves, n_queries).
+        """
+        ys = np.asarray(y_values, dtype=np.float64)
+        if ys.shape[-1] != self._shape[1]:
+            raise ValueError(
+                f"Expected {self._shape[1]} y values per curve, got {ys.shape[-1]}."
+            )
+        if self._log_space:
+            ys = np.log(ys)
+
+        if self._dense is not None:
+            result = ys @ self._dense.T
+        else:
+            result = np.einsum("...qk,qk->...q", ys[..., self._columns], self._weights)
+
+        return np.exp(result) if self._log_space else result
+
+    def apply_transpose(self, values: np.ndarray | List[float]) -> np.ndarray:
+        """Compute ``values @ W``, pulling values at the queries back to the knots.
+
+        With W a Jacobian (see ``jacobian``), this maps gradients with respect to
+        the interpolated values to gradients with respect to the y values. The
+        log-space flag is ignored: the linear map W itself is applied.
+
+        Args:
+            values (np.ndarray | List[float]): values of shape (n_queries,) or
+                (n_curves, n_queries).
+
+        Returns:
+            np.ndarray: values of shape (n_knots,) or (n_curves, n_knots).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[-1] != self._shape[0]:
+            raise ValueError(
+                f"Expected {self._shape[0]} values per curve, got {values.shape[-1]}."
+            )
+        if self._dense is not None:
+            return values @ self._dense
+
+        # scatter-add every (query, knot) contribution into its knot
+        contributions = values[..., np.newaxis] * self._weights
+        result = np.zeros((self._shape[1],) + values.shape[:-1])
+        np.add.at(
+            result,
+            self._columns.ravel(),
+            np.moveaxis(contributions.reshape(values.shape[:-1] + (-1,)), -1, 0),
+        )
+        return np.moveaxis(result, 0, -1)
+
+    def jacobian(self, y_values: np.ndarray | List[float]) -> "InterpolationWeights":
+        """Get the Jacobian of the interpolated values with respect to the y values.
+
+        For schemes linear in y the Jacobian is W itself. For log-linear
+        interpolation, v_i = exp(sum_k W_ik log y_k), so the Jacobian
+        dv_i/dy_k = v_i W_ik / y_k has the sparsity pattern of W.
+
+        Args:
+            y_values (np.ndarray | List[float]): the knot values of shape
+                (n_knots,) at which to take the Jacobian.
+        """
+        if not self._log_space:
+            return self
+
+        ys = np.asarray(y_values, dtype=np.float64)
+        values = self(ys)
+        return InterpolationWeights(
+            shape=self._shape,
+            columns=self._columns,
+            weights=self._weights * values[:, np.newaxis] / ys[self._columns],
+            dense=(
+                None
+                if self._dense is None
+                else self._dense * values[:, np.newaxis] / ys[np.newaxis, :]
+            ),
+        )
+
+    def to_dense(self) -> np.ndarray:
+        """Get W as a dense (n_queries, n_knots) array."""
+        if self._dense is not None:
+            return self._dense.copy()
+        dense = np.zeros(self._shape)
+        rows = np.arange(self._shape[0])[:, np.newaxis]
+        np.add.at(dense, (rows, self._columns), self._weights)
+        return dense
+
+    @staticmethod
+    def create(
+        interpolation_type: InterpolationType,
+        x_values: List[NumericType] | List[dt.datetime] | np.ndarray,
+        query_points: np.ndarray | List[float] | List[dt.date],
+        extrapolate: bool = False,
+    ) -> "InterpolationWeights":
+        """Precompute the weights of an interpolation scheme at query points.
+
+        Row i of W holds the weights of the knots in the interval of query i.
+        Linear (and log-linear, applied to log y) interpolation weights the two
+        ends of the interval, and a Hermite interval depends on at most four
+        knots, so W is built directly in O(n_queries). Only the natural cubic
+        spline, whose intervals depend on every knot, is fitted to the
+        identity and stored dense.
+
+        Args:
+            interpolation_type (InterpolationType): the interpolation scheme.
+            x_values (List[NumericType] | List[dt.datetime] | np.ndarray): the
+                shared, sorted knots.
+            query_points (np.ndarray | List[float] | List[dt.date]): points at
+                which the curves will be interpolated.
+            extrapolate (bool): whether queries outside the knots are allowed.
+        """
+        log_space = interpolation_type == InterpolationType.LOG_LINEAR_INTERPOLATION
+        interpolator_class = (
+            LinearInterpolator
+            if log_space
+            else interpolator_map.get(interpolation_type)
+        )
+        if interpolator_class is None:
+            raise ValueError(f"Invalid interpolator type: {interpolation_type}")
+
+        n = len(x_values)
+        # fitted to dummy y values, for the validation and the knot axis
+        reference = interpolator_class(
+            x_values=x_values, y_values=np.ones(n), extrapolate=extrapolate
+        )
+        knots = reference._knots
+        t = np.ravel(reference._to_knot_axis(query_points))
+        front = t < knots[0]
+        back = t >= knots[-1]
+        if not extrapolate and (np.any(front) or np.any(back)):
+            raise ValueError(
+                "Given range outside of interpolated range to non-extrapolator."
+            )
+
+        index = np.clip(np.searchsorted(knots, t, side="right") - 1, 0, max(n - 2, 0))
+        dx = t - knots[index]
+
+        if interpolator_class is LinearInterpolator:
+            h = np.diff(knots)
+            w = dx / h[index] if n > 1 else np.zeros_like(t)
+            columns = np.column_stack([index, np.minimum(index + 1, n - 1)])
+            weights = np.column_stack([1.0 - w, w])
+        elif interpolator_class is HermiteCubicSplineInterpolator:
+            columns, weights = reference._local_weights(index, dx)
+        else:
+            a, b, c, d = reference.coefficient_sensitivities()
+            inside = np.flatnonzero(~(front | back))
+            dense = np.zeros((len(t), n))
+            # Horner in blocks of queries, bounding the temporaries
+            for start in range(0, len(inside), InterpolationWeights.BLOCK_SIZE):
+                rows = inside[start : start + InterpolationWeights.BLOCK_SIZE]
+                i, x = index[rows], dx[rows, np.newaxis]
+                dense[rows] = a[i] + x * (b[i] + x * (c[i] + x * d[i]))
+            dense[front, 0] = 1.0
+            dense[back, -1] = 1.0
+            return InterpolationWeights._from_dense(dense, log_space)
+
+        # constant extrapolation: the first or last knot, with weight one
+        columns[front] = 0
+        columns[back] = n - 1
+        weights[front | back] = 0.0
+        weights[front | back, 0] = 1.0
+
+        sparse = InterpolationWeights(
+            shape=(len(t), n), columns=columns, weights=weights, log_space=log_space
+        )
+        if columns.shape[1] > InterpolationWeights.DENSE_THRESHOLD * n:
+            return InterpolationWeights._from_dense(sparse.to_dense(), log_space)
+        return sparse
+
+    @staticmethod
+    def cached(
+        cache: OrderedDict,
+        interpolation_type: InterpolationType,
+        x_values: List[NumericType] | List[dt.datetime] | np.ndarray,
+        query_points: np.ndarray | List[float] | List[dt.date],
+        extrapolate: bool = False,
+        max_size: int = 16,
+    ) -> "InterpolationWeights":
+        """Get the weights at query points from an LRU cache, creating them on a miss.
+
+        Pricing the same cash flow times or scenario grid again reuses the
+        weights created on the first call. The cache is keyed by the bytes of
+        the query points, which is much cheaper than creating the weights. The
+        caller owns the cache, holding the weights of one scheme and knot grid,
+        and clears it when the knots change.
+
+        Args:
+            cache (OrderedDict): the cache, updated in place.
+            max_size (int): the number of query grids kept in the cache.
+
+        See ``create`` for the other arguments.
+        """
+        query_points = np.ascontiguousarray(query_points)
+        key = (query_points.dtype.str, query_points.shape, query_points.tobytes())
+        weights = cache.get(key)
+        if weights is not None:
+            cache.move_to_end(key)
+            return weights
+
+        weights = InterpolationWeights.create(
+            interpolation_type=interpolation_type,
+            x_values=x_values,
+            query_points=query_points,
+            extrapolate=extrapolate,
+        )
+        cache[key] = weights
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+        return weights
+
+    @staticmethod
+    def _from_dense(dense: np.ndarray, log_space: bool) -> "InterpolationWeights":
+        """Compress a dense W, keeping it dense above the fill threshold."""
+        mask = dense != 0.0
+        width = max(int(np.count_nonzero(mask, axis=1).max(initial=0)), 1)
+        if width > InterpolationWeights.DENSE_THRESHOLD * dense.shape[1]:
+            # every column, in order: the padded rows are views of the dense W
+            return InterpolationWeights(
+                shape=dense.shape,
+                columns=np.broadcast_to(np.arange(dense.shape[1]), dense.shape),
+                weights=dense,
+                log_space=log_space,
+                dense=dense,
+            )
+
+        # move the non-zero columns of every row to the front, padding the
+        # rows to the widest one with (zero) trailing entries
+        columns = np.argsort(~mask, axis=1, kind="stable")[:, :width]
+        return InterpolationWeights(
+            shape=dense.shape,
+            columns=columns,
+            weights=np.take_along_axis(dense, columns, axis=1),
+            log_space=log_space,
+        )
+
+
+@define(kw_only=True)
+class VolatilitySurfaceInterpolator:
+    """Tensor-product interpolator of implied volatilities on a strike x expiry grid.
+
+    In strike, the total variance :math:`w(K, T_j) = \\sigma^2(K, T_j) T_j` of
+    every expiry is interpolated linearly or with a cubic spline. In time, the
+    total variance is interpolated linearly between the neighbouring expiries.
+    Outside the grid the volatility is extrapolated flat, in strike and in time.
+
+    The strike coefficients of all expiries are fitted at construction, so the
+    surface is evaluated on arrays of (K, T) in one vectorized pass.
+
+    Example usage:
+        surface = VolatilitySurfaceInterpolator(
+            strikes=np.array([80.0, 90.0, 100.0, 110.0, 120.0]),
+            expiries=np.array([0.25, 0.5, 1.0]),
+            volatilities=vols,  # shape (3, 5)
+            strike_interpolation_type=InterpolationType.CUBIC_SPLINE_INTERPOLATION,
+        )
+        surface(np.array([95.0, 105.0]), np.array([0.3, 0.75]))
+    """
+
+    _strikes: np.ndarray = field(alias="strikes")
+    _expiries: np.ndarray = field(alias="expiries")
+    _volatilities: np.ndarray = field(alias="volatilities")
+    _strike_interpolation_type: InterpolationType = field(
+        default=InterpolationType.LINEAR_INTERPOLATION,
+        validator=attrs.validators.in_(
+            [
+                InterpolationType.LINEAR_INTERPOLATION,
+                InterpolationType.CUBIC_SPLINE_INTERPOLATION,
+                InterpolationType.HERMITE_CUBIC_SPLINE_INTERPOLATION,
+            ]
+        ),
+        alias="strike_interpolation_type",
+    )
+    _a: np.ndarray = field(init=False)
+    _b: np.ndarray = field(init=False)
+    _c: np.ndarray = field(init=False)
+    _d: np.ndarray = field(init=False)
+
+    @_strikes.validator
+    def check_strikes(self, attribute, values):  # pylint: disable=W0613
+        """Validates that the strikes are strictly increasing."""
+        if len(values) < 2:
+            raise ValueError("At least two strikes are required.")
+        if np.any(np.diff(values) <= 0.0):
+            raise ValueError("Strikes must be strictly increasing.")
+
+    @_expiries.validator
+    def check_expiries(self, attribute, values):  # pylint: disable=W0613
+        """Validates that the expiries are positive and strictly increasing."""
+        if len(values) == 0:
+            raise ValueError("List of expiries is empty.")
+        if values[0] <= 0.0 or np.any(np.diff(values) <= 0.0):
+            raise ValueError("Expiries must be positive and strictly increasing.")
+
+    @_volatilities.validator
+    def check_volatilities(self, attribute, values):  # pylint: disable=W0613
+        """Validates that the volatilities have shape (n_expiries, n_strikes)."""
+        if np.shape(values) != (len(self._expiries), len(self._strikes)):
+            raise ValueError(
+                "Volatilities must have shape (number of expiries, number of strikes)."
+            )
+
+    def __attrs_post_init__(self):
+        self._strikes = np.asarray(self._strikes, dtype=np.float64)
+        self._expiries = np.asarray(self._expiries, dtype=np.float64)
+        total_variances = (
+            np.asarray(self._volatilities, dtype=np.float64) ** 2
+            * self._expiries[:, np.newaxis]
+        )
+
+        # fit every expiry at once, one column per expiry
+        if self._strike_interpolation_type == InterpolationType.LINEAR_INTERPOLATION:
+            self._a = total_variances.T[:-1]
+            self._b = (
+                np.diff(total_variances.T, axis=0)
+                / np.diff(self._strikes)[:, np.newaxis]
+            )
+            self._c = np.zeros_like(self._a)
+            self._d = np.zeros_like(self._a)
+        else:
+            strike_interpolator: CubicInterpolator = interpolator_map[
+                self._strike_interpolation_type
+            ](x_values=self._strikes, y_values=total_variances[0])
+            self._a, self._b, self._c, self._d = strike_interpolator._fit_coefficients(
+                strike_interpolator._knot_spacings(), total_variances.T
+            )
+
+    @property
+    def strikes(self) -> np.ndarray:
+        """Get the strikes of the grid."""
+        return self._strikes
+
+    @property
+    def expiries(self) -> np.ndarray:
+        """Get the expiries of the grid."""
+        return self._expiries
+
+    def _variance(
+        self, strikes: np.ndarray | float, expiries: np.ndarray | float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the implied variance sigma^2(K, T) and the broadcast expiries.
+
+        Clamping the query expiries to the grid extrapolates the volatility flat
+        in time, so the fitted total variance is divided once, at the query points.
+        """
+        strikes, expiries = np.broadcast_arrays(
+            np.asarray(strikes, dtype=np.float64),
+            np.asarray(expiries, dtype=np.float64),
+        )
+        grid_strikes, grid_expiries = self._strikes, self._expiries
+        n_expiries = len(grid_expiries)
+
+        # flat extrapolation in strike: clamp to the grid
+        clamped = np.clip(strikes, grid_strikes[0], grid_strikes[-1])
+        i = np.clip(
+            np.searchsorted(grid_strikes, clamped, side="right") - 1,
+            0,
+            len(grid_strikes) - 2,
+        )
+        dx = clamped - grid_strikes[i]
+
+        def strike_slice(j):
+            return self._a[i, j] + dx * (
+                self._b[i, j] + dx * (self._c[i, j] + dx * self._d[i, j])
+            )
+
+        # flat volatility in front of the first and beyond the last expiry
+        times = np.clip(expiries, grid_expiries[0], grid_expiries[-1])
+        j = np.clip(
+            np.searchsorted(grid_expiries, times, side="right") - 1,
+            0,
+            max(n_expiries - 2, 0),
+        )
+        j_next = np.minimum(j + 1, n_expiries - 1)
+        w_lower, w_upper = strike_slice(j), strike_slice(j_next)
+
+        span = grid_expiries[j_next] - grid_expiries[j]
+        theta = np.divide(
+            times - grid_expiries[j],
+            span,
+            out=np.zeros_like(times),
+            where=span > 0.0,
+        )
+        return (w_lower + theta * (w_upper - w_lower)) / times, expiries
+
+    def total_variance(
+        self, strikes: np.ndarray | float, expiries: np.ndarray | float
+    ) -> np.ndarray:
+        """Get the total implied variance w(K, T) = sigma^2(K, T) T.
+
+        Args:
+            strikes (np.ndarray | float): query strikes.
+            expiries (np.ndarray | float): query expiries, broadcast against
+                the strikes.
+        """
+        variance, expiries = self._variance(strikes, expiries)
+        return variance * expiries
+
+    def __call__(
+        self, strikes: np.ndarray | float, expiries: np.ndarray | float
+    ) -> np.ndarray:
+        """Get the implied volatility sigma(K, T).
+
+        At T = 0 this is the limit, the volatility of the first expiry.
+
+        Args:
+            strikes (np.ndarray | float): query strikes.
+            expiries (np.ndarray | float): query expiries, broadcast against
+                the strikes.
+        """
+        variance, _ = self._variance(strikes, expiries)
+        return np.sqrt(np.maximum(variance, 0.0))
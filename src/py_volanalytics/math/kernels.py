@@ -0,0 +1,517 @@
+"""
+Interpolation kernels with an optional JIT-compiled backend.
+
+The kernels evaluate the fitted interpolators of
+``py_volanalytics.math.interpolator`` on arrays of points of the knot axis, and
+at single points, and solve the tridiagonal systems of the natural cubic
+spline. Two backends are available:
+
+    NUMPY : the vectorized NumPy implementation, always available
+    NUMBA : the same kernels as compiled scalar loops, if numba is installed
+
+NUMPY is the default. NUMBA is opt-in: numba is imported, and every kernel
+compiled, on first use, which costs about a second per process. With NUMBA the
+scalar calls of the interpolators and of their cursors also go through
+compiled kernels. The compiled code is not cached on disk.
+
+Example usage:
+    from py_volanalytics.math import kernels
+
+    kernels.set_backend(kernels.KernelBackend.NUMBA)
+    print(kernels.get_backend())
+        >>Numba
+
+Run this module as a script, or call ``check_parity``, to check that both
+backends reproduce the scalar interpolators.
+"""
+
+import importlib.util
+from enum import StrEnum
+from typing import Callable
+import numpy as np
+
+# numba is only imported when a kernel is first compiled, importing it up front
+# would add about a second to the import of the numeric core
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+class KernelBackend(StrEnum):
+    NUMPY = "NumPy"
+    NUMBA = "Numba"
+
+
+_backend: KernelBackend = KernelBackend.NUMPY
+_compiled_kernels: dict[Callable, Callable] = {}
+
+
+def get_backend() -> KernelBackend:
+    """Get the backend the kernels currently dispatch to."""
+    return _backend
+
+
+def set_backend(backend: KernelBackend):
+    """Select the backend the kernels dispatch to.
+
+    Raises:
+        ImportError: if the NUMBA backend is requested but numba is not installed.
+    """
+    global _backend  # pylint: disable=W0603
+    if backend == KernelBackend.NUMBA and not NUMBA_AVAILABLE:
+        raise ImportError("The NUMBA kernel backend requires numba: pip install numba")
+    _backend = KernelBackend(backend)
+
+
+def _compiled(kernel: Callable) -> Callable:
+    """Get the numba-compiled version of a kernel, compiling it on first use."""
+    if kernel not in _compiled_kernels:
+        import numba  # pylint: disable=C0415
+
+        _compiled_kernels[kernel] = numba.njit(kernel)
+    return _compiled_kernels[kernel]
+
+
+# ---------------------------------------------------------------------------
+# NumPy backend
+# ---------------------------------------------------------------------------
+
+
+def _locate_numpy(knots: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Get the interval index of every point, clipped to the knot range."""
+    return np.clip(np.searchsorted(knots, t, side="right") - 1, 0, len(knots) - 2)
+
+
+def _extrapolate_numpy(
+    knots: np.ndarray, y_front: float, y_back: float, t: np.ndarray, result
+) -> np.ndarray:
+    """Apply constant extrapolation outside the knots."""
+    result = np.where(t < knots[0], y_front, result)
+    return np.where(t >= knots[-1], y_back, result)
+
+
+def _evaluate_linear_numpy(knots, intercepts, slopes, y_front, y_back, t):
+    index = _locate_numpy(knots, t)
+    result = intercepts[index] + (t - knots[index]) * slopes[index]
+    return _extrapolate_numpy(knots, y_front, y_back, t, result)
+
+
+def _evaluate_log_linear_numpy(knots, log_ys, log_slopes, y_front, y_back, t):
+    index = _locate_numpy(knots, t)
+    result = np.exp(log_ys[index] + (t - knots[index]) * log_slopes[index])
+    return _extrapolate_numpy(knots, y_front, y_back, t, result)
+
+
+def _evaluate_cubic_numpy(knots, a, b, c, d, y_front, y_back, t):
+    index = _locate_numpy(knots, t)
+    dx = t - knots[index]
+    result = a[index] + dx * (b[index] + dx * (c[index] + dx * d[index]))
+    return _extrapolate_numpy(knots, y_front, y_back, t, result)
+
+
+def _factorize_tridiagonal_loop(lower, diag, upper):
+    n = len(diag)
+    upper_prime = np.zeros(n)
+    denominators = np.zeros(n)
+
+    denominators[0] = diag[0]
+    upper_prime[0] = upper[0] / diag[0]
+    for i in range(1, n):
+        denominators[i] = diag[i] - lower[i] * upper_prime[i - 1]
+        upper_prime[i] = upper[i] / denominators[i]
+
+    return upper_prime, denominators
+
+
+def _solve_tridiagonal_loop(lower, upper_prime, denominators, rhs):
+    n = len(denominators)
+    rhs_prime = np.zeros(rhs.shape)
+
+    # forward sweep
+    rhs_prime[0] = rhs[0] / denominators[0]
+    for i in range(1, n):
+        rhs_prime[i] = (rhs[i] - lower[i] * rhs_prime[i - 1]) / denominators[i]
+
+    # back substitution
+    solution = np.zeros(rhs.shape)
+    solution[-1] = rhs_prime[-1]
+    for i in range(n - 2, -1, -1):
+        solution[i] = rhs_prime[i] - upper_prime[i] * solution[i + 1]
+
+    return solution
+
+
+# ---------------------------------------------------------------------------
+# Compiled backend, one scalar loop per kernel
+# ---------------------------------------------------------------------------
+
+
+def _evaluate_linear_loop(knots, intercepts, slopes, y_front, y_back, t):
+    result = np.empty(len(t))
+    for k in range(len(t)):
+        if t[k] < knots[0]:
+            result[k] = y_front
+        elif t[k] >= knots[-1]:
+            result[k] = y_back
+        else:
+            i = np.searchsorted(knots, t[k], side="right") - 1
+            result[k] = intercepts[i] + (t[k] - knots[i]) * slopes[i]
+    return result
+
+
+def _evaluate_log_linear_loop(knots, log_ys, log_slopes, y_front, y_back, t):
+    result = np.empty(len(t))
+    for k in range(len(t)):
+        if t[k] < knots[0]:
+            result[k] = y_front
+        elif t[k] >= knots[-1]:
+            result[k] = y_back
+        else:
+            i = np.searchsorted(knots, t[k], side="right") - 1
+            result[k] = np.exp(log_ys[i] + (t[k] - knots[i]) * log_slopes[i])
+    return result
+
+
+def _evaluate_cubic_loop(knots, a, b, c, d, y_front, y_back, t):
+    result = np.empty(len(t))
+    for k in range(len(t)):
+        if t[k] < knots[0]:
+            result[k] = y_front
+        elif t[k] >= knots[-1]:
+            result[k] = y_back
+        else:
+            i = np.searchsorted(knots, t[k], side="right") - 1
+            dx = t[k] - knots[i]
+            result[k] = a[i] + dx * (b[i] + dx * (c[i] + dx * d[i]))
+    return result
+
+
+def _evaluate_linear_scalar_loop(knots, intercepts, slopes, y_front, y_back, t, hint):
+    n = len(knots)
+    if t < knots[0]:
+        return y_front, -1
+    if t >= knots[n - 1]:
+        return y_back, -2
+    if 0 <= hint < n - 1 and knots[hint] <= t < knots[hint + 1]:
+        i = hint
+    elif 0 <= hint < n - 2 and knots[hint + 1] <= t < knots[hint + 2]:
+        i = hint + 1
+    else:
+        i = np.searchsorted(knots, t, side="right") - 1
+    return intercepts[i] + (t - knots[i]) * slopes[i], i
+
+
+def _evaluate_log_linear_scalar_loop(
+    knots, log_ys, log_slopes, y_front, y_back, t, hint
+):
+    n = len(knots)
+    if t < knots[0]:
+        return y_front, -1
+    if t >= knots[n - 1]:
+        return y_back, -2
+    if 0 <= hint < n - 1 and knots[hint] <= t < knots[hint + 1]:
+        i = hint
+    elif 0 <= hint < n - 2 and knots[hint + 1] <= t < knots[hint + 2]:
+        i = hint + 1
+    else:
+        i = np.searchsorted(knots, t, side="right") - 1
+    return np.exp(log_ys[i] + (t - knots[i]) * log_slopes[i]), i
+
+
+def _evaluate_cubic_scalar_loop(knots, a, b, c, d, y_front, y_back, t, hint):
+    n = len(knots)
+    if t < knots[0]:
+        return y_front, -1
+    if t >= knots[n - 1]:
+        return y_back, -2
+    if 0 <= hint < n - 1 and knots[hint] <= t < knots[hint + 1]:
+        i = hint
+    elif 0 <= hint < n - 2 and knots[hint + 1] <= t < knots[hint + 2]:
+        i = hint + 1
+    else:
+        i = np.searchsorted(knots, t, side="right") - 1
+    dx = t - knots[i]
+    return a[i] + dx * (b[i] + dx * (c[i] + dx * d[i])), i
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+
+def evaluate_linear(
+    knots: np.ndarray,
+    intercepts: np.ndarray,
+    slopes: np.ndarray,
+    y_front: float,
+    y_back: float,
+    t: np.ndarray,
+) -> np.ndarray:
+    """Evaluate a piecewise linear function with constant extrapolation.
+
+    Args:
+        knots (np.ndarray): sorted knots, on a float axis.
+        intercepts (np.ndarray): the value at the left knot of every interval.
+        slopes (np.ndarray): the slope of every interval.
+        y_front (float): value in front of the first knot.
+        y_back (float): value from the last knot onwards.
+        t (np.ndarray): 1-D array of query points, on the knot axis.
+    """
+    if _backend == KernelBackend.NUMBA:
+        return _compiled(_evaluate_linear_loop)(
+            knots, intercepts, slopes, y_front, y_back, t
+        )
+    return _evaluate_linear_numpy(knots, intercepts, slopes, y_front, y_back, t)
+
+
+def evaluate_log_linear(
+    knots: np.ndarray,
+    log_ys: np.ndarray,
+    log_slopes: np.ndarray,
+    y_front: float,
+    y_back: float,
+    t: np.ndarray,
+) -> np.ndarray:
+    """Evaluate a piecewise log-linear function with constant extrapolation.
+
+    Args:
+        knots (np.ndarray): sorted knots, on a float axis.
+        log_ys (np.ndarray): the log value at every knot.
+        log_slopes (np.ndarray): the slope of the log value in every interval.
+        y_front (float): value in front of the first knot.
+        y_back (float): value from the last knot onwards.
+        t (np.ndarray): 1-D array of query points, on the knot axis.
+    """
+    if _backend == KernelBackend.NUMBA:
+        return _compiled(_evaluate_log_linear_loop)(
+            knots, log_ys, log_slopes, y_front, y_back, t
+        )
+    return _evaluate_log_linear_numpy(knots, log_ys, log_slopes, y_front, y_back, t)
+
+
+def evaluate_cubic(
+    knots: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    c: np.ndarray,
+    d: np.ndarray,
+    y_front: float,
+    y_back: float,
+    t: np.ndarray,
+) -> np.ndarray:
+    """Evaluate a piecewise cubic function with constant extrapolation.
+
+    Serves both the natural and the Hermite cubic splines.
+
+    Args:
+        knots (np.ndarray): sorted knots, on a float axis.
+        a, b, c, d (np.ndarray): the polynomial coefficients of every interval.
+        y_front (float): value in front of the first knot.
+        y_back (float): value from the last knot onwards.
+        t (np.ndarray): 1-D array of query points, on the knot axis.
+    """
+    if _backend == KernelBackend.NUMBA:
+        return _compiled(_evaluate_cubic_loop)(knots, a, b, c, d, y_front, y_back, t)
+    return _evaluate_cubic_numpy(knots, a, b, c, d, y_front, y_back, t)
+
+
+def evaluate_linear_scalar(
+    knots: np.ndarray,
+    intercepts: np.ndarray,
+    slopes: np.ndarray,
+    y_front: float,
+    y_back: float,
+    t: float,
+    hint: int,
+) -> tuple[float, int]:
+    """Evaluate a piecewise linear function at a single point.
+
+    The intervals ``hint`` and ``hint + 1`` are tried before a binary search,
+    so sorted sweeps are O(1) per point.
+
+    Args:
+        knots (np.ndarray): sorted knots, on a float axis.
+        intercepts (np.ndarray): the value at the left knot of every interval.
+        slopes (np.ndarray): the slope of every interval.
+        y_front (float): value in front of the first knot.
+        y_back (float): value from the last knot onwards.
+        t (float): the query point, on the knot axis.
+        hint (int): the interval to try first.
+
+    Returns:
+        tuple[float, int]: the value and the interval of ``t``, -1 in front of
+        the knots and -2 from the last knot onwards.
+    """
+    kernel = _evaluate_linear_scalar_loop
+    if _backend == KernelBackend.NUMBA:
+        kernel = _compiled(kernel)
+    return kernel(knots, intercepts, slopes, y_front, y_back, t, hint)
+
+
+def evaluate_log_linear_scalar(
+    knots: np.ndarray,
+    log_ys: np.ndarray,
+    log_slopes: np.ndarray,
+    y_front: float,
+    y_back: float,
+    t: float,
+    hint: int,
+) -> tuple[float, int]:
+    """Evaluate a piecewise log-linear function at a single point.
+
+    See ``evaluate_linear_scalar`` for the ``hint`` and the returned interval.
+    """
+    kernel = _evaluate_log_linear_scalar_loop
+    if _backend == KernelBackend.NUMBA:
+        kernel = _compiled(kernel)
+    return kernel(knots, log_ys, log_slopes, y_front, y_back, t, hint)
+
+
+def evaluate_cubic_scalar(
+    knots: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    c: np.ndarray,
+    d: np.ndarray,
+    y_front: float,
+    y_back: float,
+    t: float,
+    hint: int,
+) -> tuple[float, int]:
+    """Evaluate a piecewise cubic function at a single point.
+
+    See ``evaluate_linear_scalar`` for the ``hint`` and the returned interval.
+    """
+    kernel = _evaluate_cubic_scalar_loop
+    if _backend == KernelBackend.NUMBA:
+        kernel = _compiled(kernel)
+    return kernel(knots, a, b, c, d, y_front, y_back, t, hint)
+
+
+def factorize_tridiagonal(
+    lower: np.ndarray, diag: np.ndarray, upper: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Forward-eliminate a tridiagonal matrix (Thomas algorithm).
+
+    Args:
+        lower (np.ndarray): sub-diagonal, ``lower[i]`` multiplies ``x[i - 1]``.
+        diag (np.ndarray): principal diagonal.
+        upper (np.ndarray): super-diagonal, ``upper[i]`` multiplies ``x[i + 1]``.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the eliminated super-diagonal and the
+        pivots.
+    """
+    if _backend == KernelBackend.NUMBA:
+        return _compiled(_factorize_tridiagonal_loop)(lower, diag, upper)
+    return _factorize_tridiagonal_loop(lower, diag, upper)
+
+
+def solve_tridiagonal(
+    lower: np.ndarray,
+    upper_prime: np.ndarray,
+    denominators: np.ndarray,
+    rhs: np.ndarray,
+) -> np.ndarray:
+    """Solve a factorized tridiagonal system for a rhs of shape (n,) or (n, k)."""
+    if _backend == KernelBackend.NUMBA:
+        return _compiled(_solve_tridiagonal_loop)(lower, upper_prime, denominators, rhs)
+    return _solve_tridiagonal_loop(lower, upper_prime, denominators, rhs)
+
+
+def check_parity(
+    num_knots: int = 50,
+    num_points: int = 10_000,
+    seed: int = 0,
+    tolerance: float = 1e-12,
+) -> dict[str, float]:
+    """Check that every backend reproduces the scalar interpolators.
+
+    Every interpolation scheme is fitted, with extrapolation, to random knots
+    under each available backend, so the natural spline also goes through the
+    tridiagonal kernels. The fitted interpolators are evaluated through
+    ``Interpolator.evaluate``, through the scalar ``Interpolator.__call__`` and
+    through a cursor sweeping the sorted points, at random points in and around
+    the knot range, at every knot and just below every knot, and compared with
+    the scalar ``Interpolator.__call__`` of the NumPy fit.
+
+    Args:
+        num_knots (int): number of random knots.
+        num_points (int): number of random query points.
+        seed (int): seed of the random inputs.
+        tolerance (float): largest relative difference accepted.
+
+    Returns:
+        dict[str, float]: the largest relative difference per backend and scheme.
+
+    Raises:
+        AssertionError: if a difference exceeds ``tolerance``.
+    """
+    # the interpolators dispatch to this module
+    from py_volanalytics.math.interpolator import (  # pylint: disable=C0415
+        InterpolationType,
+        interpolator_map,
+    )
+
+    rng = np.random.default_rng(seed)
+    knots = np.cumsum(rng.uniform(0.1, 1.0, num_knots))
+    y_values = rng.uniform(0.5, 1.5, num_knots)
+    t = np.concatenate(
+        [
+            rng.uniform(knots[0] - 1.0, knots[-1] + 1.0, num_points),
+            knots,
+            np.nextafter(knots, -np.inf),
+        ]
+    )
+    order = np.argsort(t)
+
+    backends = [KernelBackend.NUMPY] + (
+        [KernelBackend.NUMBA] if NUMBA_AVAILABLE else []
+    )
+    differences = {}
+    backend = get_backend()
+    try:
+        for interpolation_type in InterpolationType:
+            interpolator_class = interpolator_map[interpolation_type]
+            set_backend(KernelBackend.NUMPY)
+            reference = interpolator_class(
+                x_values=knots, y_values=y_values, extrapolate=True
+            )
+            expected = np.array([reference(x) for x in t.tolist()])
+
+            for kernel_backend in backends:
+                set_backend(kernel_backend)
+                interpolator = interpolator_class(
+                    x_values=knots, y_values=y_values, extrapolate=True
+                )
+                cursor = interpolator.cursor()
+                swept = np.empty_like(t)
+                swept[order] = [cursor(x) for x in t[order].tolist()]
+                actual = np.stack(
+                    [
+                        interpolator.evaluate(t),
+                        [interpolator(x) for x in t.tolist()],
+                        swept,
+                    ]
+                )
+                differences[f"{kernel_backend}/{interpolation_type}"] = float(
+                    np.max(
+                        np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0)
+                    )
+                )
+    finally:
+        set_backend(backend)
+
+    failures = {
+        name: difference
+        for name, difference in differences.items()
+        if not difference <= tolerance
+    }
+    if failures:
+        raise AssertionError(
+            f"Kernel results differ by more than {tolerance:.0e}: {failures}"
+        )
+    return differences
+
+
+if __name__ == "__main__":
+    for name, difference in check_parity().items():
+        print(f"{name}: max relative difference {difference:.3e}")
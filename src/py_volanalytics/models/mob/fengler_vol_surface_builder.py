@@ -8,6 +8,9 @@ from py_volanalytics.market.time import TimeInfo, TimeObjectId
 from py_volanalytics.market.option_quotes import OptionQuotesId
 from py_volanalytics.market.forward_quotes import ForwardQuotesId
 from py_volanalytics.market.discounting_curve import DiscountingCurveId
+from py_volanalytics.market.implied_volatility_surface import (
+    ImpliedVolatilitySurfaceId,
+)
 from py_volanalytics.valuation_framework.generic_market_object_builder import (
     GenericMarketObjectBuilder,
 )
@@ -65,6 +68,16 @@ class FenglerVolSurfaceBuilder(GenericMarketObjectBuilder):
         super().advance_state()
         return deps
 
+    def get_output_id(
+        self,
+        initialized_state: Any,
+        reference_data: Any,
+    ) -> MarketObjectId:
+        """Get the id of the implied volatility surface built by calculate"""
+        return ImpliedVolatilitySurfaceId(
+            friendly_name=MarketObjects.IMPLIED_VOLATILITY_SURFACE, symbol=self._symbol
+        )
+
     def calculate(
         self,
         initialized_state: Any,
@@ -0,0 +1,50 @@
+"""
+Plotting helpers for curves.
+
+This module is the only place where matplotlib and scienceplots are imported,
+so that the numeric modules stay cheap to import. It is imported lazily, e.g.
+by ``Interpolator.plot``.
+"""
+
+from typing import Optional
+import numpy as np
+
+try:
+    import matplotlib.pyplot as plt
+    # imported for its side effect, registering the "science" style
+    import scienceplots  # pylint: disable=unused-import
+except ImportError as error:
+    raise ImportError(
+        "Plotting requires matplotlib and scienceplots: "
+        "pip install matplotlib scienceplots"
+    ) from error
+
+plt.style.use("science")
+
+
+def plot_curve(
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+    title: Optional[str] = None,
+    x_label: Optional[str] = None,
+    y_label: Optional[str] = None,
+):
+    """Plot a curve y(x)
+
+    Args:
+        x_values (np.ndarray): The x values.
+        y_values (np.ndarray): The y values.
+        title (Optional[str]): The title, defaults to "Interpolated curve y(x)".
+        x_label (Optional[str]): The x-axis label, defaults to "x".
+        y_label (Optional[str]): The y-axis label, defaults to "y".
+    """
+    xlabel = x_label if x_label is not None else r"$x$"
+    ylabel = y_label if y_label is not None else r"$y$"
+    title = title if title is not None else r"Interpolated curve $y(x)$"
+    plt.figure(figsize=(8, 6))
+    plt.title(title)
+    plt.xlabel(xlabel=xlabel)
+    plt.ylabel(ylabel=ylabel)
+
+    plt.plot(x_values, y_values)
+    plt.show()
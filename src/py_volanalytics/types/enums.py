@@ -44,6 +44,23 @@ class StrikeConvention(Enum):
     LOG_FORWARD_MONEYNESS = auto()
 
 
+class DayCountConvention(Enum):
+    """The day count convention used to convert dates to year fractions"""
+
+    ACT_365_FIXED = auto()
+    ACT_360 = auto()
+    ACT_ACT_ISDA = auto()
+    THIRTY_E_360 = auto()
+
+
+class RateInstrumentType(Enum):
+    """The type of a linear rate instrument used to bootstrap a curve"""
+
+    DEPOSIT = auto()
+    FRA = auto()
+    SWAP = auto()
+
+
 class Currency(StrEnum):
     AED = "AED"
     ARS = "ARS"
@@ -137,6 +154,22 @@ class GMOBState(Enum):
     RESULTS_GEN_COMPLETE = auto()
 
 
+class ExecutorType(Enum):
+    """The pool used to run independent market object builders concurrently"""
+
+    THREAD = auto()
+    PROCESS = auto()
+
+
+class BuilderPhase(Enum):
+    """The lifecycle phases of a market object builder"""
+
+    INITIALIZE = auto()
+    STATIC_DEPENDENCIES = auto()
+    MARKET_DEPENDENCIES = auto()
+    CALCULATE = auto()
+
+
 class TimeInfo(Enum):
     """Info about a TimeObject"""
 
@@ -0,0 +1,200 @@
+"""
+Result cache for market object builders.
+
+A builder run is identified by the builder class and parameters, the id of
+the object it builds and the content fingerprints of all the market objects it
+depends on. Running the same builder on unchanged inputs, e.g. for several
+downstream consumers or after a crash, is then a cache hit instead of another
+surface fit.
+
+The cache has two tiers: an in-memory LRU bounded by a number of entries, and
+an optional on-disk tier of pickled results bounded by a total size in bytes,
+evicting the least recently used files.
+
+Example usage:
+    cache = BuilderResultCache(max_entries=256, cache_dir="/tmp/mob_cache")
+    surface = cache.calculate(builder, initialized_state, reference_data, market_data)
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any, List, Optional
+import attrs
+from attrs import define, field
+from py_volanalytics.utils.fingerprint import fingerprint
+from py_volanalytics.valuation_framework.generic_market_object_builder import (
+    GenericMarketObjectBuilder,
+)
+from py_volanalytics.valuation_framework.market_data import (
+    MarketObjectId,
+    MarketObject,
+    MarketEnvironment,
+)
+
+# builder fields holding the run state and instrumentation, not parameters
+_BUILDER_STATE_FIELDS = frozenset(
+    attribute.name for attribute in attrs.fields(GenericMarketObjectBuilder)
+)
+
+
+@define(kw_only=True)
+class BuilderResultCache:
+    """Two-tier (memory, disk) cache of builder results, keyed by input content"""
+
+    _max_entries: int = field(
+        default=256, validator=attrs.validators.gt(0), alias="max_entries"
+    )
+    _cache_dir: Optional[str] = field(default=None, alias="cache_dir")
+    _max_disk_bytes: int = field(
+        default=1 << 30, validator=attrs.validators.gt(0), alias="max_disk_bytes"
+    )
+    _entries: OrderedDict = field(factory=OrderedDict, init=False)
+    _memory_hits: int = field(default=0, init=False)
+    _disk_hits: int = field(default=0, init=False)
+    _misses: int = field(default=0, init=False)
+
+    def __attrs_post_init__(self):
+        if self._cache_dir is not None:
+            os.makedirs(self._cache_dir, exist_ok=True)
+
+    @property
+    def memory_hits(self) -> int:
+        return self._memory_hits
+
+    @property
+    def disk_hits(self) -> int:
+        return self._disk_hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def size(self) -> int:
+        """Get the number of results held in memory."""
+        return len(self._entries)
+
+    def key(
+        self,
+        builder: GenericMarketObjectBuilder,
+        output_id: MarketObjectId,
+        dependencies: List[MarketObjectId],
+        market_data: MarketEnvironment,
+    ) -> str:
+        """Get the cache key of a builder run.
+
+        Args:
+            builder (GenericMarketObjectBuilder): The builder.
+            output_id (MarketObjectId): The id of the object it builds.
+            dependencies (List[MarketObjectId]): Its market dependencies.
+            market_data (MarketEnvironment): The market env they are resolved in.
+
+        Returns:
+            str: The hex digest identifying the run.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(fingerprint(builder, exclude=_BUILDER_STATE_FIELDS).encode())
+        digest.update(fingerprint(output_id).encode())
+        for dep in dependencies:
+            digest.update(fingerprint(dep).encode())
+            digest.update(fingerprint(market_data.get_market_object(dep)).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[MarketObject]:
+        """Look up a result in memory, then on disk, counting the hit or miss."""
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self._memory_hits += 1
+            return result
+
+        path = self._path(key)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as file:
+                result = pickle.load(file)
+            os.utime(path)  # mark as recently used for the disk eviction
+            self._remember(key, result)
+            self._disk_hits += 1
+            return result
+
+        self._misses += 1
+        return None
+
+    def put(self, key: str, result: MarketObject):
+        """Store a result in memory and, if enabled, on disk."""
+        self._remember(key, result)
+
+        path = self._path(key)
+        if path is None:
+            return
+        # write to a temporary file first, so readers never see partial results
+        handle, temporary = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        with os.fdopen(handle, "wb") as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self._evict_disk()
+
+    def calculate(
+        self,
+        builder: GenericMarketObjectBuilder,
+        initialized_state: Any,
+        reference_data: Any,
+        market_data: MarketEnvironment,
+    ) -> MarketObject:
+        """Evaluates the builder, unless a run on the same inputs is cached"""
+        key = self.key(
+            builder,
+            builder.get_output_id(initialized_state, reference_data),
+            builder.get_market_dependencies(initialized_state, reference_data),
+            market_data,
+        )
+        result = self.get(key)
+        if result is None:
+            result = builder.calculate(initialized_state, reference_data, market_data)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        """Drop all results, in memory and on disk, and reset the counters."""
+        self._entries.clear()
+        for path in self._disk_files():
+            os.remove(path)
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def _remember(self, key: str, result: MarketObject):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Optional[str]:
+        if self._cache_dir is None:
+            return None
+        return os.path.join(self._cache_dir, f"{key}.pkl")
+
+    def _disk_files(self) -> List[str]:
+        if self._cache_dir is None:
+            return []
+        return [
+            entry.path
+            for entry in os.scandir(self._cache_dir)
+            if entry.name.endswith(".pkl")
+        ]
+
+    def _evict_disk(self):
+        """Delete the least recently used files until the tier fits its budget."""
+        files = sorted(
+            ((path, os.stat(path)) for path in self._disk_files()),
+            key=lambda item: item[1].st_mtime_ns,
+        )
+        total = sum(stat.st_size for _, stat in files)
+        for path, stat in files:
+            if total <= self._max_disk_bytes:
+                break
+            os.remove(path)
+            total -= stat.st_size
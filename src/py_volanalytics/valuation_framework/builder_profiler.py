@@ -0,0 +1,246 @@
+"""
+Per-phase timing and profiling of market object builders.
+
+A ``BuilderProfiler`` attached to a builder records, for every lifecycle phase
+(initialize, static dependencies, market dependencies, calculate), the wall
+time, the CPU time and optionally the peak memory allocated (tracemalloc) and
+a cProfile capture. One profiler is typically shared by all the builders of a
+refresh, and the records are exported as JSON lines or a summary table to find
+the builders blowing the latency budget.
+
+tracemalloc counts the allocations of the whole process, so phases measuring
+memory run one at a time: with a thread pool or ``run_async``, they wait for
+each other, and the timings of the waiting phases exclude the wait. tracemalloc
+is started for the measured phases only, unless the caller already traces
+allocations. cProfile also captures one phase at a time; phases overlapping a
+capture in another thread are timed but not profiled.
+
+Example usage:
+    profiler = BuilderProfiler(trace_memory=True)
+    builders = [
+        FenglerVolSurfaceBuilder(symbol=symbol, profiler=profiler)
+        for symbol in symbols
+    ]
+    BuilderScheduler(builders=builders).run(market_data)
+    print(profiler.summary(top=10))
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+import attrs
+from attrs import define, field
+from py_volanalytics.types.enums import BuilderPhase
+
+# a process runs one cProfile capture at a time
+_PROFILE_LOCK = threading.Lock()
+# a process measures the memory of one phase at a time, the peak is process wide
+_TRACE_LOCK = threading.RLock()
+
+
+@define(kw_only=True)
+class PhaseRecord:
+    """Measurements of one lifecycle phase of one builder"""
+
+    _builder: str = field(alias="builder")
+    _phase: BuilderPhase = field(alias="phase")
+    _wall_time: float = field(alias="wall_time")
+    _cpu_time: float = field(alias="cpu_time")
+    _peak_memory: Optional[int] = field(default=None, alias="peak_memory")
+    _profile: Optional[str] = field(default=None, alias="profile")
+
+    @property
+    def builder(self):
+        return self._builder
+
+    @property
+    def phase(self):
+        return self._phase
+
+    @property
+    def wall_time(self):
+        """Get the wall time in seconds."""
+        return self._wall_time
+
+    @property
+    def cpu_time(self):
+        """Get the CPU time of the thread running the phase, in seconds."""
+        return self._cpu_time
+
+    @property
+    def peak_memory(self):
+        """Get the peak memory allocated during the phase, in bytes."""
+        return self._peak_memory
+
+    @property
+    def profile(self):
+        """Get the cProfile statistics of the phase, as text."""
+        return self._profile
+
+    def to_dict(self) -> dict:
+        return {
+            "builder": self._builder,
+            "phase": self._phase.name,
+            "wall_time": self._wall_time,
+            "cpu_time": self._cpu_time,
+            "peak_memory": self._peak_memory,
+            "profile": self._profile,
+        }
+
+
+@define(kw_only=True)
+class BuilderProfiler:
+    """Records per-phase measurements of the builders it is attached to"""
+
+    _trace_memory: bool = field(default=False, alias="trace_memory")
+    _profile: bool = field(default=False, alias="profile")
+    _profile_lines: int = field(
+        default=20, validator=attrs.validators.gt(0), alias="profile_lines"
+    )
+    _records: List[PhaseRecord] = field(factory=list, init=False)
+
+    @property
+    def records(self) -> List[PhaseRecord]:
+        return self._records
+
+    def extend(self, records: List[PhaseRecord]):
+        """Add records measured elsewhere, e.g. in a worker process."""
+        self._records.extend(records)
+
+    def clear(self):
+        self._records.clear()
+
+    def fresh(self) -> "BuilderProfiler":
+        """Get an empty profiler with the same settings, e.g. for a worker task."""
+        return BuilderProfiler(
+            trace_memory=self._trace_memory,
+            profile=self._profile,
+            profile_lines=self._profile_lines,
+        )
+
+    @contextmanager
+    def measure(self, builder: str, phase: BuilderPhase) -> Iterator[None]:
+        """Measure the phase run inside the context.
+
+        Args:
+            builder (str): The label of the builder.
+            phase (BuilderPhase): The lifecycle phase.
+        """
+        if not self._trace_memory:
+            with self._measure(builder, phase, None):
+                yield
+            return
+
+        with _TRACE_LOCK:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            try:
+                with self._measure(builder, phase, tracemalloc.get_traced_memory()):
+                    tracemalloc.reset_peak()
+                    yield
+            finally:
+                # tracing slows down every allocation in the process
+                if started:
+                    tracemalloc.stop()
+
+    @contextmanager
+    def _measure(
+        self, builder: str, phase: BuilderPhase, traced: Optional[tuple[int, int]]
+    ) -> Iterator[None]:
+        """Time the phase, and take its peak memory from ``traced``, the traced
+        memory at the start of the phase, if given."""
+        profiler = None
+        if self._profile and _PROFILE_LOCK.acquire(blocking=False):
+            profiler = cProfile.Profile()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _PROFILE_LOCK.release()
+            cpu_time = time.thread_time() - cpu_start
+            wall_time = time.perf_counter() - wall_start
+
+            peak_memory = None
+            if traced is not None:
+                peak_memory = max(tracemalloc.get_traced_memory()[1] - traced[0], 0)
+
+            self._records.append(
+                PhaseRecord(
+                    builder=builder,
+                    phase=phase,
+                    wall_time=wall_time,
+                    cpu_time=cpu_time,
+                    peak_memory=peak_memory,
+                    profile=None if profiler is None else self._format(profiler),
+                )
+            )
+
+    def to_dicts(self) -> List[dict]:
+        """Get the records as plain dictionaries, e.g. for a structured log."""
+        return [record.to_dict() for record in self._records]
+
+    def write_json_lines(self, path: str):
+        """Write the records to a file, one JSON object per line."""
+        with open(path, "w", encoding="utf-8") as file:
+            for record in self.to_dicts():
+                file.write(json.dumps(record) + "\n")
+
+    def summary(self, top: Optional[int] = None) -> str:
+        """Get a table of the builders, slowest first, with their phase times.
+
+        Args:
+            top (Optional[int]): Only list the ``top`` slowest builders.
+
+        Returns:
+            str: The table; times in milliseconds, peak memory in KiB.
+        """
+        phases = list(BuilderPhase)
+        totals = {}
+        for record in self._records:
+            row = totals.setdefault(
+                record.builder, {"wall": {}, "cpu": 0.0, "peak": None}
+            )
+            row["wall"][record.phase] = (
+                row["wall"].get(record.phase, 0.0) + record.wall_time
+            )
+            row["cpu"] += record.cpu_time
+            if record.peak_memory is not None:
+                row["peak"] = max(row["peak"] or 0, record.peak_memory)
+
+        rows = sorted(totals.items(), key=lambda item: -sum(item[1]["wall"].values()))
+        width = max([len("builder")] + [len(builder) for builder in totals])
+        lines = [
+            f"{'builder':<{width}}"
+            + "".join(f"{phase.name.lower():>22}" for phase in phases)
+            + f"{'wall':>12}{'cpu':>12}{'peak_kib':>12}"
+        ]
+        for builder, row in rows[:top]:
+            peak = "" if row["peak"] is None else f"{row['peak'] / 1024:.1f}"
+            lines.append(
+                f"{builder:<{width}}"
+                + "".join(
+                    f"{1e3 * row['wall'].get(phase, 0.0):>22.3f}" for phase in phases
+                )
+                + f"{1e3 * sum(row['wall'].values()):>12.3f}"
+                + f"{1e3 * row['cpu']:>12.3f}{peak:>12}"
+            )
+        return "\n".join(lines)
+
+    def _format(self, profiler: cProfile.Profile) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._profile_lines)
+        return stream.getvalue()
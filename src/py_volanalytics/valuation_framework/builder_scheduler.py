@@ -0,0 +1,445 @@
+"""
+Scheduler running many market object builders over a dependency graph.
+
+Every builder declares the market objects it reads (``get_market_dependencies``)
+and the one it builds (``get_output_id``). A builder depending on the output of
+another builder runs after it; independent builders run concurrently on a
+thread or process pool. Outputs are added to the market environment as they
+complete, in the service named after their friendly name, e.g. an
+``IMPLIED_VOLATILITY_SURFACE`` goes to the ``IMPLIED_VOLATILITY_SURFACE_SERVICE``.
+
+Each builder only receives the subset of the market environment it depends on,
+so a process pool does not pickle the whole environment for every task.
+
+With a ``BuilderResultCache``, builders whose parameters and inputs are
+unchanged since a cached run are not recomputed.
+
+With ``run_async``, the inputs missing from the market environment are fetched
+concurrently from a ``MarketDataProvider`` and every builder starts as soon as
+its own inputs have arrived.
+
+The dependency graph is kept after a run. When market objects change, e.g. a
+few option quotes on a tick, ``update`` marks dirty the builders reading them
+and, recursively, their consumers, and recomputes only those.
+
+Example usage:
+    scheduler = BuilderScheduler(
+        builders=[FenglerVolSurfaceBuilder(symbol=symbol) for symbol in symbols],
+        executor_type=ExecutorType.PROCESS,
+    )
+    market_data = scheduler.run(market_data)
+    market_data = scheduler.update([ticked_option_quotes])
+"""
+
+import asyncio
+from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+import attrs
+from attrs import define, field
+from py_volanalytics.valuation_framework.builder_cache import BuilderResultCache
+from py_volanalytics.valuation_framework.builder_profiler import PhaseRecord
+from py_volanalytics.valuation_framework.generic_market_object_builder import (
+    GenericMarketObjectBuilder,
+)
+from py_volanalytics.valuation_framework.market_data import (
+    MarketObjectId,
+    MarketObject,
+    MarketEnvironment,
+)
+from py_volanalytics.valuation_framework.market_data_provider import (
+    MarketDataProvider,
+)
+from py_volanalytics.types.enums import BuilderPhase, ExecutorType
+
+
+@define(kw_only=True)
+class BuilderTask:
+    """A builder with the results of its discovery phases"""
+
+    _builder: GenericMarketObjectBuilder = field(alias="builder")
+    _initialized_state: Any = field(alias="initialized_state")
+    _reference_data: Any = field(alias="reference_data")
+    _dependencies: List[MarketObjectId] = field(alias="dependencies")
+    _output_id: MarketObjectId = field(alias="output_id")
+
+    @property
+    def builder(self):
+        return self._builder
+
+    @property
+    def dependencies(self):
+        return self._dependencies
+
+    @property
+    def output_id(self):
+        return self._output_id
+
+    def calculate(self, market_data: MarketEnvironment) -> MarketObject:
+        """Evaluates the builder on its market data"""
+        with self._builder.measure(BuilderPhase.CALCULATE):
+            return self._builder.calculate(
+                self._initialized_state, self._reference_data, market_data
+            )
+
+    def detached(self) -> "BuilderTask":
+        """Get a copy of the task measured by an empty profiler
+
+        Sent to a worker process instead of the task, so that the pickled
+        builder does not carry the records of the earlier tasks.
+        """
+        profiler = self._builder.profiler
+        if profiler is None:
+            return self
+        return attrs.evolve(self, builder=self._builder.with_profiler(profiler.fresh()))
+
+    @staticmethod
+    def create(builder: GenericMarketObjectBuilder):
+        with builder.measure(BuilderPhase.INITIALIZE):
+            initialized_state = builder.initialize()
+        with builder.measure(BuilderPhase.STATIC_DEPENDENCIES):
+            reference_data = builder.get_static_dependencies(initialized_state)
+        with builder.measure(BuilderPhase.MARKET_DEPENDENCIES):
+            dependencies = list(
+                builder.get_market_dependencies(initialized_state, reference_data)
+            )
+        return BuilderTask(
+            builder=builder,
+            initialized_state=initialized_state,
+            reference_data=reference_data,
+            dependencies=dependencies,
+            output_id=builder.get_output_id(initialized_state, reference_data),
+        )
+
+
+@define(kw_only=True)
+class BuilderScheduler:
+    """Runs market object builders concurrently, in dependency order"""
+
+    _builders: List[GenericMarketObjectBuilder] = field(
+        validator=attrs.validators.instance_of(list), alias="builders"
+    )
+    _executor_type: ExecutorType = field(
+        default=ExecutorType.PROCESS,
+        validator=attrs.validators.instance_of(ExecutorType),
+        alias="executor_type",
+    )
+    _max_workers: Optional[int] = field(default=None, alias="max_workers")
+    _result_cache: Optional[BuilderResultCache] = field(
+        default=None, alias="result_cache"
+    )
+
+    _tasks: List[BuilderTask] = field(factory=list, init=False)
+    _dependents: Dict[int, List[int]] = field(factory=dict, init=False)
+    _consumers: Dict[MarketObjectId, List[int]] = field(factory=dict, init=False)
+    _market_data: Optional[MarketEnvironment] = field(default=None, init=False)
+
+    @property
+    def market_data(self) -> Optional[MarketEnvironment]:
+        """Get the market env of the last run or update, with all outputs"""
+        return self._market_data
+
+    def run(self, market_data: MarketEnvironment) -> MarketEnvironment:
+        """Runs all builders and returns the market env extended with their outputs
+
+        The dependency graph is kept, so that later changes of the market data
+        only recompute the affected builders, see ``update``.
+
+        Args:
+            market_data (MarketEnvironment): The market env holding every input
+                that is not built by one of the builders.
+
+        Raises:
+            ValueError: if an input is neither in the market env nor built by a
+                builder, if two builders build the same object, or if the
+                dependencies are cyclic.
+        """
+        self._discover(market_data)
+        self._market_data = self._execute(market_data, range(len(self._tasks)))
+        return self._market_data
+
+    async def run_async(
+        self, market_data: MarketEnvironment, provider: MarketDataProvider
+    ) -> MarketEnvironment:
+        """Runs all builders, fetching the inputs missing from the market env
+
+        The inputs of all builders are fetched concurrently from the provider,
+        and each builder starts as soon as its own inputs are available, so the
+        I/O overlaps with the calculations instead of preceding them.
+
+        Args:
+            market_data (MarketEnvironment): The market env already available.
+            provider (MarketDataProvider): The source of the other inputs.
+
+        Returns:
+            MarketEnvironment: the market env extended with the fetched inputs
+            and the outputs of the builders.
+        """
+        self._discover(None)
+        producers = {task.output_id: index for index, task in enumerate(self._tasks)}
+        fetches: Dict[MarketObjectId, asyncio.Task] = {}
+        loop = asyncio.get_running_loop()
+        outputs = [loop.create_future() for _ in self._tasks]
+
+        def resolve(key: MarketObjectId) -> Awaitable[MarketObject]:
+            if key in producers:
+                return outputs[producers[key]]
+            if key not in fetches:
+                fetches[key] = asyncio.ensure_future(provider.fetch_bounded(key))
+            return fetches[key]
+
+        process_pool = self._executor_type == ExecutorType.PROCESS
+        executor_class = ProcessPoolExecutor if process_pool else ThreadPoolExecutor
+        with executor_class(max_workers=self._max_workers) as executor:
+
+            async def run_task(index: int):
+                task = self._tasks[index]
+                try:
+                    # inputs built by a builder or missing from the market env
+                    # are awaited, the others are taken from the market env
+                    awaited = [
+                        dep
+                        for dep in task.dependencies
+                        if dep in producers or dep not in market_data
+                    ]
+                    inputs = market_data.subset(
+                        [dep for dep in task.dependencies if dep not in awaited]
+                    ).extend(list(await asyncio.gather(*map(resolve, awaited))))
+                    key, output = self._cached(task, inputs)
+                    if output is None:
+                        output, records = await loop.run_in_executor(
+                            executor,
+                            _calculate,
+                            task.detached() if process_pool else task,
+                            inputs,
+                        )
+                        if task.builder.profiler is not None and process_pool:
+                            task.builder.profiler.extend(records)
+                        _check_output(output, task.output_id)
+                        if key is not None:
+                            self._result_cache.put(key, output)
+                    outputs[index].set_result(output)
+                except BaseException as error:
+                    # fail the consumers too; the error itself is raised here
+                    outputs[index].set_exception(error)
+                    outputs[index].exception()
+                    raise
+
+            await asyncio.gather(*map(run_task, range(len(self._tasks))))
+
+        fetched = [fetch.result() for fetch in fetches.values()]
+        self._market_data = market_data.extend(
+            fetched + [output.result() for output in outputs]
+        )
+        return self._market_data
+
+    def update(self, market_objects: List[MarketObject]) -> MarketEnvironment:
+        """Replaces market objects and recomputes only the builders affected
+
+        Args:
+            market_objects (List[MarketObject]): The updated market objects, e.g.
+                the option quotes that ticked.
+
+        Returns:
+            MarketEnvironment: the market env with the updated objects and the
+            recomputed outputs.
+
+        Raises:
+            ValueError: if ``run`` has not been called yet.
+        """
+        if self._market_data is None:
+            raise ValueError("The builders must be run before they are updated")
+
+        market_data = self._market_data.derive(market_objects)
+        dirty = self.dirty(obj.get_market_object_id() for obj in market_objects)
+        self._market_data = self._execute(market_data, dirty)
+        return self._market_data
+
+    def dirty(self, keys: Iterable[MarketObjectId]) -> List[int]:
+        """Get the builders to recompute when the given market objects change
+
+        These are the builders reading any of the objects, and recursively the
+        builders reading their outputs.
+
+        Args:
+            keys (Iterable[MarketObjectId]): The ids of the changed objects.
+
+        Returns:
+            List[int]: the indices of the dirty builders, sorted.
+        """
+        dirty = set()
+        stack = [index for key in keys for index in self._consumers.get(key, [])]
+        while stack:
+            index = stack.pop()
+            if index not in dirty:
+                dirty.add(index)
+                stack.extend(self._dependents.get(index, []))
+        return sorted(dirty)
+
+    def _execute(
+        self, market_data: MarketEnvironment, indices: Iterable[int]
+    ) -> MarketEnvironment:
+        """Runs the given builders in dependency order, independent ones concurrently"""
+        indices = set(indices)
+        if not indices:
+            return market_data
+
+        remaining = dict.fromkeys(indices, 0)
+        for index in indices:
+            for child in self._dependents.get(index, []):
+                if child in remaining:
+                    remaining[child] += 1
+
+        process_pool = self._executor_type == ExecutorType.PROCESS
+        executor_class = ProcessPoolExecutor if process_pool else ThreadPoolExecutor
+        with executor_class(max_workers=self._max_workers) as executor:
+            pending: Dict[Future, int] = {}
+            cache_keys: Dict[int, str] = {}
+
+            def submit(index: int):
+                task = self._tasks[index]
+                inputs = market_data.subset(task.dependencies)
+                key, result = self._cached(task, inputs)
+                if result is not None:
+                    future = Future()
+                    future.set_result((result, []))
+                    pending[future] = index
+                    return
+                if key is not None:
+                    cache_keys[index] = key
+
+                if process_pool:
+                    task = task.detached()
+                pending[executor.submit(_calculate, task, inputs)] = index
+
+            for index, count in remaining.items():
+                if count == 0:
+                    submit(index)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                completed = [pending.pop(future) for future in done]
+                outputs = []
+                for index, future in zip(completed, done):
+                    output, records = future.result()
+                    outputs.append(output)
+                    profiler = self._tasks[index].builder.profiler
+                    if profiler is not None and process_pool:
+                        # measured by a fresh profiler in a worker process
+                        profiler.extend(records)
+                market_data = _add_outputs(
+                    market_data,
+                    outputs,
+                    [self._tasks[index].output_id for index in completed],
+                )
+                for index, output in zip(completed, outputs):
+                    if index in cache_keys:
+                        self._result_cache.put(cache_keys.pop(index), output)
+
+                for index in completed:
+                    for child in self._dependents.get(index, []):
+                        if child in remaining:
+                            remaining[child] -= 1
+                            if remaining[child] == 0:
+                                submit(child)
+
+        return market_data
+
+    def _discover(self, market_data: Optional[MarketEnvironment]):
+        """Runs the discovery phases of the builders and builds the graph"""
+        self._tasks = [BuilderTask.create(builder) for builder in self._builders]
+        self._dependents = self._dependency_graph(self._tasks, market_data)
+        self._consumers = defaultdict(list)
+        for index, task in enumerate(self._tasks):
+            for dep in task.dependencies:
+                self._consumers[dep].append(index)
+
+    def _cached(
+        self, task: BuilderTask, inputs: MarketEnvironment
+    ) -> Tuple[Optional[str], Optional[MarketObject]]:
+        """Looks up the result cache, if any, returning the key and the result"""
+        if self._result_cache is None:
+            return None, None
+        key = self._result_cache.key(
+            task.builder, task.output_id, task.dependencies, inputs
+        )
+        return key, self._result_cache.get(key)
+
+    @staticmethod
+    def _dependency_graph(
+        tasks: List[BuilderTask], market_data: Optional[MarketEnvironment]
+    ) -> Dict[int, List[int]]:
+        """Maps every task to the tasks consuming its output
+
+        Inputs not built by a builder must be in the market env, if given.
+        """
+        producers: Dict[MarketObjectId, int] = {}
+        for index, task in enumerate(tasks):
+            if task.output_id in producers:
+                raise ValueError(f"{task.output_id} is built by more than one builder")
+            producers[task.output_id] = index
+
+        dependents: Dict[int, List[int]] = defaultdict(list)
+        for index, task in enumerate(tasks):
+            for dep in task.dependencies:
+                if dep in producers:
+                    dependents[producers[dep]].append(index)
+                elif market_data is not None and dep not in market_data:
+                    raise ValueError(f"{dep} not found in the market env!")
+
+        # Kahn's algorithm: every task is reached iff the graph is acyclic
+        remaining = [0] * len(tasks)
+        for children in dependents.values():
+            for child in children:
+                remaining[child] += 1
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+        visited = 0
+        while ready:
+            visited += 1
+            for child in dependents[ready.pop()]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if visited != len(tasks):
+            raise ValueError("The builder dependencies are cyclic")
+
+        return dict(dependents)
+
+
+def _calculate(
+    task: BuilderTask, market_data: MarketEnvironment
+) -> Tuple[MarketObject, List[PhaseRecord]]:
+    """Runs one builder; module level so that it can be sent to a process pool
+
+    Returns the output with the phase records measured during the call. In a
+    worker process they would otherwise be lost with the copy of the builder.
+    """
+    profiler = task.builder.profiler
+    start = 0 if profiler is None else len(profiler.records)
+    output = task.calculate(market_data)
+    return output, [] if profiler is None else profiler.records[start:]
+
+
+def _add_outputs(
+    market_data: MarketEnvironment,
+    outputs: List[MarketObject],
+    output_ids: List[MarketObjectId],
+) -> MarketEnvironment:
+    """Adds builder outputs to the market env, in their default services"""
+    for output, output_id in zip(outputs, output_ids):
+        _check_output(output, output_id)
+    return market_data.extend(outputs)
+
+
+def _check_output(output: MarketObject, output_id: MarketObjectId):
+    """Checks that a builder returned the market object it declared"""
+    if not isinstance(output, MarketObject):
+        raise TypeError(f"The builder of {output_id} did not return a MarketObject")
+    if output.get_market_object_id() != output_id:
+        raise ValueError(f"Expected {output_id}, got {output.get_market_object_id()}")
@@ -3,14 +3,18 @@ This base class provides the ability to build market objects.
 """
 
 from abc import abstractmethod
+import copy
+from contextlib import nullcontext
+import attrs
 from attrs import field, define
-from typing import List, Any
+from typing import ContextManager, List, Any, Optional
 from py_volanalytics.valuation_framework.market_data import (
     MarketObjectId,
     MarketObject,
     MarketEnvironment,
 )
-from py_volanalytics.types.enums import GMOBState
+from py_volanalytics.valuation_framework.builder_profiler import BuilderProfiler
+from py_volanalytics.types.enums import BuilderPhase, GMOBState
 
 
 @define(kw_only=True)
@@ -18,6 +22,44 @@ class GenericMarketObjectBuilder:
     """Component that is used in py_volanalytics to create market data"""
 
     _state: GMOBState = field(default=GMOBState.CREATED)
+    _profiler: Optional[BuilderProfiler] = field(
+        default=None, alias="profiler", eq=False, repr=False
+    )
+
+    @property
+    def profiler(self) -> Optional[BuilderProfiler]:
+        return self._profiler
+
+    def with_profiler(
+        self, profiler: Optional[BuilderProfiler]
+    ) -> "GenericMarketObjectBuilder":
+        """Get a shallow copy of the builder reporting to another profiler"""
+        builder = copy.copy(self)
+        builder._profiler = profiler
+        return builder
+
+    def label(self) -> str:
+        """Get a short description of the builder, from its parameters"""
+        base_fields = {
+            attribute.name for attribute in attrs.fields(GenericMarketObjectBuilder)
+        }
+        parameters = ", ".join(
+            f"{attribute.alias}={getattr(self, attribute.name)!s}"
+            for attribute in attrs.fields(type(self))
+            if attribute.init and attribute.name not in base_fields
+        )
+        return f"{type(self).__name__}({parameters})"
+
+    def measure(self, phase: BuilderPhase) -> ContextManager:
+        """Get a context measuring a lifecycle phase, if a profiler is attached
+
+        Example usage:
+            with builder.measure(BuilderPhase.CALCULATE):
+                builder.calculate(initialized_state, reference_data, market_data)
+        """
+        if self._profiler is None:
+            return nullcontext()
+        return self._profiler.measure(self.label(), phase)
 
     @abstractmethod
     def initialize(self) -> Any:
@@ -38,6 +80,15 @@ class GenericMarketObjectBuilder:
         """Get all market data dependencies"""
         pass
 
+    @abstractmethod
+    def get_output_id(
+        self,
+        initialized_state: Any,
+        reference_data: Any,
+    ) -> MarketObjectId:
+        """Get the id of the market object built by calculate"""
+        pass
+
     @abstractmethod
     def calculate(
         self,
@@ -69,13 +120,6 @@ class GenericMarketObjectBuilder:
     ):
         # Validation phase
         deps = self.get_market_dependencies(initialized_state, reference_data)
-        market_objects: List[MarketObject] = [
-            mkt_obj
-            for service in market_data.get_values()
-            for mkt_obj in service.get_values()
-        ]
-        market_keys = [mkt_obj.get_market_object_id() for mkt_obj in market_objects]
-
-        for dep in deps:
-            if dep not in market_keys:
-                raise ValueError(f"{dep} not found in the market env!")
+        missing = market_data.missing(deps)
+        if missing:
+            raise ValueError(f"{missing[0]} not found in the market env!")
@@ -2,16 +2,23 @@
 Framework for market data objects such as curves, volatility surface, valuation date.
 """
 
-from typing import Optional, Any, List
-from abc import ABC, abstractmethod
+import warnings
+from collections import ChainMap
+from typing import Optional, Any, List, Iterable, Mapping
+from abc import abstractmethod
 import attrs
-from attrs import define, field
+from attrs import define, field, frozen
 from py_volanalytics.types.enums import MarketDataServiceId, MarketObjects
 
 
-@define(kw_only=True)
+@frozen(kw_only=True, cache_hash=True)
 class MarketObjectId:
-    """Base class for all market object identifiers"""
+    """Base class for all market object identifiers
+
+    Identifiers are immutable and hashable, with the hash computed once, so they
+    are used directly as dictionary keys. Subclasses must be declared with
+    ``@frozen(kw_only=True, cache_hash=True)`` as well.
+    """
 
     _friendly_name: MarketObjects = field(
         validator=attrs.validators.instance_of(MarketObjects), alias="friendly_name"
@@ -44,7 +51,9 @@ class MarketDataService:
     _id: MarketDataServiceId = field(
         alias="id", validator=attrs.validators.instance_of(MarketDataServiceId)
     )
-    _market_data_dict: dict = field(alias="market_data_dict")
+    _market_data_dict: dict[MarketObjectId, MarketObject] = field(
+        alias="market_data_dict"
+    )
 
     def get_keys(self):
         """Get all market data keys inside this service"""
@@ -54,18 +63,41 @@ class MarketDataService:
         """Get all market objects inside this service"""
         return self._market_data_dict.values()
 
-    def get_value(self, key: dict) -> MarketObject:
+    def get_value(self, key: MarketObjectId | dict) -> MarketObject:
         """Get market data object for the user-supplied key"""
-        key = tuple(key.values())
-        return self._market_data_dict[key]
+        market_object = self._market_data_dict.get(self._resolve(key))
+        if market_object is None:
+            raise KeyError(key)
+        return market_object
 
-    def try_find_key(self, key: dict) -> Optional[MarketObject]:
+    def try_find_key(self, key: MarketObjectId | dict) -> Optional[MarketObject]:
         """Try to find the market data object for the user-supplied key"""
-        key = tuple(key.values())
-        if key not in self._market_data_dict:
-            return None
-
-        return self._market_data_dict[key]
+        return self._market_data_dict.get(self._resolve(key))
+
+    def _resolve(self, key: MarketObjectId | dict) -> Optional[MarketObjectId]:
+        """Get the id of a key
+
+        Dict ids, as returned by ``MarketObjectId.get_id``, are deprecated and
+        will not be accepted in the next release. They are matched by a scan of
+        the keys.
+        """
+        if not isinstance(key, dict):
+            return key
+        warnings.warn(
+            "Looking up market objects by dict id is deprecated, "
+            "pass the MarketObjectId instead",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        values = tuple(key.values())
+        return next(
+            (
+                market_object_id
+                for market_object_id in self._market_data_dict.keys()
+                if tuple(market_object_id.get_id().values()) == values
+            ),
+            None,
+        )
 
     def get_service_id(self) -> Any:
         return self._id
@@ -80,16 +112,17 @@ class MarketDataService:
 
     @staticmethod
     def create(service_id: MarketDataServiceId, market_objects: List[MarketObject]):
-        keys = [obj.get_market_object_id() for obj in market_objects]
-        market_data_dict = {}
-
-        for k, v in list(zip(keys, market_objects)):
-            k = tuple(k.get_id().values())
-            market_data_dict[k] = v
+        market_data_dict = {obj.get_market_object_id(): obj for obj in market_objects}
 
         return MarketDataService(id=service_id, market_data_dict=market_data_dict)
 
 
+def default_service_id(key: MarketObjectId) -> MarketDataServiceId:
+    """Get the service holding market objects of a kind, e.g. the
+    IMPLIED_VOLATILITY_SURFACE_SERVICE for an IMPLIED_VOLATILITY_SURFACE"""
+    return MarketDataServiceId[f"{key.friendly_name.name}_SERVICE"]
+
+
 @define(kw_only=True)
 class MarketEnvironment:
     """Class representing a collection of Market data services"""
@@ -98,6 +131,23 @@ class MarketEnvironment:
         validator=attrs.validators.instance_of(dict),
         alias="market_data_services",
     )
+    _index: Mapping[MarketObjectId, MarketDataServiceId] = field(init=False)
+
+    def __attrs_post_init__(self):
+        # global index from market object id to service, for O(1) lookups. Only
+        # the keys of the services are read, so lazily built objects stay unbuilt
+        self._index = {}
+        for service_id, service in self._market_data_services.items():
+            for key in service.market_data_dict.keys():
+                if key in self._index:
+                    raise ValueError(f"{key} is provided by more than one service")
+                self._index[key] = service_id
+
+    def __contains__(self, key: MarketObjectId) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
 
     def get_keys(self):
         """Get all market data keys inside this service"""
@@ -120,6 +170,102 @@ class MarketEnvironment:
 
         return self._market_data_services[key]
 
+    def get_market_object(self, key: MarketObjectId) -> MarketObject:
+        """Get the market object for the user-supplied id, whatever its service"""
+        market_object = self.try_find_market_object(key)
+        if market_object is None:
+            raise ValueError(f"{key} not found in the market env!")
+        return market_object
+
+    def try_find_market_object(self, key: MarketObjectId) -> Optional[MarketObject]:
+        """Try to find the market object for the user-supplied id"""
+        service_id = self._index.get(key)
+        if service_id is None:
+            return None
+        return self._market_data_services[service_id].market_data_dict[key]
+
+    def missing(self, keys: Iterable[MarketObjectId]) -> List[MarketObjectId]:
+        """Get the ids that are not in the market env, in order"""
+        return [key for key in keys if key not in self._index]
+
+    def derive(
+        self,
+        market_objects: List[MarketObject],
+        service_id: Optional[MarketDataServiceId] = None,
+    ) -> "MarketEnvironment":
+        """Create a scenario environment with some market objects replaced or added
+
+        The derived environment shares the services and objects of this one and
+        only records the overridden market object ids, so its cost is
+        proportional to the number of overrides, not to the size of the
+        environment or to the overrides of earlier derives (amortized, see
+        ``MarketEnvironmentOverlay``).
+
+        Args:
+            market_objects (List[MarketObject]): The replacement objects. Objects
+                whose ids are not in the market env are added.
+            service_id (Optional[MarketDataServiceId]): The service holding the
+                added objects, required if any object is new.
+        """
+        overrides = {obj.get_market_object_id(): obj for obj in market_objects}
+        missing = self.missing(overrides)
+        if missing and service_id is None:
+            raise ValueError(f"{missing[0]} not found in the market env!")
+
+        return MarketEnvironmentOverlay(
+            market_data_services=self._market_data_services,
+            base=self,
+            overrides=overrides,
+            added={key: service_id for key in missing},
+        )
+
+    def extend(self, market_objects: List[MarketObject]) -> "MarketEnvironment":
+        """Create a derived environment with market objects added or replaced
+
+        New objects go to the default service of their kind, see
+        ``default_service_id``.
+
+        Args:
+            market_objects (List[MarketObject]): The objects to add or replace.
+        """
+        services: dict[MarketDataServiceId, List[MarketObject]] = {}
+        for obj in market_objects:
+            services.setdefault(
+                default_service_id(obj.get_market_object_id()), []
+            ).append(obj)
+
+        market_data = self
+        for service_id, objects in services.items():
+            market_data = market_data.derive(objects, service_id=service_id)
+        return market_data
+
+    def subset(self, keys: Iterable[MarketObjectId]) -> "MarketEnvironment":
+        """Create an environment holding only the given market objects
+
+        The objects keep their services. This is the environment to ship to a
+        worker process that only needs the dependencies of one builder.
+
+        Args:
+            keys (Iterable[MarketObjectId]): The ids of the market objects.
+        """
+        keys = list(keys)
+        missing = self.missing(keys)
+        if missing:
+            raise ValueError(f"{missing[0]} not found in the market env!")
+
+        services = []
+        for service in self.get_values():
+            market_data_dict = {
+                key: service.market_data_dict[key]
+                for key in keys
+                if key in service.market_data_dict
+            }
+            if market_data_dict:
+                services.append(
+                    MarketDataService(id=service.id, market_data_dict=market_data_dict)
+                )
+        return MarketEnvironment.create(services)
+
     @staticmethod
     def create(services: List[MarketDataService]):
         market_data_services_dict = {}
@@ -129,3 +275,137 @@ class MarketEnvironment:
             market_data_services_dict[k] = v
 
         return MarketEnvironment(market_data_services=market_data_services_dict)
+
+
+@define(kw_only=True)
+class MarketEnvironmentOverlay(MarketEnvironment):
+    """Copy-on-write view of a market environment with overridden market objects
+
+    Lookups check the overrides first, then fall through to the base
+    environment. Services are only copied, as overlays of the base services,
+    when they are requested and hold an overridden or added object.
+
+    Overlays of overlays sit directly on the root environment. Their overrides
+    chain the overrides of the parent overlay instead of copying them, and the
+    newest maps of the chain are merged while they are at least as large as
+    the next one. A chain therefore holds O(log n) maps after n derives, and
+    every override is copied O(log n) times, so repeated derives, e.g. one per
+    batch of builder outputs in ``BuilderScheduler``, do not copy all the
+    earlier overrides each time.
+    """
+
+    _base: MarketEnvironment = field(
+        validator=attrs.validators.instance_of(MarketEnvironment), alias="base"
+    )
+    _overrides: Mapping[MarketObjectId, MarketObject] = field(alias="overrides")
+    _added: Mapping[MarketObjectId, MarketDataServiceId] = field(
+        factory=dict, alias="added"
+    )
+    _length: int = field(init=False)
+
+    def __attrs_post_init__(self):
+        # the added ids are missing from the base, see derive
+        self._length = len(self._base) + len(self._added)
+        if isinstance(self._base, MarketEnvironmentOverlay):
+            self._overrides = _chain(self._overrides, self._base.overrides)
+            self._added = _chain(self._added, self._base.added)
+            self._base = self._base.base
+        self._index = ChainMap(self._added, self._base._index)
+
+    @property
+    def base(self) -> MarketEnvironment:
+        return self._base
+
+    @property
+    def overrides(self) -> Mapping[MarketObjectId, MarketObject]:
+        return self._overrides
+
+    @property
+    def added(self) -> Mapping[MarketObjectId, MarketDataServiceId]:
+        """Get the ids of the added market objects, with their service ids."""
+        return self._added
+
+    def __len__(self) -> int:
+        return self._length
+
+    def try_find_market_object(self, key: MarketObjectId) -> Optional[MarketObject]:
+        """Try to find the market object for the user-supplied id"""
+        market_object = self._overrides.get(key)
+        if market_object is None:
+            return self._base.try_find_market_object(key)
+        return market_object
+
+    def subset(self, keys: Iterable[MarketObjectId]) -> MarketEnvironment:
+        """Create an environment holding only the given market objects
+
+        The objects taken from the base environment are subset by the base, so
+        that, e.g., a shared memory base stays shared, and the overridden or
+        added ones are overlaid on top.
+
+        Args:
+            keys (Iterable[MarketObjectId]): The ids of the market objects.
+        """
+        keys = list(keys)
+        missing = self.missing(keys)
+        if missing:
+            raise ValueError(f"{missing[0]} not found in the market env!")
+
+        market_data = self._base.subset(
+            [key for key in keys if key not in self._overrides]
+        )
+        services: dict[MarketDataServiceId, List[MarketObject]] = {}
+        for key in keys:
+            if key in self._overrides:
+                services.setdefault(self._index[key], []).append(self._overrides[key])
+        for service_id, objects in services.items():
+            market_data = market_data.derive(objects, service_id=service_id)
+        return market_data
+
+    def get_keys(self):
+        """Get all market data keys inside this service"""
+        return list(dict.fromkeys([*self._base.get_keys(), *self._added.values()]))
+
+    def get_values(self):
+        """Get all market objects inside this service"""
+        return [self.get_value(key) for key in self.get_keys()]
+
+    def get_value(self, key: MarketDataServiceId) -> MarketDataService:
+        """Get market data object for the user-supplied key"""
+        service = self.try_find_key(key)
+        if service is None:
+            raise KeyError(key)
+        return service
+
+    def try_find_key(self, key: MarketDataServiceId) -> Optional[MarketDataService]:
+        """Try to find the market data object for the user-supplied key"""
+        service = self._base.try_find_key(key)
+        if service is None:
+            if key not in self._added.values():
+                return None
+            service = MarketDataService(id=key, market_data_dict={})
+        return self._overlay(service)
+
+    def _overlay(self, service: MarketDataService) -> MarketDataService:
+        overrides = {
+            key: market_object
+            for key, market_object in self._overrides.items()
+            if key in service.market_data_dict or self._added.get(key) == service.id
+        }
+        if not overrides:
+            return service
+
+        return MarketDataService(
+            id=service.id,
+            market_data_dict=ChainMap(overrides, service.market_data_dict),
+        )
+
+
+def _chain(newer: Mapping, older: Mapping) -> Mapping:
+    """Chain a map in front of another, merging the newest maps of the chain
+    while they are at least as large as the next one"""
+    if not newer:
+        return older
+    maps = [newer, *(older.maps if isinstance(older, ChainMap) else [older])]
+    while len(maps) > 1 and len(maps[0]) >= len(maps[1]):
+        maps[:2] = [{**maps[1], **maps[0]}]
+    return maps[0] if len(maps) == 1 else ChainMap(*maps)
@@ -0,0 +1,128 @@
+"""
+Asynchronous market data providers.
+
+A ``MarketDataProvider`` fetches market objects by id from a source such as a
+database, a market data feed or files. Fetches are coroutines, so the market
+dependencies of many builders are loaded concurrently, with at most
+``max_concurrency`` requests in flight, and ``BuilderScheduler.run_async``
+starts each builder as soon as its own inputs have arrived.
+
+``FileMarketDataProvider`` serves pickled market objects from a local
+directory; it is meant for tests and for replaying captured market data.
+
+Example usage:
+    provider = FileMarketDataProvider(directory="/data/market/2024-06-28")
+    market_data = asyncio.run(provider.load(builder_dependencies))
+"""
+
+import asyncio
+import os
+import pickle
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+import attrs
+from attrs import define, field
+from py_volanalytics.utils.fingerprint import fingerprint
+from py_volanalytics.valuation_framework.market_data import (
+    MarketObjectId,
+    MarketObject,
+    MarketEnvironment,
+)
+
+
+@define(kw_only=True)
+class MarketDataProvider(ABC):
+    """Base class for all asynchronous market data sources"""
+
+    _max_concurrency: int = field(
+        default=16, validator=attrs.validators.gt(0), alias="max_concurrency"
+    )
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, init=False)
+    _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False)
+
+    @abstractmethod
+    async def fetch(self, key: MarketObjectId) -> MarketObject:
+        """Fetch one market object from the source
+
+        Raises:
+            ValueError: if the source has no object with this id.
+        """
+        pass
+
+    async def fetch_bounded(self, key: MarketObjectId) -> MarketObject:
+        """Fetch one market object, waiting while too many fetches are in flight"""
+        # a semaphore belongs to the event loop it was first used in
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async with self._semaphore:
+            return await self.fetch(key)
+
+    async def fetch_many(
+        self, keys: Iterable[MarketObjectId]
+    ) -> Dict[MarketObjectId, MarketObject]:
+        """Fetch market objects concurrently, with bounded parallelism"""
+        keys = list(dict.fromkeys(keys))
+        market_objects = await asyncio.gather(*map(self.fetch_bounded, keys))
+        return dict(zip(keys, market_objects))
+
+    async def load(
+        self,
+        keys: Iterable[MarketObjectId],
+        market_data: Optional[MarketEnvironment] = None,
+    ) -> MarketEnvironment:
+        """Fetch the market objects missing from a market env and add them
+
+        Args:
+            keys (Iterable[MarketObjectId]): The ids of the market objects
+                needed, e.g. the market dependencies of builders.
+            market_data (Optional[MarketEnvironment]): The market env already
+                available, if any.
+
+        Returns:
+            MarketEnvironment: the market env holding all the requested objects,
+            each fetched one in the default service of its kind.
+        """
+        if market_data is None:
+            market_data = MarketEnvironment.create([])
+        fetched = await self.fetch_many(market_data.missing(keys))
+        return market_data.extend(list(fetched.values()))
+
+
+@define(kw_only=True)
+class FileMarketDataProvider(MarketDataProvider):
+    """Serves pickled market objects from a directory, one file per object"""
+
+    _directory: str = field(
+        validator=attrs.validators.instance_of(str), alias="directory"
+    )
+
+    def __attrs_post_init__(self):
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def save(self, market_objects: List[MarketObject]):
+        """Store market objects, replacing any stored under the same ids"""
+        for obj in market_objects:
+            with open(self._path(obj.get_market_object_id()), "wb") as file:
+                pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    async def fetch(self, key: MarketObjectId) -> MarketObject:
+        """Read one market object in a worker thread, off the event loop"""
+        return await asyncio.to_thread(self._read, key)
+
+    def _read(self, key: MarketObjectId) -> MarketObject:
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise ValueError(f"{key} not found in {self._directory}")
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def _path(self, key: MarketObjectId) -> str:
+        # ids are hashed to a stable file name, independent of their repr
+        return os.path.join(self._directory, f"{fingerprint(key)}.pkl")
@@ -0,0 +1,380 @@
+"""
+Columnar snapshots of market environments.
+
+``save_snapshot`` writes a market environment to a directory of ``.npy``
+columns plus a JSON manifest. The market objects of a service are grouped by
+class, and each group is stored as a table with one column per attrs field:
+
+* numbers, booleans, dates and strings are plain columns,
+* enums are member names, with the enum class in the manifest,
+* numpy arrays (e.g. curve times) are concatenated, with an offsets column,
+* lists of attrs objects (e.g. the quotes of an ``OptionQuotes``) are nested
+  tables, with an offsets column,
+* attrs objects (e.g. market object ids) are nested tables, one row per object,
+* anything else is pickled.
+
+``load_snapshot`` memory-maps the columns, so reloading an environment with
+millions of quotes reads the manifest and the id columns only. The market
+objects themselves are built from the mapped columns on first access; numpy
+fields are zero-copy, read-only views of the files.
+
+Only the attrs fields set at construction are stored, and objects are rebuilt
+through their constructor, so derived state, such as fitted interpolators, is
+recomputed on load. The same encoding, through ``write_columns``, publishes
+market environments in shared memory (see ``shared_market_data``).
+
+Example usage:
+    save_snapshot(market_data, "/data/snapshots/2024-06-28")
+    market_data = load_snapshot("/data/snapshots/2024-06-28")
+"""
+
+import datetime as dt
+import importlib
+import json
+import os
+import pickle
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+import attrs
+import numpy as np
+from attrs import define, field
+from py_volanalytics.types.enums import MarketDataServiceId
+from py_volanalytics.valuation_framework.market_data import (
+    MarketObjectId,
+    MarketObject,
+    MarketDataService,
+    MarketEnvironment,
+)
+
+MANIFEST = "manifest.json"
+SNAPSHOT_VERSION = 2
+
+
+def save_snapshot(market_data: MarketEnvironment, directory: str):
+    """Write a market environment to a directory of columns and a manifest.
+
+    Args:
+        market_data (MarketEnvironment): The market env, possibly an overlay.
+        directory (str): The target directory, created if needed. Existing
+            snapshot files are overwritten.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def sink(name: str, array: np.ndarray):
+        path = os.path.join(directory, name)
+        if name.endswith(".pkl"):
+            array.tofile(path)
+        else:
+            np.save(path, array, allow_pickle=False)
+
+    services = write_columns(market_data, sink)
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump({"version": SNAPSHOT_VERSION, "services": services}, file)
+
+
+def load_snapshot(directory: str) -> MarketEnvironment:
+    """Reload a market environment saved with ``save_snapshot``.
+
+    The columns are memory-mapped and the market objects are only built when
+    they are first looked up.
+
+    Args:
+        directory (str): The snapshot directory.
+    """
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+        manifest = json.load(file)
+    if manifest["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest['version']}")
+
+    def source(name: str) -> np.ndarray:
+        path = os.path.join(directory, name)
+        if name.endswith(".pkl"):
+            return np.fromfile(path, dtype=np.uint8)
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+
+    return MarketEnvironment.create(
+        [
+            MarketDataService(
+                id=MarketDataServiceId[service["id"]],
+                market_data_dict=LazyMarketObjects(
+                    tables=[ColumnTable(schema, source) for schema in service["tables"]]
+                ),
+            )
+            for service in manifest["services"]
+        ]
+    )
+
+
+def write_columns(
+    market_data: MarketEnvironment, sink: Callable[[str, np.ndarray], None]
+) -> List[dict]:
+    """Encode the market objects of a market env as columns.
+
+    Args:
+        market_data (MarketEnvironment): The market env.
+        sink (Callable[[str, np.ndarray], None]): Stores a column under a name.
+            Names ending in ``.pkl`` hold the bytes of a pickle.
+
+    Returns:
+        List[dict]: The schema of every service, to be stored with the columns.
+    """
+    writer = ColumnWriter(sink=sink)
+    services = []
+    for service in market_data.get_values():
+        groups: Dict[type, List[MarketObject]] = {}
+        for obj in service.market_data_dict.values():
+            groups.setdefault(type(obj), []).append(obj)
+        services.append(
+            {
+                "id": service.id.name,
+                "tables": [
+                    writer.table(objects, cls) for cls, objects in groups.items()
+                ],
+            }
+        )
+    return services
+
+
+class LazyMarketObjects(Mapping):
+    """Read-only mapping of market object ids to objects built on first access"""
+
+    def __init__(
+        self,
+        tables: List["ColumnTable"],
+        rows: Optional[Dict[MarketObjectId, tuple]] = None,
+        built: Optional[Dict[MarketObjectId, MarketObject]] = None,
+    ):
+        self._tables = tables
+        if rows is None:
+            rows = {}
+            for table_index, table in enumerate(tables):
+                ids = table.nested("id").rows(0, table.size)
+                rows.update((key, (table_index, row)) for row, key in enumerate(ids))
+        # (table, row) of every market object
+        self._rows = rows
+        # objects built so far, possibly shared with restricted views
+        self._built = {} if built is None else built
+
+    def __getitem__(self, key: MarketObjectId) -> MarketObject:
+        market_object = self._built.get(key)
+        if market_object is None:
+            table_index, row = self._rows[key]
+            market_object = self._tables[table_index].row(row)
+            self._built[key] = market_object
+        return market_object
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[MarketObjectId]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+@define(kw_only=True)
+class ColumnWriter:
+    """Encodes tables of attrs objects into numpy columns"""
+
+    _sink: Callable[[str, np.ndarray], None] = field(alias="sink")
+    _count: int = field(default=0, init=False)
+
+    def table(self, objects: List[Any], cls: type) -> dict:
+        """Write a table with one row per object and return its schema."""
+        columns = []
+        for attribute in attrs.fields(cls):
+            if not attribute.init:
+                continue
+            values = [getattr(obj, attribute.name) for obj in objects]
+            column = self.column(values)
+            column["field"] = attribute.alias
+            columns.append(column)
+        return {"class": _qualified_name(cls), "size": len(objects), "columns": columns}
+
+    def column(self, values: List[Any]) -> dict:
+        """Write one field of all the rows and return its schema."""
+        present = [value for value in values if value is not None]
+        if not present:
+            return {"kind": "none"}
+
+        column: Dict[str, Any] = {}
+        if len(present) < len(values):
+            column["mask"] = self.save(np.array([value is None for value in values]))
+
+        sample = present[0]
+        if isinstance(sample, np.ndarray) and all(
+            isinstance(value, np.ndarray) and value.ndim == 1 for value in present
+        ):
+            arrays = [np.empty(0, sample.dtype) if v is None else v for v in values]
+            column.update(
+                kind="array",
+                values=self.save(np.concatenate(arrays)),
+                offsets=self.save(_offsets(arrays)),
+            )
+        elif isinstance(sample, Enum) and all(type(v) is type(sample) for v in present):
+            # member names, so that reordering the enum keeps old snapshots valid
+            column.update(
+                kind="enum",
+                enum=_qualified_name(type(sample)),
+                values=self.save(
+                    np.array(["" if v is None else v.name for v in values], np.str_)
+                ),
+            )
+        elif _homogeneous(present, (bool, int, float, str, dt.date)):
+            kind, dtype, fill = _SCALAR_KINDS[type(sample)]
+            column.update(
+                kind=kind,
+                values=self.save(
+                    np.array([fill if v is None else v for v in values], dtype=dtype)
+                ),
+            )
+        elif all(isinstance(value, list) for value in present) and _homogeneous(
+            [item for value in present for item in value], ()
+        ):
+            lists = [[] if value is None else value for value in values]
+            items = [item for value in lists for item in value]
+            column.update(
+                kind="table",
+                table=self.table(items, type(items[0])),
+                offsets=self.save(_offsets(lists)),
+            )
+        elif _homogeneous(present, ()) and len(present) == len(values):
+            column.update(kind="struct", table=self.table(values, type(sample)))
+        else:
+            column.update(kind="pickle", values=self.dump(values))
+        return column
+
+    def save(self, array: np.ndarray) -> str:
+        name = self._next_name("npy")
+        self._sink(name, array)
+        return name
+
+    def dump(self, values: List[Any]) -> str:
+        name = self._next_name("pkl")
+        data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        self._sink(name, np.frombuffer(data, dtype=np.uint8))
+        return name
+
+    def _next_name(self, extension: str) -> str:
+        self._count += 1
+        return f"column_{self._count}.{extension}"
+
+
+# python type -> (column kind, numpy dtype, placeholder for missing values)
+_SCALAR_KINDS = {
+    bool: ("scalar", np.bool_, False),
+    int: ("scalar", np.int64, 0),
+    float: ("scalar", np.float64, np.nan),
+    str: ("str", np.str_, ""),
+    dt.date: ("date", "datetime64[D]", "NaT"),
+}
+
+
+class ColumnTable:
+    """Table of attrs objects over mapped columns, decoding rows on demand"""
+
+    def __init__(self, schema: dict, source: Callable[[str], np.ndarray]):
+        self._source = source
+        self._cls = _resolve(schema["class"])
+        self._size = schema["size"]
+        self._columns = schema["columns"]
+        self._nested = {
+            column["field"]: ColumnTable(column["table"], source)
+            for column in self._columns
+            if column["kind"] in ("table", "struct")
+        }
+        self._loaded: Dict[str, Any] = {}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def nested(self, name: str) -> "ColumnTable":
+        return self._nested[name]
+
+    def row(self, index: int) -> Any:
+        return self.rows(index, index + 1)[0]
+
+    def rows(self, start: int, end: int) -> List[Any]:
+        """Build the objects of rows ``start`` to ``end`` (excluded)."""
+        fields = {
+            column["field"]: self._decode(column, start, end)
+            for column in self._columns
+        }
+        if not fields:
+            return [self._cls() for _ in range(start, end)]
+        return [self._cls(**dict(zip(fields, row))) for row in zip(*fields.values())]
+
+    def _decode(self, column: dict, start: int, end: int) -> List[Any]:
+        kind = column["kind"]
+        if kind == "none":
+            return [None] * (end - start)
+
+        if kind == "array":
+            data = self._load(column["values"])
+            offsets = self._load(column["offsets"])[start : end + 1].tolist()
+            values = [data[begin:stop] for begin, stop in zip(offsets, offsets[1:])]
+        elif kind == "table":
+            offsets = self._load(column["offsets"])[start : end + 1].tolist()
+            items = self._nested[column["field"]].rows(offsets[0], offsets[-1])
+            values = [
+                items[begin - offsets[0] : stop - offsets[0]]
+                for begin, stop in zip(offsets, offsets[1:])
+            ]
+        elif kind == "struct":
+            values = self._nested[column["field"]].rows(start, end)
+        elif kind == "enum":
+            enum_type = _resolve(column["enum"])
+            names = self._load(column["values"])[start:end].tolist()
+            values = [enum_type[name] if name else None for name in names]
+        elif kind == "pickle":
+            values = self._load(column["values"])[start:end]
+        else:
+            values = self._load(column["values"])[start:end].tolist()
+
+        if "mask" in column:
+            mask = self._load(column["mask"])[start:end].tolist()
+            values = [None if missing else v for v, missing in zip(values, mask)]
+        return values
+
+    def _load(self, name: str) -> Any:
+        loaded = self._loaded.get(name)
+        if loaded is None:
+            loaded = self._source(name)
+            if name.endswith(".pkl"):
+                loaded = pickle.loads(loaded.tobytes())
+            self._loaded[name] = loaded
+        return loaded
+
+
+def _offsets(sequences: List[Any]) -> np.ndarray:
+    """Start of every sequence in their concatenation, plus the total length."""
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum([len(sequence) for sequence in sequences], out=offsets[1:])
+    return offsets
+
+
+def _homogeneous(values: List[Any], scalar_types: tuple) -> bool:
+    """Whether all values have the same type, one of scalar_types or attrs."""
+    if not values:
+        return False
+    cls = type(values[0])
+    if scalar_types:
+        if cls not in scalar_types:
+            return False
+    elif not attrs.has(cls):
+        return False
+    return all(type(value) is cls for value in values)
+
+
+def _qualified_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve(name: str) -> type:
+    module, qualname = name.split(":")
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
@@ -0,0 +1,312 @@
+"""
+Market environments published in OS shared memory.
+
+Shipping a ``MarketEnvironment`` to a process pool pickles every curve and
+quote it holds, once per task. ``SharedMarketData.publish`` instead encodes the
+market objects as columns (see ``market_snapshot``) into a single shared memory
+block, and returns a ``SharedMarketEnvironment`` that pickles as the name of the
+block and the ids it holds. Worker processes attach the block once, and build
+the market objects they look up from read-only, zero-copy views of it, so the
+startup cost and memory of a worker do not grow with the size of the market
+data.
+
+The publishing process owns the block: ``close`` (or leaving the ``with``
+block) unlinks it, and it is also unlinked when the owner is garbage collected
+or exits. Workers must be done with the environment by then. A worker keeps
+the blocks it attached mapped across tasks; when it attaches a new block, it
+detaches the ones unlinked since, so that a long-lived pool does not pile up
+the mappings of earlier publishes.
+
+Example usage:
+    with SharedMarketData.publish(market_data) as shared:
+        scheduler = BuilderScheduler(builders=builders)
+        market_data = scheduler.run(shared.market_data)
+"""
+
+import json
+import sys
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from attrs import define, field
+from py_volanalytics.types.enums import MarketDataServiceId
+from py_volanalytics.valuation_framework.market_data import (
+    MarketObjectId,
+    MarketObject,
+    MarketDataService,
+    MarketEnvironment,
+)
+from py_volanalytics.valuation_framework.market_snapshot import (
+    ColumnTable,
+    LazyMarketObjects,
+    write_columns,
+)
+
+# columns start on cache line boundaries
+_ALIGNMENT = 64
+# the block starts with the length of the manifest, then the manifest as JSON
+_HEADER = np.dtype("<u8")
+
+# blocks attached in this process, by name. Forked workers inherit the entries
+# of their parent and reuse its mapping. Entries of unlinked blocks are dropped
+# by the owner on unlink, and by the other processes on their next attach
+_ATTACHED: Dict[str, "_Attachment"] = {}
+
+
+@define(kw_only=True)
+class SharedMarketData:
+    """Owner of a market environment published in shared memory"""
+
+    _memory: shared_memory.SharedMemory = field(alias="memory")
+    _market_data: "SharedMarketEnvironment" = field(alias="market_data")
+    _finalizer: weakref.finalize = field(init=False)
+
+    def __attrs_post_init__(self):
+        self._finalizer = weakref.finalize(self, _unlink, self._memory)
+
+    @property
+    def name(self) -> str:
+        """Get the name of the shared memory block."""
+        return self._memory.name
+
+    @property
+    def size(self) -> int:
+        """Get the size of the shared memory block, in bytes."""
+        return self._memory.size
+
+    @property
+    def market_data(self) -> "SharedMarketEnvironment":
+        return self._market_data
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self):
+        """Unlink the shared memory block.
+
+        The memory is released once the views still held on it, in this
+        process or in workers, are gone.
+        """
+        self._finalizer()
+
+    def __enter__(self) -> "SharedMarketData":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def publish(market_data: MarketEnvironment) -> "SharedMarketData":
+        """Copy the market objects of a market env into a new shared memory block.
+
+        Args:
+            market_data (MarketEnvironment): The market env, possibly an overlay.
+
+        Returns:
+            SharedMarketData: The owner of the block.
+        """
+        columns: Dict[str, np.ndarray] = {}
+        services = write_columns(market_data, columns.__setitem__)
+
+        layout = {}
+        offset = 0
+        for name, array in columns.items():
+            layout[name] = {
+                "offset": offset,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+            offset = _aligned(offset + array.nbytes)
+        manifest = json.dumps({"services": services, "layout": layout}).encode()
+        start = _aligned(_HEADER.itemsize + len(manifest))
+
+        memory = shared_memory.SharedMemory(create=True, size=max(start + offset, 1))
+        buffer = memory.buf
+        np.ndarray((), _HEADER, buffer=buffer)[()] = len(manifest)
+        buffer[_HEADER.itemsize : _HEADER.itemsize + len(manifest)] = manifest
+        for name, array in columns.items():
+            _view(buffer, start, layout[name])[...] = array
+
+        attachment = _Attachment.create(memory)
+        _ATTACHED[memory.name] = attachment
+        return SharedMarketData(memory=memory, market_data=attachment.market_data())
+
+
+@define(kw_only=True)
+class SharedMarketEnvironment(MarketEnvironment):
+    """Market environment whose market objects live in shared memory
+
+    Pickling it, e.g. to send it to a worker process, only pickles the name of
+    the shared memory block and the ids it holds.
+    """
+
+    _block: str = field(alias="block")
+    _keys: Optional[frozenset] = field(default=None, alias="keys")
+
+    @property
+    def block(self) -> str:
+        """Get the name of the shared memory block."""
+        return self._block
+
+    def subset(self, keys: Iterable[MarketObjectId]) -> "SharedMarketEnvironment":
+        """Create an environment, still in shared memory, of the given objects"""
+        keys = frozenset(keys)
+        missing = self.missing(keys)
+        if missing:
+            raise ValueError(f"{missing[0]} not found in the market env!")
+        return _attached(self._block).market_data(keys)
+
+    def __reduce__(self):
+        return _attach, (self._block, self._keys)
+
+
+class SharedMarketObjects(LazyMarketObjects):
+    """Market objects of one service, built from shared memory on first access"""
+
+    def __init__(
+        self,
+        block: str,
+        service_id: MarketDataServiceId,
+        tables: List[ColumnTable],
+        rows: Optional[dict] = None,
+        built: Optional[Dict[MarketObjectId, MarketObject]] = None,
+    ):
+        super().__init__(tables=tables, rows=rows, built=built)
+        self._block = block
+        self._service_id = service_id
+
+    def restrict(self, keys: frozenset) -> "SharedMarketObjects":
+        """Get a view of the objects with the given ids, sharing built objects."""
+        return SharedMarketObjects(
+            block=self._block,
+            service_id=self._service_id,
+            tables=self._tables,
+            rows={key: self._rows[key] for key in keys if key in self._rows},
+            built=self._built,
+        )
+
+    def __reduce__(self):
+        return _attach_service, (self._block, self._service_id, frozenset(self))
+
+
+@define(kw_only=True)
+class _Attachment:
+    """A shared memory block mapped in this process, with its decoded schema"""
+
+    _memory: shared_memory.SharedMemory = field(alias="memory")
+    _services: Dict[MarketDataServiceId, SharedMarketObjects] = field(alias="services")
+
+    def market_data(self, keys: Optional[frozenset] = None) -> SharedMarketEnvironment:
+        """Get the environment of the block, or of some of its objects."""
+        services = {}
+        for service_id, market_objects in self._services.items():
+            if keys is not None:
+                market_objects = market_objects.restrict(keys)
+                if not market_objects:
+                    continue
+            services[service_id] = MarketDataService(
+                id=service_id, market_data_dict=market_objects
+            )
+        return SharedMarketEnvironment(
+            market_data_services=services, block=self._memory.name, keys=keys
+        )
+
+    def service(self, service_id: MarketDataServiceId, keys: frozenset):
+        return self._services[service_id].restrict(keys)
+
+    def close(self):
+        """Drop the decoded market objects and unmap the block."""
+        self._services = {}
+        _close(self._memory)
+
+    @staticmethod
+    def create(memory: shared_memory.SharedMemory) -> "_Attachment":
+        buffer = memory.buf
+        length = int(np.ndarray((), _HEADER, buffer=buffer)[()])
+        manifest = json.loads(
+            bytes(buffer[_HEADER.itemsize : _HEADER.itemsize + length])
+        )
+        start = _aligned(_HEADER.itemsize + length)
+        layout = manifest["layout"]
+
+        def source(name: str) -> np.ndarray:
+            column = _view(buffer, start, layout[name])
+            column.flags.writeable = False
+            return column
+
+        services = {}
+        for service in manifest["services"]:
+            service_id = MarketDataServiceId[service["id"]]
+            services[service_id] = SharedMarketObjects(
+                block=memory.name,
+                service_id=service_id,
+                tables=[ColumnTable(schema, source) for schema in service["tables"]],
+            )
+        return _Attachment(memory=memory, services=services)
+
+
+def _attached(block: str) -> _Attachment:
+    """Get the attachment of a block, mapping the block on first use."""
+    attachment = _ATTACHED.get(block)
+    if attachment is None:
+        _detach_unlinked()
+        attachment = _Attachment.create(_open(block))
+        _ATTACHED[block] = attachment
+    return attachment
+
+
+def _detach_unlinked():
+    """Close the attachments of the blocks their owner has unlinked."""
+    for block in list(_ATTACHED):
+        try:
+            _open(block).close()
+        except FileNotFoundError:
+            _ATTACHED.pop(block).close()
+
+
+def _open(block: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=block, track=False)
+    # processes started by multiprocessing share the resource tracker of the
+    # owner, which unlinks the block once
+    return shared_memory.SharedMemory(name=block)
+
+
+def _attach(block: str, keys: Optional[frozenset]) -> SharedMarketEnvironment:
+    return _attached(block).market_data(keys)
+
+
+def _attach_service(
+    block: str, service_id: MarketDataServiceId, keys: frozenset
+) -> SharedMarketObjects:
+    return _attached(block).service(service_id, keys)
+
+
+def _unlink(memory: shared_memory.SharedMemory):
+    _ATTACHED.pop(memory.name, None)
+    memory.unlink()
+    _close(memory)
+
+
+def _close(memory: shared_memory.SharedMemory):
+    try:
+        memory.close()
+    except BufferError:
+        # market objects still reference the block, which stays mapped
+        # until they are garbage collected
+        pass
+
+
+def _view(buffer: memoryview, start: int, column: dict) -> np.ndarray:
+    return np.ndarray(
+        tuple(column["shape"]),
+        dtype=np.dtype(column["dtype"]),
+        buffer=buffer,
+        offset=start + column["offset"],
+    )
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
@@ -0,0 +1,76 @@
+"""Market object builders and market data shared by the valuation framework tests."""
+
+import time
+from typing import List
+from attrs import define, field
+from py_volanalytics.market.forward_quotes import (
+    ForwardQuote,
+    ForwardQuotes,
+    ForwardQuotesId,
+)
+from py_volanalytics.types.enums import MarketDataServiceId, MarketObjects
+from py_volanalytics.valuation_framework.generic_market_object_builder import (
+    GenericMarketObjectBuilder,
+)
+from py_volanalytics.valuation_framework.market_data import (
+    MarketDataService,
+    MarketEnvironment,
+)
+
+
+def forward_id(symbol: str) -> ForwardQuotesId:
+    return ForwardQuotesId(friendly_name=MarketObjects.FORWARD_QUOTES, symbol=symbol)
+
+
+def forward(symbol: str, quote: float) -> ForwardQuotes:
+    return ForwardQuotes.create(symbol, [ForwardQuote(quote=quote)])
+
+
+def quote(market_data: MarketEnvironment, symbol: str) -> float:
+    return market_data.get_market_object(forward_id(symbol)).forward_quotes[0].quote
+
+
+def forwards(quotes: dict) -> MarketEnvironment:
+    """A market env of forward quotes, keyed by symbol."""
+    return MarketEnvironment.create(
+        [
+            MarketDataService.create(
+                MarketDataServiceId.FORWARD_QUOTES_SERVICE,
+                [forward(symbol, value) for symbol, value in quotes.items()],
+            )
+        ]
+    )
+
+
+@define(kw_only=True)
+class SumBuilder(GenericMarketObjectBuilder):
+    """Builds the forward ``name``, quoted at one plus the sum of its inputs.
+
+    Every calculation is logged with its start and end, so that tests can check
+    which builders ran and in which order.
+    """
+
+    name: str
+    inputs: List[str] = field(factory=list)
+    delay: float = 0.0
+    calls: List[tuple] = field(factory=list, init=False, eq=False, repr=False)
+
+    def initialize(self):
+        return None
+
+    def get_static_dependencies(self, initialized_state):
+        return None
+
+    def get_market_dependencies(self, initialized_state, reference_data):
+        return [forward_id(symbol) for symbol in self.inputs]
+
+    def get_output_id(self, initialized_state, reference_data):
+        return forward_id(self.name)
+
+    def calculate(self, initialized_state, reference_data, market_data):
+        start = time.perf_counter()
+        self.validate(initialized_state, reference_data, market_data)
+        time.sleep(self.delay)
+        total = sum(quote(market_data, symbol) for symbol in self.inputs)
+        self.calls.append((start, time.perf_counter()))
+        return forward(self.name, 1.0 + total)
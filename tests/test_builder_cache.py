@@ -0,0 +1,100 @@
+from py_volanalytics.types.enums import ExecutorType
+from py_volanalytics.valuation_framework.builder_cache import BuilderResultCache
+from py_volanalytics.valuation_framework.builder_scheduler import BuilderScheduler
+from tests.builders import SumBuilder, forward_id, forwards, quote
+
+
+def calculate(cache, builder, market_data):
+    return cache.calculate(builder, None, None, market_data)
+
+
+def quote_of(forward_quotes) -> float:
+    return forward_quotes.forward_quotes[0].quote
+
+
+def test_hits_and_misses():
+    cache = BuilderResultCache(max_entries=2)
+    builder = SumBuilder(name="A", inputs=["X"])
+    market_data = forwards({"X": 1.0})
+
+    first = calculate(cache, builder, market_data)
+    assert calculate(cache, builder, market_data) is first
+    # an equal builder on equal inputs, built separately, hits too
+    assert (
+        calculate(cache, SumBuilder(name="A", inputs=["X"]), forwards({"X": 1.0}))
+        is first
+    )
+    assert (cache.memory_hits, cache.misses) == (2, 1)
+    assert len(builder.calls) == 1
+
+    # other input content or other parameters miss
+    assert quote_of(calculate(cache, builder, forwards({"X": 2.0}))) == 3.0
+    calculate(cache, SumBuilder(name="A", inputs=["X"], delay=0.001), market_data)
+    assert (cache.memory_hits, cache.misses) == (2, 3)
+
+    # the least recently used result is evicted
+    assert cache.size == 2
+    calculate(cache, builder, market_data)
+    assert cache.misses == 4
+
+
+def test_disk_tier_survives_the_process(tmp_path):
+    builder = SumBuilder(name="A", inputs=["X"])
+    market_data = forwards({"X": 1.0})
+    calculate(BuilderResultCache(cache_dir=str(tmp_path)), builder, market_data)
+
+    cache = BuilderResultCache(cache_dir=str(tmp_path))
+    assert quote_of(calculate(cache, builder, market_data)) == 2.0
+    assert (cache.disk_hits, cache.misses) == (1, 0)
+    assert len(builder.calls) == 1
+
+    cache.clear()
+    assert list(tmp_path.glob("*.pkl")) == []
+
+
+def test_disk_tier_keeps_the_latest_results_within_budget(tmp_path):
+    builder = SumBuilder(name="A", inputs=["X"])
+    calculate(
+        BuilderResultCache(cache_dir=str(tmp_path / "probe")),
+        builder,
+        forwards({"X": 1.0}),
+    )
+    (probe,) = (tmp_path / "probe").glob("*.pkl")
+
+    cache = BuilderResultCache(
+        cache_dir=str(tmp_path / "bounded"), max_disk_bytes=probe.stat().st_size
+    )
+    calculate(cache, builder, forwards({"X": 1.0}))
+    calculate(cache, builder, forwards({"X": 2.0}))
+    (kept,) = (tmp_path / "bounded").glob("*.pkl")
+    assert kept.stem == cache.key(
+        builder, forward_id("A"), [forward_id("X")], forwards({"X": 2.0})
+    )
+
+
+def test_scheduler_skips_builders_with_cached_results():
+    cache = BuilderResultCache()
+    builders = [
+        SumBuilder(name="A", inputs=["X"]),
+        SumBuilder(name="B", inputs=["A", "Y"]),
+    ]
+
+    def run(quotes):
+        return BuilderScheduler(
+            builders=builders, executor_type=ExecutorType.THREAD, result_cache=cache
+        ).run(forwards(quotes))
+
+    run({"X": 1.0, "Y": 2.0})
+    result = run({"X": 1.0, "Y": 2.0})
+    assert quote(result, "B") == 5.0
+    assert [len(builder.calls) for builder in builders] == [1, 1]
+
+    # only B reads Y
+    result = run({"X": 1.0, "Y": 3.0})
+    assert quote(result, "B") == 6.0
+    assert [len(builder.calls) for builder in builders] == [1, 2]
+    assert cache.key(
+        builders[0], forward_id("A"), [forward_id("X")], forwards({"X": 1.0})
+    ) != cache.key(
+        builders[0], forward_id("A"), [forward_id("X")], forwards({"X": 1.5})
+    )
@@ -0,0 +1,78 @@
+import threading
+import time
+import tracemalloc
+import numpy as np
+from py_volanalytics.types.enums import BuilderPhase
+from py_volanalytics.valuation_framework.builder_profiler import BuilderProfiler
+
+MIB = 1024 * 1024
+
+
+def test_records_every_phase():
+    profiler = BuilderProfiler(trace_memory=True)
+    with profiler.measure("builder", BuilderPhase.INITIALIZE):
+        np.ones(MIB // 8)
+    with profiler.measure("builder", BuilderPhase.CALCULATE):
+        pass
+
+    initialize, calculate = profiler.records
+    assert initialize.phase == BuilderPhase.INITIALIZE
+    assert initialize.peak_memory >= MIB
+    assert calculate.peak_memory < MIB
+    assert initialize.wall_time >= 0.0 and initialize.cpu_time >= 0.0
+    assert "builder" in profiler.summary()
+
+
+def test_stops_the_tracing_it_started():
+    profiler = BuilderProfiler(trace_memory=True)
+    with profiler.measure("builder", BuilderPhase.CALCULATE):
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        with profiler.measure("builder", BuilderPhase.CALCULATE):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_concurrent_phases_keep_their_own_peak():
+    profiler = BuilderProfiler(trace_memory=True)
+    released = threading.Event()
+
+    def large():
+        with profiler.measure("large", BuilderPhase.CALCULATE):
+            # the peak is reached, and released, before the small phase starts
+            np.ones(10 * MIB // 8)
+            released.set()
+            time.sleep(0.2)
+
+    def small():
+        released.wait()
+        with profiler.measure("small", BuilderPhase.CALCULATE):
+            np.ones(MIB // 8)
+
+    threads = [threading.Thread(target=large), threading.Thread(target=small)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    peaks = {record.builder: record.peak_memory for record in profiler.records}
+    assert peaks["large"] >= 10 * MIB
+    assert MIB <= peaks["small"] < 2 * MIB
+
+
+def test_fresh_profiler_keeps_the_settings():
+    profiler = BuilderProfiler(trace_memory=True, profile=True, profile_lines=5)
+    with profiler.measure("builder", BuilderPhase.CALCULATE):
+        pass
+
+    fresh = profiler.fresh()
+    assert fresh.records == []
+    with fresh.measure("builder", BuilderPhase.CALCULATE):
+        pass
+    (record,) = fresh.records
+    assert record.peak_memory is not None and record.profile is not None
@@ -0,0 +1,107 @@
+import pytest
+from py_volanalytics.types.enums import ExecutorType
+from py_volanalytics.valuation_framework.builder_scheduler import BuilderScheduler
+from tests.builders import SumBuilder, forward, forward_id, forwards, quote
+
+
+def diamond() -> list:
+    """A -> (B, C) -> D on the quotes X and Y, and E on Y alone."""
+    return [
+        SumBuilder(name="D", inputs=["B", "C"]),
+        SumBuilder(name="B", inputs=["A", "Y"], delay=0.05),
+        SumBuilder(name="C", inputs=["A"], delay=0.05),
+        SumBuilder(name="A", inputs=["X"]),
+        SumBuilder(name="E", inputs=["Y"]),
+    ]
+
+
+@pytest.mark.parametrize("executor_type", list(ExecutorType))
+def test_run_builds_every_output_in_dependency_order(executor_type):
+    builders = diamond()
+    market_data = forwards({"X": 1.0, "Y": 2.0})
+    scheduler = BuilderScheduler(
+        builders=builders, executor_type=executor_type, max_workers=4
+    )
+
+    result = scheduler.run(market_data)
+    assert {s: quote(result, s) for s in "ABCDE"} == {
+        "A": 2.0,
+        "B": 5.0,
+        "C": 3.0,
+        "D": 9.0,
+        "E": 3.0,
+    }
+    assert scheduler.market_data is result
+    assert len(market_data) == 2
+
+
+def test_builders_start_after_their_inputs_are_built():
+    builders = {builder.name: builder for builder in diamond()}
+    BuilderScheduler(
+        builders=list(builders.values()),
+        executor_type=ExecutorType.THREAD,
+        max_workers=4,
+    ).run(forwards({"X": 1.0, "Y": 2.0}))
+
+    ((a_start, a_end),) = builders["A"].calls
+    ((b_start, b_end),) = builders["B"].calls
+    ((c_start, c_end),) = builders["C"].calls
+    ((d_start, _),) = builders["D"].calls
+    assert a_end <= b_start and a_end <= c_start
+    assert max(b_end, c_end) <= d_start
+    # B and C only depend on A, so they run side by side
+    assert b_start < c_end and c_start < b_end
+
+
+def test_invalid_graphs_are_rejected():
+    market_data = forwards({"X": 1.0})
+
+    def run(builders):
+        BuilderScheduler(builders=builders, executor_type=ExecutorType.THREAD).run(
+            market_data
+        )
+
+    with pytest.raises(ValueError, match="cyclic"):
+        run([SumBuilder(name="A", inputs=["B"]), SumBuilder(name="B", inputs=["A"])])
+    with pytest.raises(ValueError, match="more than one"):
+        run([SumBuilder(name="A", inputs=["X"]), SumBuilder(name="A")])
+    with pytest.raises(ValueError, match="not found"):
+        run([SumBuilder(name="A", inputs=["MISSING"])])
+
+
+def test_update_recomputes_only_the_dirty_builders():
+    builders = {builder.name: builder for builder in diamond()}
+    scheduler = BuilderScheduler(
+        builders=list(builders.values()), executor_type=ExecutorType.THREAD
+    )
+    with pytest.raises(ValueError):
+        scheduler.update([forward("X", 10.0)])
+    first = scheduler.run(forwards({"X": 1.0, "Y": 2.0}))
+
+    # Y feeds B and E, and B feeds D
+    assert [list(builders)[index] for index in scheduler.dirty([forward_id("Y")])] == [
+        "D",
+        "B",
+        "E",
+    ]
+    assert scheduler.dirty([forward_id("D")]) == []
+
+    updated = scheduler.update([forward("Y", 12.0)])
+    assert {s: quote(updated, s) for s in "ABCDEY"} == {
+        "A": 2.0,
+        "B": 15.0,
+        "C": 3.0,
+        "D": 19.0,
+        "E": 13.0,
+        "Y": 12.0,
+    }
+    assert {name: len(builder.calls) for name, builder in builders.items()} == {
+        "D": 2,
+        "B": 2,
+        "C": 1,
+        "A": 1,
+        "E": 2,
+    }
+    # the earlier environment is left as it was
+    assert quote(first, "D") == 9.0 and quote(first, "Y") == 2.0
+    assert scheduler.market_data is updated
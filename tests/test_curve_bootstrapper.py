@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from py_volanalytics.market.curve_bootstrapper import CurveBootstrapper, RateInstrument
+from py_volanalytics.math.interpolator import InterpolationType
+from py_volanalytics.types.enums import Currency, RateInstrumentType
+
+DEPOSIT, FRA, SWAP = (
+    RateInstrumentType.DEPOSIT,
+    RateInstrumentType.FRA,
+    RateInstrumentType.SWAP,
+)
+INSTRUMENT_TYPES = [DEPOSIT, DEPOSIT, FRA, FRA, SWAP, SWAP, SWAP]
+START_TIMES = [0.0, 0.0, 0.5, 0.75, 0.0, 0.0, 0.0]
+END_TIMES = [0.25, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0]
+QUOTES = np.array([0.030, 0.031, 0.032, 0.033, 0.034, 0.036, 0.037])
+
+
+def par_rates(curve, bootstrapper) -> np.ndarray:
+    """Reprice the instruments off a bootstrapped curve."""
+    rates = []
+    for instrument in bootstrapper.instruments:
+        times, accruals = instrument.accrual_schedule()
+        annuity = np.sum(accruals * curve.df(0.0, times))
+        float_leg = curve.df(0.0, instrument.start_time) - curve.df(
+            0.0, instrument.end_time
+        )
+        rates.append(float_leg / annuity)
+    return np.array(rates)
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_curve_reprices_the_quotes(interpolation_type):
+    bootstrapper = CurveBootstrapper.create(
+        instrument_types=INSTRUMENT_TYPES,
+        start_times=START_TIMES,
+        end_times=END_TIMES,
+        interpolation_type=interpolation_type,
+    )
+    curve = bootstrapper.build(
+        QUOTES, trade_ccy=Currency.USD, collateral_ccy=Currency.USD
+    )
+
+    assert curve.interpolation_type == interpolation_type
+    assert curve.df(0.0, 0.0) == 1.0
+    assert par_rates(curve, bootstrapper) == pytest.approx(QUOTES, abs=1e-10)
+
+
+def test_build_curves_solves_every_currency():
+    bootstrapper = CurveBootstrapper.create(
+        instrument_types=INSTRUMENT_TYPES, start_times=START_TIMES, end_times=END_TIMES
+    )
+    quotes = {Currency.USD: QUOTES, Currency.EUR: QUOTES - 0.01}
+    curves = bootstrapper.build_curves(quotes)
+
+    for ccy, curve_quotes in quotes.items():
+        assert curves[ccy].get_market_object_id().currency == ccy
+        assert curves[ccy].discount_factors == pytest.approx(
+            bootstrapper.solve(curve_quotes), rel=1e-14
+        )
+
+
+def test_swap_schedule_has_a_short_front_stub():
+    swap = RateInstrument(
+        instrument_type=SWAP, start_time=0.0, end_time=1.75, fixed_frequency=2
+    )
+    times, accruals = swap.accrual_schedule()
+    assert times == pytest.approx([0.25, 0.75, 1.25, 1.75])
+    assert accruals == pytest.approx([0.25, 0.5, 0.5, 0.5])
+
+
+def test_non_convergence_raises():
+    bootstrapper = CurveBootstrapper.create(
+        instrument_types=INSTRUMENT_TYPES, start_times=START_TIMES, end_times=END_TIMES
+    )
+    bootstrapper = CurveBootstrapper(
+        instruments=bootstrapper.instruments, max_iterations=1
+    )
+    with pytest.raises(RuntimeError):
+        bootstrapper.solve(QUOTES)
+
+
+def test_instruments_must_be_sorted():
+    with pytest.raises(ValueError):
+        CurveBootstrapper.create(
+            instrument_types=[DEPOSIT, DEPOSIT],
+            start_times=[0.0, 0.0],
+            end_times=[1.0, 0.5],
+        )
@@ -0,0 +1,44 @@
+import datetime as dt
+import numpy as np
+import pytest
+from py_volanalytics.market.day_count import year_fractions
+from py_volanalytics.types.enums import DayCountConvention
+
+START = np.datetime64("2023-07-15")
+ENDS = np.array(
+    ["2023-07-15", "2024-01-31", "2024-07-15", "2026-02-28"], "datetime64[D]"
+)
+
+
+@pytest.mark.parametrize(
+    "convention, expected",
+    [
+        (DayCountConvention.ACT_365_FIXED, [0.0, 200 / 365, 366 / 365, 959 / 365]),
+        (DayCountConvention.ACT_360, [0.0, 200 / 360, 366 / 360, 959 / 360]),
+        (
+            DayCountConvention.ACT_ACT_ISDA,
+            [
+                0.0,
+                170 / 365 + 30 / 366,
+                170 / 365 + 196 / 366,
+                170 / 365 + 1.0 + 1.0 + 58 / 365,
+            ],
+        ),
+        (DayCountConvention.THIRTY_E_360, [0.0, 195 / 360, 1.0, 943 / 360]),
+    ],
+)
+def test_year_fractions(convention, expected):
+    assert year_fractions(START, ENDS, convention) == pytest.approx(expected)
+
+
+def test_year_fractions_accept_python_dates():
+    ends = [dt.date(2024, 7, 15), dt.date(2023, 1, 15)]
+    assert year_fractions(dt.date(2023, 7, 15), ends) == pytest.approx(
+        [366 / 365, -181 / 365]
+    )
+    # a whole calendar year is one year under Act/Act, leap or not
+    assert year_fractions(
+        np.array(["2023-01-01", "2024-01-01"], "datetime64[D]"),
+        np.array(["2024-01-01", "2025-01-01"], "datetime64[D]"),
+        DayCountConvention.ACT_ACT_ISDA,
+    ) == pytest.approx([1.0, 1.0])
@@ -0,0 +1,234 @@
+import datetime as dt
+import numpy as np
+import pytest
+from py_volanalytics.market.discounting_curve import (
+    DiscountingCurve,
+    DiscountingCurveId,
+)
+from py_volanalytics.math.interpolator import InterpolationType
+from py_volanalytics.types.enums import Currency, DayCountConvention, MarketObjects
+
+
+@pytest.fixture
+def curve() -> DiscountingCurve:
+    return DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+
+
+def test_cache_hits_and_misses(curve):
+    cache = curve.enable_cache(max_size=2)
+    expected = curve.interpolator(2.0) / curve.interpolator(1.0)
+
+    assert curve.df(1.0, 2.0) == expected
+    assert curve.df(1.0, 2.0) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # the least recently used entry is evicted
+    curve.df(0.0, 3.0)
+    curve.df(0.0, 4.0)
+    assert cache.size == 2
+    curve.df(1.0, 2.0)
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_cache_resolution_shares_entries(curve):
+    cache = curve.enable_cache(resolution=1.0 / 365)
+    curve.df(0.0, 1.0)
+    curve.df(0.0, 1.0 + 1e-6)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_setattr_invalidates_the_cache(curve):
+    cache = curve.enable_cache()
+    before = curve.df(0.0, 10.0)
+
+    curve._discount_factors = curve.discount_factors * 0.5
+    assert cache.size == 0
+    assert curve.df(0.0, 10.0) == pytest.approx(before)
+    assert cache.misses == 2
+
+    curve._discount_factors = curve.discount_factors**2
+    assert curve.df(0.0, 10.0) == pytest.approx(before**2)
+
+
+def test_curve_data_is_read_only(curve):
+    cache = curve.enable_cache()
+    before = curve.df(0.0, 3.0)
+
+    with pytest.raises(ValueError):
+        curve.discount_factors[3] = 0.5
+    with pytest.raises(ValueError):
+        curve.times[3] = 2.5
+    assert curve.df(0.0, 3.0) == before and cache.hits == 1
+
+
+def test_curve_copies_writeable_inputs():
+    times = np.array([0.0, 1.0, 2.0])
+    discount_factors = np.array([1.0, 0.95, 0.9])
+    curve = DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+    curve._times, curve._discount_factors = times, discount_factors
+
+    discount_factors[1] = 0.5
+    assert curve.df(0.0, 1.0) == pytest.approx(0.95)
+
+
+def test_weights_are_cached_until_the_curve_changes(curve):
+    T = np.array([0.5, 2.5, 7.0])
+    weights = curve.weights(T)
+    assert curve.weights(T.copy()) is weights
+    assert weights(curve.discount_factors) == pytest.approx(curve.df(0.0, T))
+
+    curve._discount_factors = curve.discount_factors * 0.5
+    assert curve.weights(T) is not weights
+
+
+def test_with_discount_factors_keeps_the_settings():
+    dates = np.array(["2026-01-02", "2027-01-04", "2028-01-03"], dtype="datetime64[D]")
+    curve = DiscountingCurve(
+        id=DiscountingCurveId(
+            friendly_name=MarketObjects.DISCOUNTING_CURVE, currency=Currency.EUR
+        ),
+        times=dates,
+        discount_factors=np.array([1.0, 0.97, 0.94]),
+        day_count=DayCountConvention.ACT_360,
+    )
+    shifted = curve.with_discount_factors(np.array([1.0, 0.96, 0.92]))
+
+    assert shifted.get_market_object_id() == curve.get_market_object_id()
+    assert shifted.times is curve.times
+    assert (shifted.dates == curve.dates).all()
+    assert shifted.df(0.0, curve.times[1]) == pytest.approx(0.96)
+
+    other = DiscountingCurveId(
+        friendly_name=MarketObjects.DISCOUNTING_CURVE, currency=Currency.GBP
+    )
+    assert (
+        curve.with_discount_factors(
+            curve.discount_factors, curve_id=other
+        ).get_market_object_id()
+        == other
+    )
+    with pytest.raises(ValueError):
+        curve.with_discount_factors(np.array([1.0, 0.9]))
+
+
+def test_vectorized_df_broadcasts_like_scalar_calls(curve):
+    t = np.array([0.0, 0.5, 1.0])[:, np.newaxis]
+    T = np.array([1.0, 2.5, 7.25, 60.0])
+
+    dfs = curve.df(t, T)
+    assert dfs.shape == (3, 4)
+    assert dfs == pytest.approx(
+        np.array([[curve.df(float(s), float(u)) for u in T] for s in t[:, 0]]),
+        rel=1e-14,
+    )
+    assert isinstance(curve.df(0.0, 2.0), float)
+
+
+def test_zero_and_forward_rates_of_a_flat_curve(curve):
+    T = np.array([0.0, 0.25, 1.0, 7.5, 30.0])
+
+    assert curve.zero_rate(T) == pytest.approx(np.full(5, 0.05), rel=1e-9)
+    assert curve.forward_rate(T, T + 1.0) == pytest.approx(np.full(5, 0.05), rel=1e-9)
+    # T = t gives the instantaneous forward rate
+    assert curve.forward_rate(T, T) == pytest.approx(np.full(5, 0.05), rel=1e-9)
+    assert curve.forward_rate(2.0, np.array([[3.0], [4.0]])).shape == (2, 1)
+    assert isinstance(curve.zero_rate(3.0), float)
+
+
+def test_forward_rates_compound_to_the_zero_rates():
+    curve = DiscountingCurve.rate_curve(
+        Currency.USD,
+        Currency.USD,
+        times=np.array([1.0, 2.0, 5.0, 10.0]),
+        rates=np.array([0.02, 0.025, 0.03, 0.035]),
+    )
+    t, T = np.array([1.0, 2.0, 4.0]), np.array([2.0, 5.0, 9.0])
+    growth = (1.0 + curve.zero_rate(T)) ** T / (1.0 + curve.zero_rate(t)) ** t
+    assert (1.0 + curve.forward_rate(t, T)) ** (T - t) == pytest.approx(growth)
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_node_sensitivities_match_bump_and_revalue(interpolation_type):
+    times = np.array([0.0, 0.5, 1.0, 2.0, 5.0, 10.0])
+    curve = DiscountingCurve(
+        id=DiscountingCurveId(
+            friendly_name=MarketObjects.DISCOUNTING_CURVE, currency=Currency.USD
+        ),
+        times=times,
+        discount_factors=np.exp(-0.03 * times - 0.002 * times**2),
+        interapolation_type=interpolation_type,
+    )
+    cash_flow_times = np.array([0.25, 0.75, 1.5, 3.0, 4.0, 7.0, 12.0])
+    cash_flows = np.array([[1.0, 2.0, -1.0, 3.0, 1.0, 5.0, 100.0], np.ones(7)])
+
+    # dP(0,T_i)/dP(0,t_k) of the interpolated discount factors, by central
+    # differences one node at a time
+    h = 1e-7
+    bumped_dfs = [
+        curve.with_discount_factors(curve.discount_factors + h * e).interpolator(
+            cash_flow_times
+        )
+        - curve.with_discount_factors(curve.discount_factors - h * e).interpolator(
+            cash_flow_times
+        )
+        for e in np.eye(len(times))
+    ]
+    jacobian = np.array(bumped_dfs).T / (2 * h)
+
+    assert curve.df_jacobian(cash_flow_times).to_dense() == pytest.approx(
+        jacobian, rel=1e-6, abs=1e-9
+    )
+    assert curve.node_sensitivities(cash_flow_times, cash_flows) == pytest.approx(
+        cash_flows @ jacobian, rel=1e-6, abs=1e-8
+    )
+
+
+def test_rate_curve_from_dates():
+    anchor = dt.date(2025, 3, 20)
+    dates = [dt.date(2026, 3, 20), dt.date(2028, 3, 20), dt.date(2035, 3, 20)]
+    rates = np.array([0.03, 0.032, 0.035])
+
+    curve = DiscountingCurve.rate_curve(
+        Currency.EUR,
+        Currency.EUR,
+        np.array(dates, dtype="datetime64[D]"),
+        rates,
+        anchor_date=anchor,
+        day_count=DayCountConvention.ACT_360,
+    )
+    times = np.array([(date - anchor).days / 360 for date in dates])
+    assert curve.times == pytest.approx(np.concatenate([[0.0], times]))
+    assert curve.zero_rate(times) == pytest.approx(rates)
+
+    same = DiscountingCurve.rate_curve(
+        Currency.EUR,
+        Currency.EUR,
+        np.array(dates, dtype=object),
+        rates,
+        anchor_date=anchor,
+        day_count=DayCountConvention.ACT_360,
+    )
+    assert same.times == pytest.approx(curve.times)
+    with pytest.raises(ValueError):
+        DiscountingCurve.rate_curve(Currency.EUR, Currency.EUR, np.array(dates), rates)
+
+
+def test_curve_on_dates_uses_the_anchor_and_day_count():
+    dates = np.array(["2025-01-02", "2025-07-02", "2026-01-02"], dtype="datetime64[D]")
+    curve = DiscountingCurve(
+        id=DiscountingCurveId(
+            friendly_name=MarketObjects.DISCOUNTING_CURVE, currency=Currency.USD
+        ),
+        times=dates,
+        discount_factors=np.array([1.0, 0.98, 0.96]),
+        anchor_date=dt.date(2024, 12, 31),
+        day_count=DayCountConvention.ACT_360,
+    )
+    assert curve.times == pytest.approx(np.array([2, 183, 367]) / 360)
+    assert (curve.dates == dates).all()
+    with pytest.raises(ValueError):
+        DiscountingCurve(
+            id=curve.get_market_object_id(),
+            times=dates[::-1],
+            discount_factors=np.ones(3),
+        )
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from py_volanalytics.market.discounting_curve import DiscountingCurve
+from py_volanalytics.market.discounting_curve_scenarios import (
+    DiscountingCurveScenarios,
+    bucket_shifts,
+    parallel_shifts,
+    twist_shifts,
+)
+from py_volanalytics.types.enums import Currency
+
+T = np.array([0.5, 1.0, 2.5, 7.0, 30.0])
+
+
+@pytest.fixture
+def curve() -> DiscountingCurve:
+    return DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+
+
+def test_scenarios_match_the_shocked_curves(curve):
+    shifts = parallel_shifts(curve.times, np.array([-0.01, 0.0, 0.02]))
+    scenarios = DiscountingCurveScenarios.from_curve(curve, shifts)
+
+    df = scenarios.df(1.0, T)
+    assert df.shape == (3, len(T))
+    for index in range(scenarios.num_scenarios):
+        shocked = scenarios.scenario(index)
+        assert df[index] == pytest.approx(shocked.df(1.0, T), rel=1e-12)
+    assert df[1] == pytest.approx(curve.df(1.0, T), rel=1e-12)
+
+
+def test_shift_shapes(curve):
+    assert twist_shifts(curve.times, [0.01], [-0.01])[0, [0, -1]] == pytest.approx(
+        [0.01, -0.01]
+    )
+    assert bucket_shifts(curve.times).shape == (len(curve.times),) * 2
+
+
+def test_weights_are_cached_per_query_grid(curve):
+    scenarios = DiscountingCurveScenarios.from_curve(
+        curve, parallel_shifts(curve.times, np.zeros(2))
+    )
+    assert scenarios.weights(T) is scenarios.weights(T.copy())
+    assert scenarios.weights(T) is not scenarios.weights(T[:-1])
+
+
+def test_parallel_shifted_curve(curve):
+    scenarios = DiscountingCurveScenarios.from_curve(
+        curve, parallel_shifts(curve.times, np.array([0.01]))
+    )
+    shocked = scenarios.scenario(0)
+
+    assert shocked.get_market_object_id() == curve.get_market_object_id()
+    assert shocked.interpolation_type == curve.interpolation_type
+    # log-linear interpolation keeps a parallel zero rate shift between nodes
+    assert shocked.df(0.0, T) == pytest.approx(curve.df(0.0, T) * np.exp(-0.01 * T))
+
+
+def test_twist_shifted_curve(curve):
+    shifts = twist_shifts(curve.times, [0.01], [-0.01])
+    shocked = DiscountingCurveScenarios.from_curve(curve, shifts).scenario(0)
+
+    assert shocked.discount_factors == pytest.approx(
+        curve.discount_factors * np.exp(-shifts[0] * curve.times)
+    )
+    assert shocked.df(0.0, 25.0) == pytest.approx(curve.df(0.0, 25.0) * np.exp(0.0))
+
+
+def test_bucket_shifted_curves(curve):
+    scenarios = DiscountingCurveScenarios.from_curve(
+        curve, bucket_shifts(curve.times, size=1e-4)
+    )
+    shocked = scenarios.scenario(10)
+
+    changed = np.flatnonzero(shocked.discount_factors != curve.discount_factors)
+    assert changed.tolist() == [10]
+    # only the intervals next to the bumped node move
+    assert shocked.df(0.0, 5.5) == curve.df(0.0, 5.5)
+    assert shocked.df(0.0, 9.5) < curve.df(0.0, 9.5)
+
+
+def test_scenario_curves_need_the_shocked_curve(curve):
+    scenarios = DiscountingCurveScenarios(
+        times=curve.times, discount_factors=curve.discount_factors[np.newaxis]
+    )
+    with pytest.raises(ValueError):
+        scenarios.scenario(0)
@@ -0,0 +1,13 @@
+import pytest
+from benchmarks.core import CORE_MODULES, benchmark_import
+
+
+@pytest.mark.parametrize("module", CORE_MODULES)
+def test_core_imports_do_not_pull_in_plotting(module):
+    # raises if the module imports matplotlib or scienceplots
+    assert benchmark_import(module) > 0.0
+
+
+def test_benchmark_import_detects_heavy_modules():
+    with pytest.raises(RuntimeError, match="json"):
+        benchmark_import("json", heavy_modules=("json",))
@@ -0,0 +1,292 @@
+from collections import OrderedDict
+import datetime as dt
+import numpy as np
+import pytest
+from py_volanalytics.math.interpolator import (
+    ExtrapolateIndex,
+    InterpolationType,
+    InterpolationWeights,
+    interpolator_map,
+)
+
+X_VALUES = [1.0, 2.0, 4.0, 7.0]
+Y_VALUES = [1.0, 3.0, 2.0, 5.0]
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_end_knots_non_extrapolator(interpolation_type):
+    interpolator = interpolator_map[interpolation_type](
+        x_values=X_VALUES, y_values=Y_VALUES
+    )
+
+    # the first knot is inside the interpolated range for every path
+    assert interpolator(X_VALUES[0]) == pytest.approx(Y_VALUES[0])
+    assert interpolator.evaluate([X_VALUES[0]])[0] == pytest.approx(Y_VALUES[0])
+    assert np.isfinite(interpolator.derivative(X_VALUES[0]))
+
+    # the last knot is outside for every path
+    with pytest.raises(ValueError):
+        interpolator(X_VALUES[-1])
+    with pytest.raises(ValueError):
+        interpolator.evaluate([X_VALUES[-1]])
+    with pytest.raises(ValueError):
+        interpolator.derivative(X_VALUES[-1])
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_end_knots_extrapolator(interpolation_type):
+    interpolator = interpolator_map[interpolation_type](
+        x_values=X_VALUES, y_values=Y_VALUES, extrapolate=True
+    )
+
+    assert interpolator(X_VALUES[-1]) == pytest.approx(Y_VALUES[-1])
+    assert interpolator.evaluate([X_VALUES[-1]])[0] == pytest.approx(Y_VALUES[-1])
+    # constant extrapolation from the last knot on
+    assert interpolator.derivative(X_VALUES[-1]) == 0.0
+    assert interpolator.derivative(X_VALUES[0]) == pytest.approx(
+        interpolator.derivative(X_VALUES[0] + 1e-9), rel=1e-6
+    )
+
+
+def test_cached_weights_are_reused_per_query_grid():
+    cache = OrderedDict()
+
+    def cached(query_points):
+        return InterpolationWeights.cached(
+            cache,
+            interpolation_type=InterpolationType.LOG_LINEAR_INTERPOLATION,
+            x_values=X_VALUES,
+            query_points=query_points,
+            extrapolate=True,
+            max_size=2,
+        )
+
+    weights = cached(np.array([1.5, 3.0]))
+    assert cached(np.array([1.5, 3.0])) is weights
+    assert weights(Y_VALUES) == pytest.approx(
+        interpolator_map[InterpolationType.LOG_LINEAR_INTERPOLATION](
+            x_values=X_VALUES, y_values=Y_VALUES
+        ).evaluate([1.5, 3.0])
+    )
+
+    # the least recently used grid is evicted
+    cached(np.array([2.5]))
+    cached(np.array([5.0]))
+    assert len(cache) == 2
+    assert cached(np.array([1.5, 3.0])) is not weights
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_vectorized_evaluation_matches_scalar_calls(interpolation_type):
+    interpolator = interpolator_map[interpolation_type](
+        x_values=X_VALUES, y_values=Y_VALUES, extrapolate=True
+    )
+    queries = np.linspace(0.0, 8.0, 33).reshape(3, 11)
+
+    values = interpolator(queries)
+    assert values.shape == queries.shape
+    assert values == pytest.approx(
+        np.array([[interpolator(float(q)) for q in row] for row in queries]),
+        rel=1e-14,
+    )
+    # constant extrapolation on both sides
+    assert interpolator.evaluate([0.0, 8.0]) == pytest.approx(
+        [Y_VALUES[0], Y_VALUES[-1]]
+    )
+    assert interpolator.evaluate(X_VALUES[:-1]) == pytest.approx(Y_VALUES[:-1])
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_vectorized_evaluation_rejects_points_outside_non_extrapolator(
+    interpolation_type,
+):
+    interpolator = interpolator_map[interpolation_type](
+        x_values=X_VALUES, y_values=Y_VALUES
+    )
+    assert interpolator.evaluate([1.5, 6.0]).shape == (2,)
+    with pytest.raises(ValueError):
+        interpolator.evaluate([1.5, 0.5])
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_cursor_matches_calls_in_any_order(interpolation_type):
+    interpolator = interpolator_map[interpolation_type](
+        x_values=np.linspace(0.0, 10.0, 101), y_values=np.linspace(1.0, 2.0, 101) ** 2
+    )
+    cursor = interpolator.cursor()
+
+    sweep = np.linspace(0.0, 9.99, 500).tolist()
+    assert [cursor(x) for x in sweep] == [interpolator(x) for x in sweep]
+    assert cursor.index == 99
+
+    # jumping back still finds the right interval, and so does a reset
+    assert cursor(0.55) == interpolator(0.55)
+    assert cursor.index == 5
+    cursor.reset()
+    assert cursor.index == 0
+    assert cursor(7.25) == interpolator(7.25)
+    assert cursor.index == 72
+
+
+def test_find_index_ignores_a_wrong_hint():
+    interpolator = interpolator_map[InterpolationType.LINEAR_INTERPOLATION](
+        x_values=X_VALUES, y_values=Y_VALUES, extrapolate=True
+    )
+    for hint in (None, 0, 1, 2, 5, -1):
+        assert interpolator._find_index(1.0, hint) == 0
+        assert interpolator._find_index(2.0, hint) == 1
+        assert interpolator._find_index(6.9, hint) == 2
+        assert interpolator._find_index(0.5, hint) == ExtrapolateIndex.FRONT
+        assert interpolator._find_index(7.0, hint) == ExtrapolateIndex.BACK
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+@pytest.mark.parametrize("order", [1, 2])
+def test_derivatives_match_finite_differences(interpolation_type, order):
+    interpolator = interpolator_map[interpolation_type](
+        x_values=X_VALUES, y_values=Y_VALUES
+    )
+    # interior points away from the knots, where the interpolant is smooth
+    queries = np.array([1.3, 2.7, 3.5, 5.2, 6.6])
+    h = 1e-4
+    if order == 1:
+        expected = (interpolator(queries + h) - interpolator(queries - h)) / (2 * h)
+    else:
+        expected = (
+            interpolator(queries + h)
+            - 2 * interpolator(queries)
+            + interpolator(queries - h)
+        ) / h**2
+
+    derivative = interpolator.derivative(queries, order=order)
+    assert derivative == pytest.approx(expected, rel=1e-5, abs=1e-6)
+    assert interpolator.derivative(2.7, order=order) == derivative[1]
+
+
+def test_natural_spline_has_no_curvature_at_the_ends():
+    interpolator = interpolator_map[InterpolationType.CUBIC_SPLINE_INTERPOLATION](
+        x_values=X_VALUES, y_values=Y_VALUES, extrapolate=True
+    )
+    assert interpolator.derivative(X_VALUES[0], order=2) == pytest.approx(0.0)
+    assert interpolator.derivative(X_VALUES[-1] - 1e-12, order=2) == pytest.approx(
+        0.0, abs=1e-9
+    )
+    with pytest.raises(ValueError):
+        interpolator.derivative(2.0, order=3)
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_weights_interpolate_many_curves_on_a_shared_grid(interpolation_type):
+    x_values = np.linspace(0.0, 10.0, 21)
+    queries = np.linspace(-1.0, 11.0, 50)
+    curves = np.exp(np.random.default_rng(0).normal(0.0, 0.2, (5, len(x_values))))
+    weights = InterpolationWeights.create(
+        interpolation_type=interpolation_type,
+        x_values=x_values,
+        query_points=queries,
+        extrapolate=True,
+    )
+
+    expected = np.array(
+        [
+            interpolator_map[interpolation_type](
+                x_values=x_values, y_values=curve, extrapolate=True
+            ).evaluate(queries)
+            for curve in curves
+        ]
+    )
+    assert weights.shape == (len(queries), len(x_values))
+    assert weights(curves) == pytest.approx(expected, rel=1e-12)
+    assert weights(curves[2]) == pytest.approx(expected[2], rel=1e-12)
+
+    # the transpose pulls query values back onto the knots
+    values = np.arange(len(queries), dtype=np.float64)
+    assert weights.apply_transpose(values) == pytest.approx(
+        values @ weights.to_dense(), rel=1e-12
+    )
+    with pytest.raises(ValueError):
+        weights(curves[:, :-1])
+
+
+def test_local_weights_are_stored_sparse():
+    x_values = np.linspace(0.0, 10.0, 21)
+    weights = InterpolationWeights.create(
+        interpolation_type=InterpolationType.HERMITE_CUBIC_SPLINE_INTERPOLATION,
+        x_values=x_values,
+        query_points=np.linspace(0.0, 9.9, 100),
+    )
+    assert weights.nnz <= 4 * 100
+    with pytest.raises(ValueError):
+        InterpolationWeights.create(
+            interpolation_type=InterpolationType.LINEAR_INTERPOLATION,
+            x_values=x_values,
+            query_points=[11.0],
+        )
+
+
+@pytest.mark.parametrize(
+    "interpolation_type",
+    [
+        InterpolationType.CUBIC_SPLINE_INTERPOLATION,
+        InterpolationType.HERMITE_CUBIC_SPLINE_INTERPOLATION,
+    ],
+)
+def test_bump_matches_a_refit(interpolation_type):
+    interpolator_class = interpolator_map[interpolation_type]
+    interpolator = interpolator_class(
+        x_values=X_VALUES, y_values=Y_VALUES, extrapolate=True
+    )
+    bumped = interpolator.bump({1: 0.01, 3: -0.5})
+
+    bumped_ys = np.array(Y_VALUES) + [0.0, 0.01, 0.0, -0.5]
+    refit = interpolator_class(x_values=X_VALUES, y_values=bumped_ys, extrapolate=True)
+    queries = np.linspace(0.0, 8.0, 41)
+    assert bumped.y_values == pytest.approx(bumped_ys)
+    assert bumped.evaluate(queries) == pytest.approx(refit.evaluate(queries), rel=1e-12)
+    assert bumped(7.5) == pytest.approx(Y_VALUES[-1] - 0.5)
+
+    # the original is left untouched
+    assert interpolator.y_values == Y_VALUES
+    assert interpolator.evaluate(queries) == pytest.approx(
+        interpolator_class(
+            x_values=X_VALUES, y_values=Y_VALUES, extrapolate=True
+        ).evaluate(queries)
+    )
+
+
+@pytest.mark.parametrize("interpolation_type", list(InterpolationType))
+def test_date_knots_interpolate_on_year_fractions(interpolation_type):
+    start = dt.date(2024, 1, 15)
+    dates = [start + dt.timedelta(days=round(365 * x)) for x in X_VALUES]
+    by_date = interpolator_map[interpolation_type](
+        x_values=dates, y_values=Y_VALUES, extrapolate=True, anchor=start
+    )
+    by_time = interpolator_map[interpolation_type](
+        x_values=[(d - start).days / 365.0 for d in dates],
+        y_values=Y_VALUES,
+        extrapolate=True,
+    )
+    query_dates = [start + dt.timedelta(days=days) for days in range(0, 2900, 97)]
+    query_times = np.array([(d - start).days / 365.0 for d in query_dates])
+
+    expected = by_time.evaluate(query_times)
+    assert by_date.evaluate(query_dates) == pytest.approx(expected, rel=1e-12)
+    assert by_date.evaluate(
+        np.array(query_dates, dtype="datetime64[D]")
+    ) == pytest.approx(expected, rel=1e-12)
+    assert [by_date(d) for d in query_dates] == pytest.approx(expected, rel=1e-12)
+    assert by_date.derivative(query_dates[3]) == pytest.approx(
+        by_time.derivative(query_times[3]), rel=1e-12
+    )
+
+
+def test_date_knots_anchor_on_the_first_date_by_default():
+    dates = [dt.date(2024, 3, 1), dt.date(2025, 3, 1), dt.date(2026, 3, 1)]
+    interpolator = interpolator_map[InterpolationType.LINEAR_INTERPOLATION](
+        x_values=dates, y_values=[1.0, 2.0, 4.0]
+    )
+    assert interpolator.anchor == dates[0]
+    assert interpolator(dt.date(2024, 8, 31)) == pytest.approx(1.0 + 183 / 365)
+    assert interpolator(np.datetime64("2025-03-01")) == 2.0
+    with pytest.raises(ValueError):
+        interpolator(dt.date(2024, 2, 1))
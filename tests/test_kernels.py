@@ -0,0 +1,52 @@
+import pytest
+from py_volanalytics.math import kernels
+from py_volanalytics.math.interpolator import LinearInterpolator
+
+
+@pytest.fixture
+def numba_backend():
+    if not kernels.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+    backend = kernels.get_backend()
+    kernels.set_backend(kernels.KernelBackend.NUMBA)
+    yield
+    kernels.set_backend(backend)
+
+
+def test_check_parity():
+    differences = kernels.check_parity(num_points=2_000)
+    assert all(difference <= 1e-12 for difference in differences.values())
+
+
+def test_check_parity_raises_above_tolerance():
+    with pytest.raises(AssertionError):
+        kernels.check_parity(num_points=2_000, tolerance=-1.0)
+
+
+def test_numpy_is_the_default_backend():
+    assert kernels.get_backend() == kernels.KernelBackend.NUMPY
+
+
+def test_numba_scalar_calls_reach_the_compiled_kernel(numba_backend, monkeypatch):
+    calls = []
+    evaluate_linear_scalar = kernels.evaluate_linear_scalar
+
+    def spy(*args):
+        calls.append(args[-2:])
+        return evaluate_linear_scalar(*args)
+
+    monkeypatch.setattr(kernels, "evaluate_linear_scalar", spy)
+    interpolator = LinearInterpolator(
+        x_values=[0.0, 1.0, 2.0], y_values=[1.0, 3.0, 2.0]
+    )
+
+    assert interpolator(0.5) == 2.0
+    cursor = interpolator.cursor()
+    assert [cursor(0.5), cursor(1.5)] == [2.0, 2.5]
+    assert cursor.index == 1
+    with pytest.raises(ValueError):
+        interpolator(2.0)
+
+    # the cursor passes the interval it visited last as the hint
+    assert calls == [(0.5, 0), (0.5, 0), (1.5, 0), (2.0, 0)]
+    assert kernels._evaluate_linear_scalar_loop in kernels._compiled_kernels
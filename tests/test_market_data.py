@@ -0,0 +1,100 @@
+import pytest
+from py_volanalytics.market.forward_quotes import (
+    ForwardQuote,
+    ForwardQuotes,
+    ForwardQuotesId,
+)
+from py_volanalytics.types.enums import MarketDataServiceId, MarketObjects
+from py_volanalytics.valuation_framework.market_data import (
+    MarketDataService,
+    MarketEnvironment,
+)
+
+
+def forward_id(symbol: str) -> ForwardQuotesId:
+    return ForwardQuotesId(friendly_name=MarketObjects.FORWARD_QUOTES, symbol=symbol)
+
+
+def forward(symbol: str, quote: float) -> ForwardQuotes:
+    return ForwardQuotes.create(symbol, [ForwardQuote(quote=quote)])
+
+
+def quote(market_data: MarketEnvironment, symbol: str) -> float:
+    return market_data.get_market_object(forward_id(symbol)).forward_quotes[0].quote
+
+
+@pytest.fixture
+def market_data() -> MarketEnvironment:
+    return MarketEnvironment.create(
+        [
+            MarketDataService.create(
+                MarketDataServiceId.FORWARD_QUOTES_SERVICE,
+                [forward(f"BASE{i}", float(i)) for i in range(10)],
+            )
+        ]
+    )
+
+
+def test_overlay_overrides_and_adds(market_data):
+    overlay = market_data.derive([forward("BASE3", 30.0)]).extend([forward("NEW", 1.0)])
+
+    assert quote(overlay, "BASE3") == 30.0
+    assert quote(overlay, "NEW") == 1.0
+    assert quote(market_data, "BASE3") == 3.0
+    assert forward_id("NEW") not in market_data
+    assert len(overlay) == 11 and len(market_data) == 10
+
+    service = overlay.get_value(MarketDataServiceId.FORWARD_QUOTES_SERVICE)
+    assert len(service.market_data_dict) == 11
+
+
+def test_derive_requires_a_service_for_new_objects(market_data):
+    with pytest.raises(ValueError):
+        market_data.derive([forward("NEW", 1.0)])
+
+
+def test_stacked_derives(market_data):
+    overlay = market_data
+    for i in range(500):
+        overlay = overlay.extend([forward(f"NEW{i}", float(i))])
+        overlay = overlay.derive([forward(f"BASE{i % 10}", 100.0 + i)])
+
+    assert len(overlay) == 510
+    assert all(quote(overlay, f"NEW{i}") == float(i) for i in range(500))
+    # the latest override of every base object wins
+    assert [quote(overlay, f"BASE{i}") for i in range(10)] == [
+        590.0 + i for i in range(10)
+    ]
+    # the overrides chain stays shallow
+    assert len(getattr(overlay.overrides, "maps", [overlay.overrides])) <= 10
+    assert len(getattr(overlay.added, "maps", [overlay.added])) <= 10
+
+    subset = overlay.subset([forward_id("BASE0"), forward_id("NEW7")])
+    assert len(subset) == 2
+    assert quote(subset, "BASE0") == 590.0 and quote(subset, "NEW7") == 7.0
+
+
+def test_service_lookups_by_id(market_data):
+    service = market_data.get_value(MarketDataServiceId.FORWARD_QUOTES_SERVICE)
+    key = forward_id("BASE2")
+
+    assert service.get_value(key).forward_quotes[0].quote == 2.0
+    assert service.try_find_key(forward_id("MISSING")) is None
+    with pytest.raises(KeyError):
+        service.get_value(forward_id("MISSING"))
+
+    # equal ids built separately hash alike
+    assert market_data.get_market_object(key) is service.get_value(key)
+    assert {key: 1}[forward_id("BASE2")] == 1
+
+
+def test_service_lookups_by_dict_id_are_deprecated(market_data):
+    service = market_data.get_value(MarketDataServiceId.FORWARD_QUOTES_SERVICE)
+    key = forward_id("BASE2")
+
+    with pytest.deprecated_call():
+        assert service.try_find_key(key.get_id()) is service.get_value(key)
+    with pytest.deprecated_call():
+        assert service.get_value(key.get_id()) is service.get_value(key)
+    with pytest.deprecated_call():
+        assert service.try_find_key(forward_id("MISSING").get_id()) is None
@@ -0,0 +1,85 @@
+import asyncio
+import time
+import pytest
+from attrs import define, field
+from py_volanalytics.types.enums import ExecutorType
+from py_volanalytics.valuation_framework.builder_scheduler import BuilderScheduler
+from py_volanalytics.valuation_framework.market_data_provider import (
+    FileMarketDataProvider,
+    MarketDataProvider,
+)
+from tests.builders import SumBuilder, forward, forward_id, forwards, quote
+
+
+@define(kw_only=True)
+class SlowProvider(MarketDataProvider):
+    """Serves forward quotes after a delay, tracking the fetches in flight."""
+
+    quotes: dict
+    delay: float = 0.05
+    fetched: list = field(factory=list, init=False)
+    in_flight: int = field(default=0, init=False)
+    max_in_flight: int = field(default=0, init=False)
+
+    async def fetch(self, key):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            self.fetched.append((key.symbol, time.perf_counter()))
+            return forward(key.symbol, self.quotes[key.symbol])
+        finally:
+            self.in_flight -= 1
+
+
+def test_file_provider_loads_only_the_missing_objects(tmp_path):
+    provider = FileMarketDataProvider(directory=str(tmp_path))
+    provider.save([forward("X", 1.0), forward("Y", 2.0)])
+    market_data = forwards({"X": 10.0})
+
+    loaded = asyncio.run(
+        provider.load([forward_id("X"), forward_id("Y"), forward_id("Y")], market_data)
+    )
+    assert quote(loaded, "X") == 10.0 and quote(loaded, "Y") == 2.0
+    assert forward_id("Y") not in market_data
+
+    with pytest.raises(ValueError):
+        asyncio.run(provider.load([forward_id("MISSING")]))
+
+
+def test_fetches_are_concurrent_and_bounded():
+    symbols = [f"S{i}" for i in range(12)]
+    provider = SlowProvider(quotes=dict.fromkeys(symbols, 1.0), max_concurrency=4)
+
+    fetched = asyncio.run(provider.fetch_many(map(forward_id, symbols)))
+    assert list(fetched) == list(map(forward_id, symbols))
+    assert provider.max_in_flight == 4
+
+    # the provider can be used again from another event loop
+    asyncio.run(provider.fetch_many([forward_id("S0")]))
+
+
+def test_run_async_fetches_the_inputs_and_builds():
+    builders = [
+        SumBuilder(name="A", inputs=["X"]),
+        SumBuilder(name="B", inputs=["A", "Y"]),
+        SumBuilder(name="C", inputs=["Z"]),
+    ]
+    provider = SlowProvider(quotes={"X": 1.0, "Y": 2.0, "Z": 5.0})
+    scheduler = BuilderScheduler(builders=builders, executor_type=ExecutorType.THREAD)
+
+    result = asyncio.run(scheduler.run_async(forwards({"Z": 3.0}), provider))
+    assert {s: quote(result, s) for s in "ABCXYZ"} == {
+        "A": 2.0,
+        "B": 5.0,
+        "C": 4.0,
+        "X": 1.0,
+        "Y": 2.0,
+        "Z": 3.0,
+    }
+    # Z is already in the market env, X and Y are fetched once each
+    assert sorted(symbol for symbol, _ in provider.fetched) == ["X", "Y"]
+    # C has all its inputs at hand and does not wait for the fetches
+    assert builders[2].calls[0][0] < min(end for _, end in provider.fetched)
+    assert provider.max_in_flight == 2
+    assert scheduler.market_data is result
@@ -0,0 +1,122 @@
+import json
+import numpy as np
+import pytest
+from py_volanalytics.market.discounting_curve import DiscountingCurve
+from py_volanalytics.market.option_quotes import OptionQuote, OptionQuotes
+from py_volanalytics.types.enums import (
+    Currency,
+    MarketDataServiceId,
+    OptionQuoteConvention,
+    OptionType,
+)
+from py_volanalytics.valuation_framework.market_data import (
+    MarketDataService,
+    MarketEnvironment,
+)
+from py_volanalytics.valuation_framework.market_snapshot import (
+    MANIFEST,
+    load_snapshot,
+    save_snapshot,
+)
+from tests.builders import forward, quote
+
+
+def option_quotes(symbol: str, num_quotes: int) -> OptionQuotes:
+    return OptionQuotes.create(
+        symbol,
+        [
+            OptionQuote(
+                option_type=OptionType.CALL_OPTION if i % 2 else OptionType.PUT_OPTION,
+                strike_point=80.0 + i,
+                time_to_expiry=0.25 * (1 + i % 4),
+                quote_convention=OptionQuoteConvention.IMPLIED_VOLATILITY,
+                quote=0.2 + 0.001 * i,
+            )
+            for i in range(num_quotes)
+        ],
+    )
+
+
+def fields(option_quote: OptionQuote) -> tuple:
+    return (
+        option_quote.option_type,
+        option_quote.strike_point,
+        option_quote.time_to_expiry,
+        option_quote.quote_convention,
+        option_quote.quote,
+    )
+
+
+@pytest.fixture
+def market_data() -> MarketEnvironment:
+    usd = DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+    eur = DiscountingCurve.rate_curve(
+        Currency.EUR,
+        Currency.EUR,
+        times=np.array([0.5, 1.0, 5.0]),
+        rates=np.array([0.02, 0.025, 0.03]),
+    ).with_discount_factors(np.array([1.0, 0.99, 0.975, 0.86]))
+    market_data = MarketEnvironment.create(
+        [
+            MarketDataService(
+                id=MarketDataServiceId.DISCOUNTING_CURVE_SERVICE,
+                market_data_dict={
+                    curve.get_market_object_id(): curve for curve in (usd, eur)
+                },
+            ),
+            MarketDataService.create(
+                MarketDataServiceId.OPTION_QUOTES_SERVICE,
+                [option_quotes("SPX", 40), option_quotes("SX5E", 3)],
+            ),
+            MarketDataService.create(
+                MarketDataServiceId.FORWARD_QUOTES_SERVICE,
+                [forward("SPX", 5000.0), forward("SX5E", 4800.0)],
+            ),
+        ]
+    )
+    # snapshots of overlays hold the overridden and added objects
+    return market_data.derive([forward("SPX", 5100.0)]).extend([forward("NKY", 1.0)])
+
+
+def test_round_trip(market_data, tmp_path):
+    save_snapshot(market_data, str(tmp_path))
+    loaded = load_snapshot(str(tmp_path))
+
+    assert len(loaded) == len(market_data) == 7
+    assert quote(loaded, "SPX") == 5100.0 and quote(loaded, "NKY") == 1.0
+
+    options = market_data.get_value(MarketDataServiceId.OPTION_QUOTES_SERVICE)
+    for key, original in options.market_data_dict.items():
+        reloaded = loaded.get_market_object(key)
+        assert list(map(fields, reloaded.option_quotes)) == list(
+            map(fields, original.option_quotes)
+        )
+
+    T = np.linspace(0.0, 10.0, 21)
+    curves = market_data.get_value(MarketDataServiceId.DISCOUNTING_CURVE_SERVICE)
+    for key, curve in curves.market_data_dict.items():
+        reloaded = loaded.get_market_object(key)
+        assert reloaded.interpolation_type == curve.interpolation_type
+        assert reloaded.df(0.0, T) == pytest.approx(curve.df(0.0, T), rel=1e-15)
+        # the arrays are read-only views of the mapped files
+        assert not reloaded.times.flags.writeable
+
+
+def test_objects_are_built_on_first_access(market_data, tmp_path):
+    save_snapshot(market_data, str(tmp_path))
+    loaded = load_snapshot(str(tmp_path))
+    service = loaded.get_value(MarketDataServiceId.OPTION_QUOTES_SERVICE)
+    objects = service.market_data_dict
+
+    assert len(objects) == 2 and objects._built == {}
+    key, *_ = objects
+    assert objects[key] is objects[key]
+    assert list(objects._built) == [key]
+
+
+def test_unknown_versions_are_rejected(market_data, tmp_path):
+    save_snapshot(market_data, str(tmp_path))
+    manifest = tmp_path / MANIFEST
+    manifest.write_text(json.dumps(dict(json.loads(manifest.read_text()), version=0)))
+    with pytest.raises(ValueError):
+        load_snapshot(str(tmp_path))
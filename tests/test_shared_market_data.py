@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from py_volanalytics.market.discounting_curve import DiscountingCurve
+from py_volanalytics.types.enums import Currency, MarketDataServiceId
+from py_volanalytics.valuation_framework.market_data import (
+    MarketDataService,
+    MarketEnvironment,
+)
+from py_volanalytics.valuation_framework.shared_market_data import SharedMarketData
+
+
+def _mapped_blocks(market_data, key) -> int:
+    """Price off the shared curve, then count the blocks mapped in the worker."""
+    market_data.get_market_object(key).df(0.0, 1.0)
+    with open("/proc/self/maps", encoding="utf-8") as maps:
+        return len({line.split()[5] for line in maps if "/psm_" in line})
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/maps")
+    or "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs /proc and fork",
+)
+def test_persistent_workers_detach_closed_blocks():
+    curve = DiscountingCurve.flat(Currency.USD, Currency.USD, 0.05)
+    key = curve.get_market_object_id()
+    market_data = MarketEnvironment.create(
+        [
+            MarketDataService(
+                id=MarketDataServiceId.DISCOUNTING_CURVE_SERVICE,
+                market_data_dict={key: curve},
+            )
+        ]
+    )
+
+    counts = []
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        for _ in range(5):
+            with SharedMarketData.publish(market_data) as shared:
+                counts.append(
+                    executor.submit(_mapped_blocks, shared.market_data, key).result()
+                )
+    assert counts == [1] * 5
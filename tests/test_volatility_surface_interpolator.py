@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from py_volanalytics.math.interpolator import (
+    InterpolationType,
+    VolatilitySurfaceInterpolator,
+)
+
+STRIKES = np.array([80.0, 90.0, 100.0, 110.0, 120.0])
+EXPIRIES = np.array([0.25, 0.5, 1.0, 2.0])
+VOLATILITIES = np.array(
+    [
+        [0.30, 0.26, 0.23, 0.22, 0.23],
+        [0.28, 0.25, 0.22, 0.21, 0.22],
+        [0.26, 0.24, 0.21, 0.20, 0.21],
+        [0.25, 0.23, 0.20, 0.19, 0.20],
+    ]
+)
+STRIKE_TYPES = [
+    InterpolationType.LINEAR_INTERPOLATION,
+    InterpolationType.CUBIC_SPLINE_INTERPOLATION,
+    InterpolationType.HERMITE_CUBIC_SPLINE_INTERPOLATION,
+]
+
+
+def surface(strike_interpolation_type) -> VolatilitySurfaceInterpolator:
+    return VolatilitySurfaceInterpolator(
+        strikes=STRIKES,
+        expiries=EXPIRIES,
+        volatilities=VOLATILITIES,
+        strike_interpolation_type=strike_interpolation_type,
+    )
+
+
+@pytest.mark.parametrize("strike_interpolation_type", STRIKE_TYPES)
+def test_grid_is_reproduced_at_the_knots(strike_interpolation_type):
+    strikes, expiries = np.meshgrid(STRIKES, EXPIRIES)
+    assert surface(strike_interpolation_type)(strikes, expiries) == pytest.approx(
+        VOLATILITIES, rel=1e-14
+    )
+
+
+@pytest.mark.parametrize("strike_interpolation_type", STRIKE_TYPES)
+def test_total_variance_is_linear_in_time_between_expiries(strike_interpolation_type):
+    vol_surface = surface(strike_interpolation_type)
+    strikes = np.array([85.0, 100.0, 117.0])
+
+    for lower, upper in zip(EXPIRIES[:-1], EXPIRIES[1:]):
+        w_lower = vol_surface.total_variance(strikes, lower)
+        w_upper = vol_surface.total_variance(strikes, upper)
+        for theta in (0.0, 0.3, 0.5, 1.0):
+            expiry = lower + theta * (upper - lower)
+            expected = w_lower + theta * (w_upper - w_lower)
+            assert vol_surface.total_variance(strikes, expiry) == pytest.approx(
+                expected, rel=1e-14
+            )
+            assert vol_surface(strikes, expiry) == pytest.approx(
+                np.sqrt(expected / expiry), rel=1e-14
+            )
+
+
+def test_flat_extrapolation_in_time_and_strike():
+    vol_surface = surface(InterpolationType.LINEAR_INTERPOLATION)
+
+    # the front expiry vol holds down to T = 0, the last one beyond the grid
+    assert vol_surface(STRIKES, 0.0) == pytest.approx(VOLATILITIES[0], rel=1e-14)
+    assert vol_surface(STRIKES, 0.1) == pytest.approx(VOLATILITIES[0], rel=1e-14)
+    assert vol_surface(STRIKES, 5.0) == pytest.approx(VOLATILITIES[-1], rel=1e-14)
+    assert vol_surface.total_variance(STRIKES, 0.0) == pytest.approx(0.0)
+
+    assert vol_surface(50.0, EXPIRIES) == pytest.approx(VOLATILITIES[:, 0])
+    assert vol_surface(150.0, EXPIRIES) == pytest.approx(VOLATILITIES[:, -1])
+
+
+def test_single_expiry_is_flat_in_time():
+    vol_surface = VolatilitySurfaceInterpolator(
+        strikes=STRIKES, expiries=EXPIRIES[:1], volatilities=VOLATILITIES[:1]
+    )
+    assert vol_surface(STRIKES, np.array([[0.0], [0.25], [3.0]])) == pytest.approx(
+        np.tile(VOLATILITIES[0], (3, 1)), rel=1e-14
+    )